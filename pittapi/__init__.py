@@ -17,14 +17,21 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 """
 
-# grequests monkey-patches ssl, but this must be done before all other imports,
-# or else we may get a MonkeyPatchWarning or a RecursionError
-# See https://github.com/spyoungtech/grequests/issues/150 and https://github.com/gevent/gevent/issues/1016
-from gevent import monkey
 
-monkey.patch_all(thread=False, select=False)
+def enable_gevent() -> None:
+    """Opts in to gevent by monkey-patching the standard library, so that pittapi's blocking requests yield to other
+    greenlets. This changes socket and ssl behavior for the whole process.
 
-import urllib3
-from urllib3.exceptions import InsecureRequestWarning
+    Call it right after importing pittapi, before importing anything else (including other pittapi modules), or else
+    gevent may raise a MonkeyPatchWarning or a RecursionError when patching ssl.
+    See https://github.com/gevent/gevent/issues/1016
 
-urllib3.disable_warnings(InsecureRequestWarning)
+    gevent is an optional dependency (pip install pittapi[gevent])."""
+    from gevent import monkey
+
+    monkey.patch_all(thread=False, select=False)
+
+    from pittapi import transport
+
+    # Patched sockets can't be shared between threads, in case the default transport was created before patching
+    transport.get_transport().share_sessions = False
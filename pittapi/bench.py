@@ -0,0 +1,348 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+Benchmarks for the parsers, run against the recorded payloads in tests/samples:
+
+    python -m pittapi.bench                    # Compare against tests/bench_baseline.json
+    python -m pittapi.bench --update-baseline  # Record a new baseline
+    python -m pittapi.bench -k news            # Only run the news benchmarks
+
+Only the parse paths are timed: payloads are read and decoded before the clock starts, and nothing touches the network.
+Run it from the repository root, since the samples aren't installed with the package.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+DEFAULT_SAMPLES_PATH = Path("tests") / "samples"
+DEFAULT_BASELINE_PATH = Path("tests") / "bench_baseline.json"
+# Timings are compared relative to a fixed calibration workload, timed right before each benchmark, so that a baseline
+# recorded on one machine still means something on another. They're noisy all the same, so only a benchmark that gets
+# twice as slow fails, while memory use is deterministic enough for a tight tolerance.
+DEFAULT_TIME_TOLERANCE = 1.0
+DEFAULT_MEMORY_TOLERANCE = 0.2
+# Allowance on top of the memory tolerance, so tiny benchmarks don't fail over a few interpreter-internal objects
+MEMORY_SLACK_BYTES = 4096
+MEMORY_SLACK_BLOCKS = 32
+REPEAT = 5
+
+
+class Benchmark(NamedTuple):
+    name: str
+    # Reads its payloads from the samples directory and returns the operation to time
+    setup: Callable[[Path], Callable[[], Any]]
+
+
+class BenchResult(NamedTuple):
+    name: str
+    ops_per_sec: float
+    # Time per operation divided by the time per calibration operation
+    relative_time: float
+    # Memory blocks allocated by one operation and still held by its result
+    allocations: int
+    # Highest traced memory during one operation, in bytes
+    peak_memory: int
+
+
+class Regression(NamedTuple):
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.metric} went from {self.baseline:.4g} to {self.current:.4g}"
+
+
+def _read_json(samples_path: Path, name: str) -> Any:
+    with (samples_path / name).open() as f:
+        return json.load(f)
+
+
+def _read_text(samples_path: Path, name: str) -> str:
+    with (samples_path / name).open() as f:
+        return f.read()
+
+
+def _course_details(samples_path: Path) -> Callable[[], Any]:
+    from pittapi import course
+
+    course_info = _read_json(samples_path, "course_course_info.json")
+    course_sections = _read_json(samples_path, "course_course_sections.json")
+    return lambda: course._parse_course_details("2231", "CS", "0007", "105611", course_info["course_details"], course_sections)
+
+
+def _section_details(samples_path: Path) -> Callable[[], Any]:
+    from pittapi import course
+
+    data = _read_json(samples_path, "course_section_details.json")
+    return lambda: course._parse_section_details("2231", "27815", data)
+
+
+def _dining_locations(samples_path: Path) -> Callable[[], Any]:
+    from pittapi import dining
+
+    data = _read_json(samples_path, "dining_locations.json")
+    return lambda: dining._parse_locations(data)
+
+
+def _dining_hours(samples_path: Path) -> Callable[[], Any]:
+    from pittapi import dining
+
+    data = _read_json(samples_path, "dining_schedule.json")
+    return lambda: dining._parse_location_hours(data, None, "2024-04-12")
+
+
+def _gyms(samples_path: Path) -> Callable[[], Any]:
+    from pittapi import gym
+
+    html = _read_text(samples_path, "gym_counts.html")
+    return lambda: gym._parse_gyms(html)
+
+
+def _laundry(samples_path: Path) -> Callable[[], Any]:
+    from pittapi import laundry
+
+    data = _read_json(samples_path, "laundry_mock_response_towers.json")
+    return lambda: laundry._parse_laundry_info(data)
+
+
+def _library(samples_path: Path) -> Callable[[], Any]:
+    from pittapi import library
+
+    data = _read_json(samples_path, "library_mock_response_water.json")
+    return lambda: library._parse_query_result(data)
+
+
+def _news(samples_path: Path) -> Callable[[], Any]:
+    from requests_html import HTML
+
+    from pittapi import news
+
+    page = _read_text(samples_path, "news_university_news_features_articles_page_0.html")
+    # The HTML is created inside the operation, since it caches the parsed document
+    return lambda: news._parse_page_articles(HTML(html=page))
+
+
+def _people(samples_path: Path) -> Callable[[], Any]:
+    from requests_html import HTML
+
+    from pittapi import people
+
+    text = _read_text(samples_path, "people_ramirez_mock_response.html")
+    return lambda: people._parse_people(text, HTML(html=text))
+
+
+def _status(samples_path: Path) -> Callable[[], Any]:
+    from pittapi import status
+
+    data = _read_json(samples_path, "status.json")
+    return lambda: status._parse_status(data)
+
+
+def _textbooks(samples_path: Path) -> Callable[[], Any]:
+    from pittapi import textbook
+
+    books = _read_json(samples_path, "textbook_textbooks_CS_0441_garrison.json")
+    return lambda: [textbook.Textbook.from_json(book) for book in books]
+
+
+BENCHMARKS = [
+    Benchmark("course.parse_course_details", _course_details),
+    Benchmark("course.parse_section_details", _section_details),
+    Benchmark("dining.parse_locations", _dining_locations),
+    Benchmark("dining.parse_location_hours", _dining_hours),
+    Benchmark("gym.parse_gyms", _gyms),
+    Benchmark("laundry.parse_laundry_info", _laundry),
+    Benchmark("library.parse_query_result", _library),
+    Benchmark("news.parse_page_articles", _news),
+    Benchmark("people.parse_people", _people),
+    Benchmark("status.parse_status", _status),
+    Benchmark("textbook.from_json", _textbooks),
+]
+
+
+def _calibration() -> list[str]:
+    return sorted(str(i * 7919 % 1000) for i in range(1000))
+
+
+def _time_per_op(func: Callable[[], Any], min_time: float) -> float:
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    return min(timer.repeat(repeat=REPEAT, number=number)) / number
+
+
+def _measure_memory(func: Callable[[], Any]) -> tuple[int, int]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        snapshot_before = tracemalloc.take_snapshot()
+        current_before = tracemalloc.get_traced_memory()[0]
+        result = func()  # noqa: F841 - kept alive so its allocations are counted
+        peak = tracemalloc.get_traced_memory()[1]
+        snapshot_after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    allocations = sum(stat.count_diff for stat in snapshot_after.compare_to(snapshot_before, "lineno"))
+    return allocations, peak - current_before
+
+
+def run_benchmarks(
+    benchmarks: list[Benchmark] | None = None,
+    samples_path: Path = DEFAULT_SAMPLES_PATH,
+    min_time: float = 0.1,
+) -> list[BenchResult]:
+    """Runs each benchmark and returns its timing and memory use. min_time is how long a timing repeat lasts at least."""
+    if benchmarks is None:
+        benchmarks = BENCHMARKS
+
+    results = []
+    for benchmark in benchmarks:
+        func = benchmark.setup(samples_path)
+        func()  # Warm up lazy imports and caches before anything is measured
+        calibration_time = _time_per_op(_calibration, min_time)
+        time_per_op = _time_per_op(func, min_time)
+        allocations, peak_memory = _measure_memory(func)
+        results.append(
+            BenchResult(
+                name=benchmark.name,
+                ops_per_sec=1 / time_per_op,
+                relative_time=time_per_op / calibration_time,
+                allocations=allocations,
+                peak_memory=peak_memory,
+            )
+        )
+    return results
+
+
+def compare(
+    results: list[BenchResult],
+    baseline: dict[str, dict[str, float]],
+    time_tolerance: float = DEFAULT_TIME_TOLERANCE,
+    memory_tolerance: float = DEFAULT_MEMORY_TOLERANCE,
+) -> list[Regression]:
+    """Returns every metric that got worse than its baseline by more than the tolerance.
+    Benchmarks missing from the baseline are skipped."""
+    regressions = []
+    for result in results:
+        if result.name not in baseline:
+            continue
+        expected = baseline[result.name]
+        limits = {
+            "relative_time": expected["relative_time"] * (1 + time_tolerance),
+            "allocations": expected["allocations"] * (1 + memory_tolerance) + MEMORY_SLACK_BLOCKS,
+            "peak_memory": expected["peak_memory"] * (1 + memory_tolerance) + MEMORY_SLACK_BYTES,
+        }
+        for metric, limit in limits.items():
+            current = getattr(result, metric)
+            if current > limit:
+                regressions.append(Regression(result.name, metric, expected[metric], current))
+    return regressions
+
+
+def _python_version() -> str:
+    return f"{sys.version_info.major}.{sys.version_info.minor}"
+
+
+def load_baseline(path: Path) -> dict[str, dict[str, float]]:
+    with path.open() as f:
+        baseline: dict[str, dict[str, float]] = json.load(f)["benchmarks"]
+    return baseline
+
+
+def save_baseline(results: list[BenchResult], path: Path) -> None:
+    """Records the results in the baseline file, keeping the entries of benchmarks that weren't run."""
+    benchmarks = load_baseline(path) if path.exists() else {}
+    benchmarks |= {
+        result.name: {
+            "relative_time": round(result.relative_time, 3),
+            "allocations": result.allocations,
+            "peak_memory": result.peak_memory,
+        }
+        for result in results
+    }
+    with path.open("w") as f:
+        json.dump({"python": _python_version(), "benchmarks": benchmarks}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def format_results(results: list[BenchResult]) -> str:
+    name_width = max([len("benchmark")] + [len(result.name) for result in results])
+    lines = [f"{'benchmark':<{name_width}}  {'ops/sec':>10}  {'relative':>9}  {'allocations':>11}  {'peak memory':>11}"]
+    for result in results:
+        lines.append(
+            f"{result.name:<{name_width}}  {result.ops_per_sec:>10,.0f}  {result.relative_time:>9.2f}  "
+            f"{result.allocations:>11,}  {result.peak_memory / 1024:>9,.1f}KB"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pittapi.bench", description="Benchmark the pittapi parsers.")
+    parser.add_argument("-k", dest="keyword", help="only run benchmarks whose name contains KEYWORD")
+    parser.add_argument("--samples", type=Path, default=DEFAULT_SAMPLES_PATH, help="directory of recorded payloads")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH, help="baseline file to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results to the baseline file")
+    parser.add_argument("--min-time", type=float, default=0.1, help="minimum duration of each timing repeat, in seconds")
+    parser.add_argument("--time-tolerance", type=float, default=DEFAULT_TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    benchmarks = [benchmark for benchmark in BENCHMARKS if args.keyword is None or args.keyword in benchmark.name]
+    results = run_benchmarks(benchmarks, args.samples, args.min_time)
+    print(format_results(results))
+
+    if args.update_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}, nothing to compare against")
+        return 0
+
+    with args.baseline.open() as f:
+        baseline_python = json.load(f).get("python")
+    if baseline_python != _python_version():
+        # Allocation counts and sizes change between interpreter versions
+        print(f"\nThe baseline was recorded with Python {baseline_python}, expect differences in memory use")
+
+    regressions = compare(results, load_baseline(args.baseline), args.time_tolerance, args.memory_tolerance)
+    if regressions:
+        print("\nRegressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nNo regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,378 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, NamedTuple, Protocol, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class CachePolicy(NamedTuple):
+    """How long an endpoint's responses are fresh, and for how long after that a stale response may still be served
+    while it's refreshed in the background. A ttl of 0 turns caching off for the endpoint."""
+
+    ttl: float
+    stale_ttl: float = 0.0
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    stored_at: float
+
+
+class CacheStats(NamedTuple):
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    evictions: int = 0
+
+
+# Default policies for every cached fetch helper, keyed by endpoint name. Data that only changes between semesters is
+# kept for a day, while anything that reports live status (open/closed, game scores, service status) is only kept
+# for a minute or so.
+POLICIES: dict[str, CachePolicy] = {
+    "course.subjects": CachePolicy(ttl=24 * 60 * 60, stale_ttl=7 * 24 * 60 * 60),
+    "course.subject_courses": CachePolicy(ttl=24 * 60 * 60, stale_ttl=7 * 24 * 60 * 60),
+    "course.course_info": CachePolicy(ttl=24 * 60 * 60, stale_ttl=7 * 24 * 60 * 60),
+    "cal.events": CachePolicy(ttl=24 * 60 * 60, stale_ttl=7 * 24 * 60 * 60),
+    "lab.directory": CachePolicy(ttl=24 * 60 * 60, stale_ttl=7 * 24 * 60 * 60),
+    "dining.locations": CachePolicy(ttl=60, stale_ttl=5 * 60),
+    "dining.hours": CachePolicy(ttl=60 * 60, stale_ttl=24 * 60 * 60),
+    "sports.mens_basketball": CachePolicy(ttl=60, stale_ttl=10 * 60),
+    "sports.football": CachePolicy(ttl=60, stale_ttl=10 * 60),
+    "status.status": CachePolicy(ttl=30, stale_ttl=60),
+}
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> CacheEntry | None: ...
+
+    def set(self, key: str, entry: CacheEntry) -> int:
+        """Stores an entry and returns the number of entries evicted to make room for it."""
+        ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryBackend:
+    """In-process LRU cache holding at most `max_entries` responses."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> int:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskBackend:
+    """Cache of JSON responses in a directory, shared by every process that points at it and kept across restarts.
+
+    Each response is one file, written atomically. Reads refresh a file's modification time, and the least recently
+    used files are deleted once there are more than `max_entries`."""
+
+    def __init__(self, directory: str | os.PathLike[str], max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.directory = os.fspath(directory)
+        self.max_entries = max_entries
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._get_paths())
+
+    def get(self, key: str) -> CacheEntry | None:
+        path = self._get_path(key)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        if data.get("key") != key:
+            return None
+        return CacheEntry(value=data["value"], stored_at=data["stored_at"])
+
+    def set(self, key: str, entry: CacheEntry) -> int:
+        fd, temp_path = tempfile.mkstemp(prefix=".entry-", dir=self.directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"key": key, "stored_at": entry.stored_at, "value": entry.value}, f, separators=(",", ":"))
+            os.replace(temp_path, self._get_path(key))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return self._evict()
+
+    def clear(self) -> None:
+        for path in self._get_paths():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def _evict(self) -> int:
+        paths = self._get_paths()
+        if len(paths) <= self.max_entries:
+            return 0
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                pass
+        evicted = 0
+        for path in sorted(mtimes, key=mtimes.__getitem__)[: len(mtimes) - self.max_entries]:
+            try:
+                os.unlink(path)
+                evicted += 1
+            except FileNotFoundError:
+                pass
+        return evicted
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def _get_paths(self) -> list[str]:
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".json")]
+
+
+class ResponseCache:
+    """Caches the responses of fetch helpers under per-endpoint policies.
+
+    A fresh response is returned as is. A stale one that is still within its endpoint's stale_ttl is returned right
+    away too, and refreshed in a background thread, so callers only ever wait for a response that was never cached or
+    has expired completely. Exceptions are never cached. Cached values are shared between callers and must not be
+    modified."""
+
+    def __init__(self, backend: CacheBackend | None = None, policies: dict[str, CachePolicy] | None = None):
+        self.backend: CacheBackend = backend if backend is not None else MemoryBackend()
+        self.policies = dict(POLICIES if policies is None else policies)
+        self._stats: dict[str, CacheStats] = {}
+        self._refreshing: set[str] = set()
+        self._refresh_tasks: set[asyncio.Task[None]] = set()
+        self._lock = threading.Lock()
+
+    def set_policy(self, endpoint: str, ttl: float, stale_ttl: float = 0.0) -> None:
+        self.policies[endpoint] = CachePolicy(ttl=ttl, stale_ttl=stale_ttl)
+
+    def get_stats(self, endpoint: str | None = None) -> CacheStats:
+        """Returns the counters of one endpoint, or the totals of every endpoint."""
+        with self._lock:
+            if endpoint is not None:
+                return self._stats.get(endpoint, CacheStats())
+            return CacheStats(*(sum(counts) for counts in zip(CacheStats(), *self._stats.values())))
+
+    def clear(self) -> None:
+        """Drops every cached response and resets the counters."""
+        self.backend.clear()
+        with self._lock:
+            self._stats.clear()
+
+    def get(self, endpoint: str, key: str, fetch: Callable[[], T]) -> T:
+        """Returns the cached response for `key`, calling `fetch` to get it if it isn't cached or has expired."""
+        policy = self.policies.get(endpoint)
+        if policy is None or policy.ttl <= 0:
+            return fetch()
+
+        cache_key = f"{endpoint}:{key}"
+        entry, stale = self._lookup(endpoint, cache_key, policy)
+        if entry is not None:
+            if stale:
+                self._refresh_in_background(endpoint, cache_key, fetch)
+            return entry.value  # type: ignore[no-any-return]
+
+        value = fetch()
+        self._store(endpoint, cache_key, value)
+        return value
+
+    async def get_async(self, endpoint: str, key: str, fetch: Callable[[], Awaitable[T]]) -> T:
+        """The async version of get, for fetch coroutines. Stale responses are refreshed in a task on the running event
+        loop instead of a thread."""
+        policy = self.policies.get(endpoint)
+        if policy is None or policy.ttl <= 0:
+            return await fetch()
+
+        cache_key = f"{endpoint}:{key}"
+        entry, stale = self._lookup(endpoint, cache_key, policy)
+        if entry is not None:
+            if stale:
+                self._refresh_in_task(endpoint, cache_key, fetch)
+            return entry.value  # type: ignore[no-any-return]
+
+        value = await fetch()
+        self._store(endpoint, cache_key, value)
+        return value
+
+    def refresh(self, endpoint: str, key: str, fetch: Callable[[], T]) -> T:
+        """Calls `fetch` even if a fresh response for `key` is cached, and caches what it returns. For callers that found
+        out the cached response is outdated before it expired."""
+        value = fetch()
+        self._store_refreshed(endpoint, key, value)
+        return value
+
+    async def refresh_async(self, endpoint: str, key: str, fetch: Callable[[], Awaitable[T]]) -> T:
+        value = await fetch()
+        self._store_refreshed(endpoint, key, value)
+        return value
+
+    def _store_refreshed(self, endpoint: str, key: str, value: Any) -> None:
+        policy = self.policies.get(endpoint)
+        if policy is not None and policy.ttl > 0:
+            self._store(endpoint, f"{endpoint}:{key}", value)
+            self._count(endpoint, "refreshes")
+
+    def _lookup(self, endpoint: str, cache_key: str, policy: CachePolicy) -> tuple[CacheEntry | None, bool]:
+        """Returns the usable entry for a key, if any, and whether it's stale."""
+        entry = self.backend.get(cache_key)
+        age = time.time() - entry.stored_at if entry is not None else None
+        if entry is not None and age is not None and age < policy.ttl:
+            self._count(endpoint, "hits")
+            return entry, False
+        if entry is not None and age is not None and age < policy.ttl + policy.stale_ttl:
+            self._count(endpoint, "stale_hits")
+            return entry, True
+        self._count(endpoint, "misses")
+        return None, False
+
+    def _store(self, endpoint: str, cache_key: str, value: Any) -> None:
+        evicted = self.backend.set(cache_key, CacheEntry(value=value, stored_at=time.time()))
+        if evicted:
+            self._count(endpoint, "evictions", evicted)
+
+    def _refresh_in_background(self, endpoint: str, cache_key: str, fetch: Callable[[], Any]) -> None:
+        with self._lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+
+        def refresh() -> None:
+            try:
+                self._store(endpoint, cache_key, fetch())
+                self._count(endpoint, "refreshes")
+            except Exception:
+                # Keep serving the stale response; the next stale hit tries again
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(cache_key)
+
+        threading.Thread(target=refresh, name=f"pittapi-cache-{endpoint}", daemon=True).start()
+
+    def _refresh_in_task(self, endpoint: str, cache_key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        with self._lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+
+        async def refresh() -> None:
+            try:
+                self._store(endpoint, cache_key, await fetch())
+                self._count(endpoint, "refreshes")
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(cache_key)
+
+        # The event loop only keeps weak references to tasks, so hold on to it until it's done
+        task = asyncio.get_running_loop().create_task(refresh(), name=f"pittapi-cache-{endpoint}")
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    def _count(self, endpoint: str, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            stats = self._stats.get(endpoint, CacheStats())
+            self._stats[endpoint] = stats._replace(**{counter: getattr(stats, counter) + amount})
+
+
+# Shared by every module's fetch helpers. Swap its backend (e.g. response_cache.backend = DiskBackend(path)) or change
+# its policies to configure caching for the whole package.
+response_cache = ResponseCache()
+
+
+def cached(endpoint: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorates a fetch helper so its responses are cached in response_cache under the endpoint's policy, keyed by
+    the helper's arguments. Responses must be JSON-serializable to work with DiskBackend.
+
+    Async helpers are cached too, and share cached responses with a sync helper of the same endpoint and arguments.
+    The decorated helper's refresh attribute takes the same arguments, and fetches a response even if one is cached."""
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                return await response_cache.get_async(endpoint, _get_key(args, kwargs), lambda: func(*args, **kwargs))
+
+            async def refresh_async(*args: Any, **kwargs: Any) -> Any:
+                return await response_cache.refresh_async(endpoint, _get_key(args, kwargs), lambda: func(*args, **kwargs))
+
+            async_wrapper.refresh = refresh_async  # type: ignore[attr-defined]
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            return response_cache.get(endpoint, _get_key(args, kwargs), lambda: func(*args, **kwargs))
+
+        def refresh(*args: Any, **kwargs: Any) -> T:
+            return response_cache.refresh(endpoint, _get_key(args, kwargs), lambda: func(*args, **kwargs))
+
+        wrapper.refresh = refresh  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
+
+
+def _get_key(args: tuple[Any, ...], kwargs: dict[str, Any]) -> str:
+    return json.dumps([args, kwargs], sort_keys=True, default=str)
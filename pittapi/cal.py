@@ -17,9 +17,10 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 """
 
-from typing import NamedTuple
+from typing import Any, NamedTuple
 
-import requests
+from pittapi import observe, transport
+from pittapi.cache import cached
 
 
 class Event(NamedTuple):
@@ -35,10 +36,24 @@ ENROLLMENT_CALENDAR_URL: str = "https://25livepub.collegenet.com/calendars/pitt-
 COURSE_CALENDAR_URL: str = "https://25livepub.collegenet.com/calendars/pitt-courseclass-calendar.json"
 GRADUATION_CALENDAR_URL: str = "https://25livepub.collegenet.com/calendars/pitt-graduation-calendar.json"
 
+observe.register_endpoint("cal.events", ACADEMIC_CALENDAR_URL)
+observe.register_endpoint("cal.events", GRADES_CALENDAR_URL)
+observe.register_endpoint("cal.events", ENROLLMENT_CALENDAR_URL)
+observe.register_endpoint("cal.events", COURSE_CALENDAR_URL)
+observe.register_endpoint("cal.events", GRADUATION_CALENDAR_URL)
+
 
 def _fetch_calendar_events(url: str) -> list[Event]:
     """"""
-    data = requests.get(url).json()
+    return _parse_calendar_events(_get_calendar_data(url))
+
+
+async def _fetch_calendar_events_async(url: str) -> list[Event]:
+    return _parse_calendar_events(await _get_calendar_data_async(url))
+
+
+@observe.parser("cal.events")
+def _parse_calendar_events(data: list[dict[str, Any]]) -> list[Event]:
     events = []
     for calendar_event in data:
         assert calendar_event["customFields"][0]["label"] == "Event Title"
@@ -52,6 +67,18 @@ def _fetch_calendar_events(url: str) -> list[Event]:
     return events
 
 
+@cached("cal.events")
+def _get_calendar_data(url: str) -> list[dict[str, Any]]:
+    data: list[dict[str, Any]] = transport.get_json(url)
+    return data
+
+
+@cached("cal.events")
+async def _get_calendar_data_async(url: str) -> list[dict[str, Any]]:
+    data: list[dict[str, Any]] = await transport.get_json_async(url)
+    return data
+
+
 def get_academic_calendar() -> list[Event]:
     """"""
     return _fetch_calendar_events(ACADEMIC_CALENDAR_URL)
@@ -76,3 +103,23 @@ def get_course_calendar() -> list[Event]:
 def get_graduation_calendar() -> list[Event]:
     """"""
     return _fetch_calendar_events(GRADUATION_CALENDAR_URL)
+
+
+async def get_academic_calendar_async() -> list[Event]:
+    return await _fetch_calendar_events_async(ACADEMIC_CALENDAR_URL)
+
+
+async def get_grades_calendar_async() -> list[Event]:
+    return await _fetch_calendar_events_async(GRADES_CALENDAR_URL)
+
+
+async def get_enrollment_calendar_async() -> list[Event]:
+    return await _fetch_calendar_events_async(ENROLLMENT_CALENDAR_URL)
+
+
+async def get_course_calendar_async() -> list[Event]:
+    return await _fetch_calendar_events_async(COURSE_CALENDAR_URL)
+
+
+async def get_graduation_calendar_async() -> list[Event]:
+    return await _fetch_calendar_events_async(GRADUATION_CALENDAR_URL)
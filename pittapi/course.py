@@ -19,9 +19,20 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import os
 import re
-import requests
-from typing import NamedTuple, Any
+import sys
+import threading
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from typing import AsyncIterator, Callable, Iterable, Iterator, NamedTuple, Any, TextIO
+from urllib.parse import urlsplit
+
+from pittapi import observe, ratelimit, transport
+from pittapi.cache import cached
 
 JSON = dict[str, Any]
 
@@ -48,12 +59,47 @@ SECTION_DETAILS_API = (
     "https://pitcsprd.csps.pitt.edu/psc/pitcsprd/EMPLOYEE/SA/s/"
     "WEBLIB_HCX_CM.H_CLASS_SEARCH.FieldFormula.IScript_ClassDetails?institution=UPITT&term={term}&class_nbr={id}"
 )
+
+observe.register_endpoint("course.subjects", SUBJECTS_API)
+observe.register_endpoint("course.subject_courses", SUBJECT_COURSES_API)
+observe.register_endpoint("course.course_details", COURSE_DETAIL_API)
+observe.register_endpoint("course.course_sections", COURSE_SECTIONS_API)
+observe.register_endpoint("course.section_details", SECTION_DETAILS_API)
+
 # id -> unique course ID, not to be confused with course code (for instance, CS 0007 has code 105611)
 # career -> for example, UGRD (undergraduate)
 
 TERM_REGEX = r"2\d\d[147]"
 VALID_TERMS = re.compile(TERM_REGEX)
 
+# Maximum number of PeopleSoft requests in flight at once, shared by every function in this module
+POOL_SIZE = 16
+
+# Subject codes change at most a few times a year, so they're fetched once per process and then refreshed in the
+# background whenever the cached copy is older than this many seconds
+SUBJECT_CODES_TTL = 24 * 60 * 60
+
+_subject_codes: frozenset[str] | None = None
+_subject_codes_updated_at = 0.0
+_subject_codes_refresh_thread: threading.Thread | None = None
+_subject_codes_lock = threading.Lock()
+_subject_codes_load_lock = threading.Lock()
+_subject_codes_hits = 0
+_subject_codes_misses = 0
+_subject_codes_refreshes = 0
+
+# term -> subject -> {catalog number: internal course ID}, built lazily one subject at a time
+_course_id_index: dict[str, dict[str, dict[str, str]]] = {}
+# Subjects whose index was invalidated, so their next catalog fetch skips the response cache
+_outdated_subject_courses: set[str] = set()
+_course_id_index_lock = threading.Lock()
+
+# The rate limiter of the crawl_term that PeopleSoft is being called for, if any. _get_json only takes a token from it
+# for requests that actually go out, not for ones answered by the response cache or shared with an in-flight request.
+_crawl_rate_limiter: contextvars.ContextVar[ratelimit.HostRateLimiter | None] = contextvars.ContextVar(
+    "crawl_rate_limiter", default=None
+)
+
 
 class Instructor(NamedTuple):
     name: str
@@ -128,11 +174,68 @@ class Subject(NamedTuple):
     courses: dict[str, Course]
 
 
+class SectionResult(NamedTuple):
+    class_number: str
+    section: Section | None = None
+    error: Exception | None = None
+
+
+class EnrollmentState(NamedTuple):
+    status: str
+    enrollment_available: str
+    wait_list_total: str
+
+
+class SectionChange(NamedTuple):
+    class_number: str
+    previous: EnrollmentState
+    current: EnrollmentState
+    section: Section
+
+
+class RegistryStats(NamedTuple):
+    hits: int
+    misses: int
+    refreshes: int
+
+
+class CoalescingStats(NamedTuple):
+    requests: int
+    coalesced: int
+
+
+class _AsyncFetch:
+    """An in-flight async request, and how many callers are waiting for it."""
+
+    def __init__(self, task: asyncio.Task[JSON]):
+        self.task = task
+        self.waiters = 0
+
+
+# URL -> the in-flight request for it, which concurrent callers for the same URL wait on instead of sending their own
+_in_flight: dict[str, Future[JSON]] = {}
+# The same for async callers, per event loop since asyncio tasks can only be awaited in their own loop
+_in_flight_async: dict[tuple[asyncio.AbstractEventLoop, str], _AsyncFetch] = {}
+_in_flight_lock = threading.Lock()
+_upstream_requests = 0
+_coalesced_requests = 0
+
+# Only runs single PeopleSoft requests; never submit work to it that waits on other work submitted to it
+_executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="pittapi-course")
+
+
 def get_subject_courses(subject: str) -> Subject:
     subject = _validate_subject(subject)
+    return _parse_subject_courses(subject, _get_subject_courses(subject))
+
+
+async def get_subject_courses_async(subject: str) -> Subject:
+    subject = _validate_subject(subject, await _get_subject_codes_async())
+    return _parse_subject_courses(subject, await _get_subject_courses_async(subject))
 
-    json_response = _get_subject_courses(subject)
 
+@observe.parser("course.subject_courses")
+def _parse_subject_courses(subject: str, json_response: JSON) -> Subject:
     courses = {}
     for course in json_response["courses"]:
         course_number = course["catalog_nbr"]
@@ -156,10 +259,156 @@ def get_course_details(term: str | int, subject: str, course: str | int) -> Cour
     subject = _validate_subject(subject)
     course = _validate_course(course)
 
-    internal_course_id = _get_course_id(subject, course)
-    json_response = _get_course_info(internal_course_id)["course_details"]
-    json_response_details = _get_course_sections(internal_course_id, term)
+    internal_course_id = _get_course_id(term, subject, course)
+    # The course info and its sections are independent of each other, so fetch them concurrently. They run in this
+    # context, so that a crawl_term calling this still rate limits them.
+    course_info_future = _executor.submit(contextvars.copy_context().run, _get_course_info, internal_course_id)
+    course_sections_future = _executor.submit(contextvars.copy_context().run, _get_course_sections, internal_course_id, term)
+    json_response = course_info_future.result()["course_details"]
+    json_response_details = course_sections_future.result()
+
+    return _parse_course_details(term, subject, course, internal_course_id, json_response, json_response_details)
+
+
+async def get_course_details_async(term: str | int, subject: str, course: str | int) -> CourseDetails:
+    term = _validate_term(term)
+    subject = _validate_subject(subject, await _get_subject_codes_async())
+    course = _validate_course(course)
+
+    internal_course_id = _find_course_id(await _get_internal_id_dict_async(term, subject), course)
+    course_info, json_response_details = await asyncio.gather(
+        _get_course_info_async(internal_course_id), _get_course_sections_async(internal_course_id, term)
+    )
+
+    return _parse_course_details(
+        term, subject, course, internal_course_id, course_info["course_details"], json_response_details
+    )
+
+
+async def get_courses_details_async(
+    courses: Iterable[tuple[str | int, str, str | int]], max_concurrency: int = POOL_SIZE // 2
+) -> list[CourseDetails]:
+    """The async version of get_courses_details, with at most `max_concurrency` courses being fetched at once."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def get_details(args: tuple[str | int, str, str | int]) -> CourseDetails:
+        async with semaphore:
+            return await get_course_details_async(*args)
+
+    return list(await asyncio.gather(*(get_details(args) for args in courses)))
+
+
+def get_courses_details(
+    courses: Iterable[tuple[str | int, str, str | int]], max_workers: int = POOL_SIZE // 2
+) -> list[CourseDetails]:
+    """Fetches the details of many (term, subject, course) triples concurrently.
+
+    Results are returned in the same order as the given triples. If any lookup fails, its exception is raised."""
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pittapi-course-batch") as executor:
+        return list(executor.map(lambda args: get_course_details(*args), courses))
+
+
+def crawl_term(
+    term: str | int,
+    subjects: list[str] | None = None,
+    concurrency: int = POOL_SIZE // 2,
+    requests_per_second: float | None = None,
+    checkpoint: str | os.PathLike[str] | None = None,
+) -> Iterator[CourseDetails]:
+    """Crawls every course offered in a term, yielding each CourseDetails as soon as it has been fetched.
+
+    Args:
+        term: The term to crawl.
+        subjects: Subject codes to crawl, or None to crawl every subject.
+        concurrency: Maximum number of courses being fetched at the same time.
+        requests_per_second: If given, the crawl sends PeopleSoft at most this many requests per second. Other
+            PeopleSoft requests in the process aren't limited by it.
+        checkpoint: Path of a file that records every finished course. If the crawl is interrupted, running it again
+            with the same checkpoint skips the courses that were already yielded. A checkpoint written by a crawl of
+            another term raises ValueError.
 
+    Courses in the catalog that aren't offered in the term are skipped. Results arrive in completion order.
+    """
+    term = _validate_term(term)
+    if subjects is None:
+        subjects = sorted(_get_subject_codes())
+    else:
+        subjects = [_validate_subject(subject) for subject in subjects]
+
+    finished: set[tuple[str, str]] = set()
+    if checkpoint is not None and os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            for line in f:
+                fields = line.split()
+                if not fields:
+                    continue
+                if len(fields) != 3 or fields[0] != term:
+                    raise ValueError(f"{checkpoint} isn't the checkpoint of a crawl of term {term}")
+                finished.add((fields[1], fields[2]))
+
+    # The crawl's own limiter, so that other PeopleSoft callers in the process aren't held back by it
+    rate_limiter = None
+    if requests_per_second is not None:
+        host = urlsplit(COURSE_SECTIONS_API).hostname or ""
+        rate_limiter = ratelimit.HostRateLimiter({host: ratelimit.RateLimit(requests_per_second)})
+
+    checkpoint_file = open(checkpoint, "a") if checkpoint is not None else None
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="pittapi-course-crawl")
+    in_flight: dict[Future[CourseDetails | None], tuple[str, str]] = {}
+    try:
+        for subject in subjects:
+            # Only set around the call, since the generator's caller runs in this context between yields
+            token = _crawl_rate_limiter.set(rate_limiter)
+            try:
+                internal_id_dict = _get_internal_id_dict(term, subject)
+            finally:
+                _crawl_rate_limiter.reset(token)
+            for course in internal_id_dict:
+                if (subject, course) in finished:
+                    continue
+                if len(in_flight) >= concurrency:
+                    yield from _drain_crawl(term, in_flight, checkpoint_file)
+                in_flight[executor.submit(_crawl_course, term, subject, course, rate_limiter)] = (subject, course)
+        while in_flight:
+            yield from _drain_crawl(term, in_flight, checkpoint_file)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if checkpoint_file is not None:
+            checkpoint_file.close()
+
+
+def _crawl_course(
+    term: str, subject: str, course: str, rate_limiter: ratelimit.HostRateLimiter | None
+) -> CourseDetails | None:
+    token = _crawl_rate_limiter.set(rate_limiter)
+    try:
+        return get_course_details(term, subject, course)
+    except ValueError:  # Catalog entry without any sections in this term
+        return None
+    finally:
+        _crawl_rate_limiter.reset(token)
+
+
+def _drain_crawl(
+    term: str, in_flight: dict[Future[CourseDetails | None], tuple[str, str]], checkpoint_file: TextIO | None
+) -> Iterator[CourseDetails]:
+    """Waits for at least one in-flight course to finish and yields everything that has finished."""
+    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+    for future in done:
+        subject, course = in_flight.pop(future)
+        course_details = future.result()
+        if course_details is not None:
+            yield course_details
+        # Only record the course once the caller has consumed it, so an interrupted crawl never loses a result
+        if checkpoint_file is not None:
+            checkpoint_file.write(f"{term} {subject} {course}\n")
+            checkpoint_file.flush()
+
+
+@observe.parser("course.course_details")
+def _parse_course_details(
+    term: str, subject: str, course: str, internal_course_id: str, json_response: JSON, json_response_details: JSON
+) -> CourseDetails:
     course_title = json_response_details["sections"][0]["descr"]
     course_description = json_response["descrlong"]
     credit_range = (json_response["units_minimum"], json_response["units_maximum"])
@@ -251,6 +500,61 @@ def get_section_details(term: str | int, class_number: str | int) -> Section:
     term = _validate_term(term)
 
     json_response = _get_section_details(term, class_number)
+    return _parse_section_details(term, class_number, json_response)
+
+
+async def get_section_details_async(term: str | int, class_number: str | int) -> Section:
+    term = _validate_term(term)
+
+    json_response = await _get_section_details_async(term, class_number)
+    return _parse_section_details(term, class_number, json_response)
+
+
+def get_sections_details(
+    term: str | int, class_numbers: Iterable[str | int], max_workers: int = POOL_SIZE
+) -> Iterator[SectionResult]:
+    """Fetches the details of many sections concurrently, yielding a SectionResult for each one as soon as it arrives.
+
+    A failed lookup doesn't stop the batch; its SectionResult carries the exception instead of a Section."""
+    term = _validate_term(term)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pittapi-course-sections")
+    try:
+        futures = [executor.submit(_get_section_result, term, class_number) for class_number in class_numbers]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def get_sections_details_async(
+    term: str | int, class_numbers: Iterable[str | int], max_concurrency: int = POOL_SIZE
+) -> AsyncIterator[SectionResult]:
+    """The async version of get_sections_details, with at most `max_concurrency` sections being fetched at once."""
+    term = _validate_term(term)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def get_result(class_number: str | int) -> SectionResult:
+        async with semaphore:
+            try:
+                section = await get_section_details_async(term, class_number)
+            except Exception as e:
+                return SectionResult(class_number=str(class_number), error=e)
+        return SectionResult(class_number=str(class_number), section=section)
+
+    for result in asyncio.as_completed([get_result(class_number) for class_number in class_numbers]):
+        yield await result
+
+
+def _get_section_result(term: str, class_number: str | int) -> SectionResult:
+    try:
+        return SectionResult(class_number=str(class_number), section=get_section_details(term, class_number))
+    except Exception as e:
+        return SectionResult(class_number=str(class_number), error=e)
+
+
+@observe.parser("course.section_details")
+def _parse_section_details(term: str, class_number: str | int, json_response: JSON) -> Section:
     details = json_response["section_info"]["class_details"]
     meetings = json_response["section_info"]["meetings"]
     enrollment = json_response["section_info"]["class_availability"]
@@ -328,6 +632,145 @@ def get_section_details(term: str | int, class_number: str | int) -> Section:
     )
 
 
+class SectionWatcher:
+    """Polls a set of sections and reports whenever their status, open seats or wait list size changes.
+
+    Each section is polled on its own schedule: every `fast_interval` seconds while it has `nearly_full_seats` or
+    fewer seats left, every `slow_interval` seconds while it's closed or nobody is enrolled in it, and every `interval`
+    seconds otherwise. The first poll of a section only records its state, it never produces a change.
+
+    Changes are returned by poll(), passed to `callback` if one is given, and yielded when iterating over the watcher,
+    which polls forever and sleeps until the next section is due.
+    """
+
+    def __init__(
+        self,
+        term: str | int,
+        class_numbers: Iterable[str | int],
+        callback: Callable[[SectionChange], Any] | None = None,
+        interval: float = 60.0,
+        fast_interval: float = 15.0,
+        slow_interval: float = 300.0,
+        nearly_full_seats: int = 5,
+        max_workers: int = POOL_SIZE,
+    ):
+        self.term = _validate_term(term)
+        self.callback = callback
+        self.interval = interval
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.nearly_full_seats = nearly_full_seats
+        self.max_workers = max_workers
+        self.states: dict[str, EnrollmentState] = {}
+        self._next_poll = {str(class_number): 0.0 for class_number in class_numbers}
+
+    def poll(self, now: float | None = None) -> list[SectionChange]:
+        """Fetches every section that is due and returns the changes since each one was last seen."""
+        if now is None:
+            now = time.monotonic()
+        due = [class_number for class_number, next_poll in self._next_poll.items() if next_poll <= now]
+
+        changes = []
+        for result in get_sections_details(self.term, due, self.max_workers):
+            if result.section is None:
+                warnings.warn(f"Failed to poll section {result.class_number}: {result.error}")
+                self._next_poll[result.class_number] = now + self.interval
+                continue
+
+            state = _get_enrollment_state(result.section)
+            previous = self.states.get(result.class_number)
+            self.states[result.class_number] = state
+            self._next_poll[result.class_number] = now + self._get_poll_interval(result.section)
+            if previous is not None and previous != state:
+                change = SectionChange(
+                    class_number=result.class_number, previous=previous, current=state, section=result.section
+                )
+                changes.append(change)
+                if self.callback is not None:
+                    self.callback(change)
+        return changes
+
+    def next_poll_in(self, now: float | None = None) -> float:
+        """Returns the number of seconds until the next section is due to be polled."""
+        if now is None:
+            now = time.monotonic()
+        return max(0.0, min(self._next_poll.values(), default=now) - now)
+
+    def __iter__(self) -> Iterator[SectionChange]:
+        while True:
+            yield from self.poll()
+            time.sleep(self.next_poll_in())
+
+    def _get_poll_interval(self, section: Section) -> float:
+        assert section.details
+        enrollment_available = _to_int(section.details.enrollment_available)
+        enrollment_total = _to_int(section.details.enrollment_total)
+        if section.status.lower() == "closed" or enrollment_total == 0:
+            return self.slow_interval
+        if enrollment_available <= self.nearly_full_seats:
+            return self.fast_interval
+        return self.interval
+
+
+def _get_enrollment_state(section: Section) -> EnrollmentState:
+    assert section.details
+    return EnrollmentState(
+        status=sys.intern(section.status),
+        enrollment_available=str(section.details.enrollment_available),
+        wait_list_total=str(section.details.wait_list_total),
+    )
+
+
+def _to_int(value: str | int) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+def get_subject_codes_stats() -> RegistryStats:
+    """Returns hit/miss/refresh counters for the process-wide subject code registry."""
+    with _subject_codes_lock:
+        return RegistryStats(hits=_subject_codes_hits, misses=_subject_codes_misses, refreshes=_subject_codes_refreshes)
+
+
+def get_coalescing_stats() -> CoalescingStats:
+    """Returns how many PeopleSoft requests were sent, and how many calls instead shared an identical in-flight one."""
+    with _in_flight_lock:
+        return CoalescingStats(requests=_upstream_requests, coalesced=_coalesced_requests)
+
+
+def warm_course_id_index(term: str | int, subjects: list[str] | None = None) -> int:
+    """Preloads the course ID index for the given subjects (all subjects if None) so that later calls to
+    get_course_details for this term don't need to fetch the subject's course catalog.
+
+    Returns the number of subjects that are now indexed for the term."""
+    term = _validate_term(term)
+    if subjects is None:
+        subjects = sorted(_get_subject_codes())
+    else:
+        subjects = [_validate_subject(subject) for subject in subjects]
+
+    # Each subject is a single catalog request, so they can all be issued concurrently
+    list(_executor.map(lambda subject: _get_internal_id_dict(term, subject), subjects))
+
+    with _course_id_index_lock:
+        return len(_course_id_index.get(term, {}))
+
+
+def invalidate_course_id_index(term: str | int | None = None) -> None:
+    """Drops the indexed course IDs for a term, or for every term if no term is given. The catalogs of the dropped
+    subjects are fetched again the next time they're indexed, instead of being read from the response cache."""
+    with _course_id_index_lock:
+        if term is None:
+            dropped = list(_course_id_index.values())
+            _course_id_index.clear()
+        else:
+            dropped = [_course_id_index.pop(str(term), {})]
+        for subjects in dropped:
+            _outdated_subject_courses.update(subjects)
+
+
 # validation for method inputs
 def _validate_term(term: str | int) -> str:
     """Validates that the term entered follows the pattern that Pitt does for term codes."""
@@ -336,9 +779,12 @@ def _validate_term(term: str | int) -> str:
     raise ValueError("Term entered isn't a valid Pitt term, must match regex " + TERM_REGEX)
 
 
-def _validate_subject(subject: str) -> str:
-    """Validates that the subject code entered is present in the API request."""
-    if subject in _get_subject_codes():
+def _validate_subject(subject: str, subject_codes: frozenset[str] | None = None) -> str:
+    """Validates that the subject code entered is present in the API request. Async callers pass in the subject codes,
+    since fetching them here would block."""
+    if subject_codes is None:
+        subject_codes = _get_subject_codes()
+    if subject in subject_codes:
         return subject
     raise ValueError("Subject code entered isn't a valid Pitt subject code.")
 
@@ -360,57 +806,265 @@ def _validate_course(course: str | int) -> str:
 
 
 # peoplesoft api calls
-def _get_subjects() -> JSON:
-    response: JSON = requests.get(SUBJECTS_API).json()
+def _get_json(url: str) -> JSON:
+    """Fetches a PeopleSoft URL, sharing the response with every other thread that asks for the same URL while the
+    request is in flight. Callers must treat the returned JSON as read-only, since it may be shared."""
+    global _upstream_requests, _coalesced_requests
+    with _in_flight_lock:
+        in_flight = _in_flight.get(url)
+        if in_flight is not None:
+            _coalesced_requests += 1
+        else:
+            _upstream_requests += 1
+            future: Future[JSON] = Future()
+            _in_flight[url] = future
+    if in_flight is not None:
+        return in_flight.result()
+
+    try:
+        rate_limiter = _crawl_rate_limiter.get()
+        if rate_limiter is not None:
+            rate_limiter.wait(url)
+        response: JSON = transport.get_json(url)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(response)
+    finally:
+        with _in_flight_lock:
+            del _in_flight[url]
     return response
 
 
+async def _get_json_async(url: str) -> JSON:
+    """The async version of _get_json, which shares the response with every other task in the same event loop that asks
+    for the same URL while the request is in flight.
+
+    The request runs in a task of its own, which every caller awaits through a shield, so that cancelling one caller
+    doesn't cancel it for the others. It's only cancelled once every caller has been."""
+    global _upstream_requests, _coalesced_requests
+    key = (asyncio.get_running_loop(), url)
+    with _in_flight_lock:
+        fetch = _in_flight_async.get(key)
+        if fetch is not None:
+            _coalesced_requests += 1
+        else:
+            _upstream_requests += 1
+            fetch = _in_flight_async[key] = _AsyncFetch(asyncio.create_task(_fetch_json_async(key)))
+        fetch.waiters += 1
+
+    try:
+        return await asyncio.shield(fetch.task)
+    finally:
+        with _in_flight_lock:
+            fetch.waiters -= 1
+            abandoned = fetch.waiters == 0 and not fetch.task.done()
+            if abandoned and _in_flight_async.get(key) is fetch:
+                # Callers arriving from now on start a new request instead of waiting for the cancelled one
+                del _in_flight_async[key]
+        if abandoned:
+            fetch.task.cancel()
+
+
+async def _fetch_json_async(key: tuple[asyncio.AbstractEventLoop, str]) -> JSON:
+    try:
+        response: JSON = await transport.get_json_async(key[1])
+        return response
+    finally:
+        with _in_flight_lock:
+            fetch = _in_flight_async.get(key)
+            if fetch is not None and fetch.task is asyncio.current_task():
+                del _in_flight_async[key]
+
+
+@cached("course.subjects")
+def _get_subjects() -> JSON:
+    return _get_json(SUBJECTS_API)
+
+
+@cached("course.subjects")
+async def _get_subjects_async() -> JSON:
+    return await _get_json_async(SUBJECTS_API)
+
+
+@cached("course.subject_courses")
 def _get_subject_courses(subject: str) -> JSON:
-    response: JSON = requests.get(SUBJECT_COURSES_API.format(subject=subject)).json()
-    return response
+    return _get_json(SUBJECT_COURSES_API.format(subject=subject))
+
+
+@cached("course.subject_courses")
+async def _get_subject_courses_async(subject: str) -> JSON:
+    return await _get_json_async(SUBJECT_COURSES_API.format(subject=subject))
 
 
+@cached("course.course_info")
 def _get_course_info(course_id: str) -> JSON:
-    response: JSON = requests.get(COURSE_DETAIL_API.format(id=course_id)).json()
+    return _check_course_info(_get_json(COURSE_DETAIL_API.format(id=course_id)))
+
+
+@cached("course.course_info")
+async def _get_course_info_async(course_id: str) -> JSON:
+    return _check_course_info(await _get_json_async(COURSE_DETAIL_API.format(id=course_id)))
+
+
+def _get_course_sections(course_id: str, term: str) -> JSON:
+    return _check_course_sections(_get_json(COURSE_SECTIONS_API.format(id=course_id, term=term)))
+
+
+async def _get_course_sections_async(course_id: str, term: str) -> JSON:
+    return _check_course_sections(await _get_json_async(COURSE_SECTIONS_API.format(id=course_id, term=term)))
+
+
+def _get_section_details(term: str | int, section_id: str | int) -> JSON:
+    return _check_section_details(_get_json(SECTION_DETAILS_API.format(term=term, id=section_id)))
+
+
+async def _get_section_details_async(term: str | int, section_id: str | int) -> JSON:
+    return _check_section_details(await _get_json_async(SECTION_DETAILS_API.format(term=term, id=section_id)))
+
+
+def _check_course_info(response: JSON) -> JSON:
     if response["course_details"] == {}:
         raise ValueError("Invalid course ID; course with that ID does not exist")
     return response
 
 
-def _get_course_sections(course_id: str, term: str) -> JSON:
-    response: JSON = requests.get(COURSE_SECTIONS_API.format(id=course_id, term=term)).json()
+def _check_course_sections(response: JSON) -> JSON:
     if len(response["sections"]) == 0:
         raise ValueError("Invalid course ID; course with that ID does not exist")
     return response
 
 
-def _get_section_details(term: str | int, section_id: str | int) -> JSON:
-    response: JSON = requests.get(SECTION_DETAILS_API.format(term=term, id=section_id)).json()
+def _check_section_details(response: JSON) -> JSON:
     if "error" in response:
         raise ValueError("Invalid section ID; section with that ID does not exist")
     return response
 
 
 # operations from api calls
-def _get_subject_codes() -> list[str]:
-    response = _get_subjects()
-    codes = []
-    for subject in response["subjects"]:
-        codes.append(subject["subject"])
+def _get_subject_codes() -> frozenset[str]:
+    """Returns the cached set of subject codes, fetching them on first use and refreshing them in the background once
+    they're older than SUBJECT_CODES_TTL. Callers never block on a refresh; they get the stale set until it completes."""
+    codes = _get_cached_subject_codes()
+    if codes is None:
+        # Only one thread performs the initial fetch, the rest wait for it and reuse its result
+        with _subject_codes_load_lock:
+            codes = _subject_codes
+            if codes is None:
+                codes = _update_subject_codes()
+    return codes
+
+
+async def _get_subject_codes_async() -> frozenset[str]:
+    codes = _get_cached_subject_codes()
+    if codes is None:
+        # Concurrent tasks share the in-flight request through _get_json_async
+        codes = _store_subject_codes(await _get_subjects_async())
     return codes
 
 
-def _get_internal_id_dict(subject: str) -> dict[str, str]:
-    response = _get_subject_courses(subject)
+def _get_cached_subject_codes() -> frozenset[str] | None:
+    """Returns the cached subject codes, if any, starting a background refresh if they've expired."""
+    global _subject_codes_hits, _subject_codes_misses, _subject_codes_refresh_thread
+    with _subject_codes_lock:
+        codes = _subject_codes
+        if codes is None:
+            _subject_codes_misses += 1
+        else:
+            _subject_codes_hits += 1
+            expired = time.monotonic() - _subject_codes_updated_at >= SUBJECT_CODES_TTL
+            if expired and _subject_codes_refresh_thread is None:
+                _subject_codes_refresh_thread = threading.Thread(target=_refresh_subject_codes, daemon=True)
+                _subject_codes_refresh_thread.start()
+    return codes
+
+
+def _update_subject_codes(refresh: bool = False) -> frozenset[str]:
+    return _store_subject_codes(_get_subjects.refresh() if refresh else _get_subjects())  # type: ignore[attr-defined]
+
+
+def _store_subject_codes(response: JSON) -> frozenset[str]:
+    global _subject_codes, _subject_codes_updated_at, _subject_codes_refreshes
+    codes = frozenset(subject["subject"] for subject in response["subjects"])
+    with _subject_codes_lock:
+        _subject_codes = codes
+        _subject_codes_updated_at = time.monotonic()
+        _subject_codes_refreshes += 1
+    return codes
+
+
+def _refresh_subject_codes() -> None:
+    global _subject_codes_refresh_thread
+    try:
+        # The response cache keeps subjects for longer than SUBJECT_CODES_TTL, so go around it
+        _update_subject_codes(refresh=True)
+    except Exception as e:  # Keep serving the stale codes, the next lookup will try again
+        warnings.warn(f"Failed to refresh subject codes: {e}")
+    finally:
+        with _subject_codes_lock:
+            _subject_codes_refresh_thread = None
+
+
+def _reset_subject_codes() -> None:
+    """Drops the cached subject codes and zeroes the registry counters."""
+    global _subject_codes, _subject_codes_updated_at, _subject_codes_hits, _subject_codes_misses, _subject_codes_refreshes
+    with _subject_codes_lock:
+        _subject_codes = None
+        _subject_codes_updated_at = 0.0
+        _subject_codes_hits = _subject_codes_misses = _subject_codes_refreshes = 0
+
+
+def _reset_course_id_index() -> None:
+    """Drops the whole course ID index, without refetching the dropped catalogs."""
+    with _course_id_index_lock:
+        _course_id_index.clear()
+        _outdated_subject_courses.clear()
+
+
+def _get_internal_id_dict(term: str, subject: str) -> dict[str, str]:
+    with _course_id_index_lock:
+        internal_id_dict = _course_id_index.get(term, {}).get(subject)
+        outdated = subject in _outdated_subject_courses
+    if internal_id_dict is not None:
+        return internal_id_dict
+    if outdated:
+        response = _get_subject_courses.refresh(subject)  # type: ignore[attr-defined]
+    else:
+        response = _get_subject_courses(subject)
+    return _index_subject_courses(term, subject, response)
+
+
+async def _get_internal_id_dict_async(term: str, subject: str) -> dict[str, str]:
+    with _course_id_index_lock:
+        internal_id_dict = _course_id_index.get(term, {}).get(subject)
+        outdated = subject in _outdated_subject_courses
+    if internal_id_dict is not None:
+        return internal_id_dict
+    if outdated:
+        response = await _get_subject_courses_async.refresh(subject)  # type: ignore[attr-defined]
+    else:
+        response = await _get_subject_courses_async(subject)
+    return _index_subject_courses(term, subject, response)
+
+
+def _index_subject_courses(term: str, subject: str, response: JSON) -> dict[str, str]:
     internal_id_dict = {}
     for course in response["courses"]:
         if course["catalog_nbr"] not in internal_id_dict:
             internal_id_dict[course["catalog_nbr"]] = course["crse_id"]
-    return internal_id_dict
+
+    with _course_id_index_lock:
+        _outdated_subject_courses.discard(subject)
+        # Another thread may have indexed the subject while we were fetching it, in which case keep its copy
+        return _course_id_index.setdefault(term, {}).setdefault(subject, internal_id_dict)
+
+
+def _get_course_id(term: str, subject: str, course: str) -> str:
+    return _find_course_id(_get_internal_id_dict(term, subject), course)
 
 
-def _get_course_id(subject: str, course: str) -> str:
-    subject_dict = _get_internal_id_dict(subject)
+def _find_course_id(subject_dict: dict[str, str], course: str) -> str:
     if str(course) not in subject_dict:
         raise ValueError("No course with that number within listed subject")
     return subject_dict[str(course)]
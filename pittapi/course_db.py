@@ -0,0 +1,526 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from typing import Any, Iterable
+
+from pittapi import course
+from pittapi.course import Attribute, Component, Course, CourseDetails, Instructor, Meeting, Section, Subject
+from pittapi.schedule import get_day_mask, parse_time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subjects (
+    subject_code TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS courses (
+    subject_code TEXT NOT NULL,
+    course_number TEXT NOT NULL,
+    course_id TEXT NOT NULL,
+    course_title TEXT NOT NULL,
+    PRIMARY KEY (subject_code, course_number)
+);
+CREATE TABLE IF NOT EXISTS course_details (
+    term TEXT NOT NULL,
+    subject_code TEXT NOT NULL,
+    course_number TEXT NOT NULL,
+    course_id TEXT NOT NULL,
+    course_title TEXT NOT NULL,
+    course_description TEXT,
+    credits_min INTEGER,
+    credits_max INTEGER,
+    requisites TEXT,
+    PRIMARY KEY (term, subject_code, course_number)
+);
+CREATE TABLE IF NOT EXISTS components (
+    term TEXT NOT NULL,
+    subject_code TEXT NOT NULL,
+    course_number TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    component TEXT NOT NULL,
+    required INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS components_course ON components (term, subject_code, course_number);
+CREATE TABLE IF NOT EXISTS attributes (
+    term TEXT NOT NULL,
+    subject_code TEXT NOT NULL,
+    course_number TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    attribute TEXT NOT NULL,
+    attribute_description TEXT NOT NULL,
+    value TEXT NOT NULL,
+    value_description TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attributes_course ON attributes (term, subject_code, course_number);
+CREATE INDEX IF NOT EXISTS attributes_value ON attributes (term, attribute, value);
+CREATE TABLE IF NOT EXISTS sections (
+    term TEXT NOT NULL,
+    class_number TEXT NOT NULL,
+    subject_code TEXT NOT NULL,
+    course_number TEXT NOT NULL,
+    session TEXT NOT NULL,
+    section_number TEXT NOT NULL,
+    section_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (term, class_number)
+);
+CREATE INDEX IF NOT EXISTS sections_course ON sections (term, subject_code, course_number);
+CREATE TABLE IF NOT EXISTS meetings (
+    term TEXT NOT NULL,
+    class_number TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    days TEXT NOT NULL,
+    day_mask INTEGER NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    start_minute INTEGER,
+    end_minute INTEGER,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS meetings_section ON meetings (term, class_number);
+CREATE INDEX IF NOT EXISTS meetings_time ON meetings (term, start_minute, end_minute);
+CREATE TABLE IF NOT EXISTS instructors (
+    term TEXT NOT NULL,
+    class_number TEXT NOT NULL,
+    meeting_position INTEGER,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    email TEXT
+);
+CREATE INDEX IF NOT EXISTS instructors_section ON instructors (term, class_number);
+CREATE INDEX IF NOT EXISTS instructors_name ON instructors (term, name_lower);
+CREATE TABLE IF NOT EXISTS subject_refreshes (
+    term TEXT NOT NULL,
+    subject_code TEXT NOT NULL,
+    refreshed_at REAL NOT NULL,
+    PRIMARY KEY (term, subject_code)
+);
+"""
+
+
+class CourseDatabase:
+    """Local SQLite copy of course data that can be queried without any network requests.
+
+    Data is added with refresh_subject/refresh_term, which fetch from PeopleSoft one subject at a time and replace only
+    that subject's rows, or with the store_* methods for data that was already fetched elsewhere.
+    """
+
+    def __init__(self, path: str | os.PathLike[str] = ":memory:"):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> CourseDatabase:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def refresh_subject(self, term: str | int, subject: str, concurrency: int = course.POOL_SIZE // 2) -> int:
+        """Fetches one subject's catalog and every offered course in the term, replacing what was stored for it.
+
+        Returns the number of courses stored for the subject."""
+        term = course._validate_term(term)
+        subject_obj = course.get_subject_courses(subject)
+        courses_details = list(course.crawl_term(term, subjects=[subject_obj.subject_code], concurrency=concurrency))
+        with self.connection:
+            self._delete_subject(term, subject_obj.subject_code)
+            self._insert_subject(subject_obj)
+            for course_details in courses_details:
+                self._insert_course_details(term, course_details)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO subject_refreshes VALUES (?, ?, ?)", (term, subject_obj.subject_code, time.time())
+            )
+        return len(courses_details)
+
+    def refresh_term(self, term: str | int, subjects: Iterable[str] | None = None, max_age: float | None = None) -> list[str]:
+        """Refreshes every given subject (all subjects if None) in the term, skipping subjects that were refreshed less
+        than `max_age` seconds ago. Returns the subjects that were refreshed."""
+        term = course._validate_term(term)
+        if subjects is None:
+            subjects = sorted(course._get_subject_codes())
+
+        refreshed = []
+        for subject in subjects:
+            if max_age is not None:
+                refreshed_at = self.get_refreshed_at(term, subject)
+                if refreshed_at is not None and time.time() - refreshed_at < max_age:
+                    continue
+            self.refresh_subject(term, subject)
+            refreshed.append(subject)
+        return refreshed
+
+    def get_refreshed_at(self, term: str | int, subject: str) -> float | None:
+        """Returns the Unix time at which the subject was last refreshed for the term, or None if it never was."""
+        row = self.connection.execute(
+            "SELECT refreshed_at FROM subject_refreshes WHERE term = ? AND subject_code = ?", (str(term), subject)
+        ).fetchone()
+        return row[0] if row else None
+
+    def store_subject(self, subject: Subject) -> None:
+        with self.connection:
+            self.connection.execute("DELETE FROM courses WHERE subject_code = ?", (subject.subject_code,))
+            self._insert_subject(subject)
+
+    def store_course_details(self, term: str | int, course_details: CourseDetails) -> None:
+        term = str(term)
+        course_obj = course_details.course
+        with self.connection:
+            self._delete_course(term, course_obj.subject_code, course_obj.course_number)
+            self._insert_course_details(term, course_details)
+
+    def get_subject(self, subject: str) -> Subject | None:
+        rows = self.connection.execute(
+            "SELECT subject_code, course_number, course_id, course_title FROM courses WHERE subject_code = ? "
+            "ORDER BY course_number",
+            (subject,),
+        ).fetchall()
+        if not rows:
+            return None
+        return Subject(subject_code=subject, courses={row[1]: Course(*row) for row in rows})
+
+    def get_course_details(self, term: str | int, subject: str, course_number: str) -> CourseDetails | None:
+        term = str(term)
+        row = self.connection.execute(
+            "SELECT subject_code, course_number, course_id, course_title, course_description, credits_min, credits_max, "
+            "requisites FROM course_details WHERE term = ? AND subject_code = ? AND course_number = ?",
+            (term, subject, course_number),
+        ).fetchone()
+        if row is None:
+            return None
+
+        components = [
+            Component(component=component, required=bool(required))
+            for component, required in self.connection.execute(
+                "SELECT component, required FROM components WHERE term = ? AND subject_code = ? AND course_number = ? "
+                "ORDER BY position",
+                (term, subject, course_number),
+            )
+        ]
+        attributes = [
+            Attribute(*attribute_row)
+            for attribute_row in self.connection.execute(
+                "SELECT attribute, attribute_description, value, value_description FROM attributes "
+                "WHERE term = ? AND subject_code = ? AND course_number = ? ORDER BY position",
+                (term, subject, course_number),
+            )
+        ]
+        sections = self.find_sections(term, subject=subject, course_number=course_number)
+
+        credit_range = None if row[5] is None else (row[5], row[6])
+        return CourseDetails(
+            course=Course(*row[:4]),
+            course_description=row[4],
+            credit_range=credit_range,
+            requisites=row[7],
+            components=components or None,
+            attributes=attributes or None,
+            sections=sections,
+        )
+
+    def find_courses(
+        self,
+        term: str | int,
+        subject: str | None = None,
+        instructor: str | None = None,
+        attribute: str | None = None,
+        attribute_value: str | None = None,
+    ) -> list[Course]:
+        """Returns the courses offered in the term that match every given filter.
+
+        `instructor` matches any part of an instructor's name, case-insensitively. `attribute` and `attribute_value`
+        match course attributes exactly (e.g. attribute="DSGE", attribute_value="ALG")."""
+        conditions, params = self._course_conditions("c", term, subject, None, attribute, attribute_value)
+        if instructor is not None:
+            conditions.append(
+                "EXISTS (SELECT 1 FROM sections s JOIN instructors i ON i.term = s.term AND i.class_number = s.class_number "
+                "WHERE s.term = c.term AND s.subject_code = c.subject_code AND s.course_number = c.course_number "
+                "AND i.name_lower LIKE ?)"
+            )
+            params.append(f"%{instructor.lower()}%")
+        rows = self.connection.execute(
+            "SELECT c.subject_code, c.course_number, c.course_id, c.course_title FROM course_details c "
+            f"WHERE {' AND '.join(conditions)} ORDER BY c.subject_code, c.course_number",
+            params,
+        )
+        return [Course(*row) for row in rows]
+
+    def find_sections(
+        self,
+        term: str | int,
+        subject: str | None = None,
+        course_number: str | None = None,
+        days: str | None = None,
+        after: str | None = None,
+        before: str | None = None,
+        instructor: str | None = None,
+        attribute: str | None = None,
+        attribute_value: str | None = None,
+        status: str | None = None,
+    ) -> list[Section]:
+        """Returns the sections in the term that match every given filter.
+
+        `days` (e.g. "MoWe") keeps sections that only meet on those days. `after` and `before` (e.g. "10:00" or
+        "2:30PM") keep sections whose meetings all start at or after / end at or before that time. `instructor`
+        matches any part of an instructor's name, case-insensitively."""
+        term = str(term)
+        conditions, params = self._course_conditions("s", term, subject, course_number, attribute, attribute_value)
+        if status is not None:
+            conditions.append("s.status = ?")
+            params.append(status)
+
+        meeting_conditions = []
+        if days is not None:
+            meeting_conditions.append("(m.day_mask & ~?) = 0")
+            params.append(get_day_mask(days))
+        if after is not None:
+            meeting_conditions.append("m.start_minute >= ?")
+            params.append(_get_time_filter(after))
+        if before is not None:
+            meeting_conditions.append("m.end_minute <= ?")
+            params.append(_get_time_filter(before))
+        if meeting_conditions:
+            # Every meeting has to satisfy the filters, and there has to be at least one meeting
+            meeting_filter = " AND ".join(meeting_conditions)
+            conditions.append(
+                "EXISTS (SELECT 1 FROM meetings m WHERE m.term = s.term AND m.class_number = s.class_number) "
+                "AND NOT EXISTS (SELECT 1 FROM meetings m WHERE m.term = s.term AND m.class_number = s.class_number "
+                f"AND NOT ({meeting_filter} AND m.start_minute IS NOT NULL))"
+            )
+        if instructor is not None:
+            conditions.append(
+                "EXISTS (SELECT 1 FROM instructors i WHERE i.term = s.term AND i.class_number = s.class_number "
+                "AND i.name_lower LIKE ?)"
+            )
+            params.append(f"%{instructor.lower()}%")
+
+        rows = self.connection.execute(
+            "SELECT s.term, s.session, s.section_number, s.class_number, s.section_type, s.status FROM sections s "
+            f"WHERE {' AND '.join(conditions)} ORDER BY s.subject_code, s.course_number, s.section_number",
+            params,
+        ).fetchall()
+        return self._load_sections(term, rows)
+
+    def _course_conditions(
+        self,
+        alias: str,
+        term: str | int,
+        subject: str | None,
+        course_number: str | None,
+        attribute: str | None,
+        attribute_value: str | None,
+    ) -> tuple[list[str], list[Any]]:
+        conditions = [f"{alias}.term = ?"]
+        params: list[Any] = [str(term)]
+        if subject is not None:
+            conditions.append(f"{alias}.subject_code = ?")
+            params.append(subject)
+        if course_number is not None:
+            conditions.append(f"{alias}.course_number = ?")
+            params.append(course_number)
+        if attribute is not None or attribute_value is not None:
+            attribute_conditions = [
+                f"a.term = {alias}.term",
+                f"a.subject_code = {alias}.subject_code",
+                f"a.course_number = {alias}.course_number",
+            ]
+            if attribute is not None:
+                attribute_conditions.append("a.attribute = ?")
+                params.append(attribute)
+            if attribute_value is not None:
+                attribute_conditions.append("a.value = ?")
+                params.append(attribute_value)
+            conditions.append(f"EXISTS (SELECT 1 FROM attributes a WHERE {' AND '.join(attribute_conditions)})")
+        return conditions, params
+
+    def _load_sections(self, term: str, rows: list[tuple[str, ...]]) -> list[Section]:
+        if not rows:
+            return []
+        class_numbers = [row[3] for row in rows]
+        placeholders = ", ".join("?" * len(class_numbers))
+
+        section_instructors: dict[str, list[Instructor]] = {}
+        meeting_instructors: dict[tuple[str, int], list[Instructor]] = {}
+        for class_number, meeting_position, name, email in self.connection.execute(
+            "SELECT class_number, meeting_position, name, email FROM instructors "
+            f"WHERE term = ? AND class_number IN ({placeholders}) ORDER BY position",
+            [term, *class_numbers],
+        ):
+            if meeting_position is None:
+                section_instructors.setdefault(class_number, []).append(Instructor(name=name, email=email))
+            else:
+                meeting_instructors.setdefault((class_number, meeting_position), []).append(Instructor(name=name, email=email))
+
+        meetings: dict[str, list[Meeting]] = {}
+        for class_number, position, days, start_time, end_time, start_date, end_date in self.connection.execute(
+            "SELECT class_number, position, days, start_time, end_time, start_date, end_date FROM meetings "
+            f"WHERE term = ? AND class_number IN ({placeholders}) ORDER BY position",
+            [term, *class_numbers],
+        ):
+            meetings.setdefault(class_number, []).append(
+                Meeting(
+                    days=days,
+                    start_time=start_time,
+                    end_time=end_time,
+                    start_date=start_date,
+                    end_date=end_date,
+                    instructors=meeting_instructors.get((class_number, position)),
+                )
+            )
+
+        return [
+            Section(
+                term=row[0],
+                session=row[1],
+                section_number=row[2],
+                class_number=row[3],
+                section_type=row[4],
+                status=row[5],
+                instructors=section_instructors.get(row[3]),
+                meetings=meetings.get(row[3]),
+            )
+            for row in rows
+        ]
+
+    def _delete_subject(self, term: str, subject: str) -> None:
+        for table in ("instructors", "meetings"):
+            self.connection.execute(
+                f"DELETE FROM {table} WHERE term = ? AND class_number IN "
+                "(SELECT class_number FROM sections WHERE term = ? AND subject_code = ?)",
+                (term, term, subject),
+            )
+        for table in ("sections", "attributes", "components", "course_details"):
+            self.connection.execute(f"DELETE FROM {table} WHERE term = ? AND subject_code = ?", (term, subject))
+        self.connection.execute("DELETE FROM courses WHERE subject_code = ?", (subject,))
+
+    def _delete_course(self, term: str, subject: str, course_number: str) -> None:
+        for table in ("instructors", "meetings"):
+            self.connection.execute(
+                f"DELETE FROM {table} WHERE term = ? AND class_number IN "
+                "(SELECT class_number FROM sections WHERE term = ? AND subject_code = ? AND course_number = ?)",
+                (term, term, subject, course_number),
+            )
+        for table in ("sections", "attributes", "components", "course_details"):
+            self.connection.execute(
+                f"DELETE FROM {table} WHERE term = ? AND subject_code = ? AND course_number = ?",
+                (term, subject, course_number),
+            )
+
+    def _insert_subject(self, subject: Subject) -> None:
+        self.connection.execute("INSERT OR IGNORE INTO subjects VALUES (?)", (subject.subject_code,))
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO courses VALUES (?, ?, ?, ?)",
+            [tuple(course_obj) for course_obj in subject.courses.values()],
+        )
+
+    def _insert_course_details(self, term: str, course_details: CourseDetails) -> None:
+        course_obj = course_details.course
+        key = (term, course_obj.subject_code, course_obj.course_number)
+        credits_min, credits_max = course_details.credit_range or (None, None)
+        self.connection.execute("INSERT OR IGNORE INTO subjects VALUES (?)", (course_obj.subject_code,))
+        self.connection.execute("INSERT OR IGNORE INTO courses VALUES (?, ?, ?, ?)", tuple(course_obj))
+        self.connection.execute(
+            "INSERT OR REPLACE INTO course_details VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                *key,
+                course_obj.course_id,
+                course_obj.course_title,
+                course_details.course_description,
+                credits_min,
+                credits_max,
+                course_details.requisites,
+            ),
+        )
+        self.connection.executemany(
+            "INSERT INTO components VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (*key, position, component.component, int(component.required))
+                for position, component in enumerate(course_details.components or [])
+            ],
+        )
+        self.connection.executemany(
+            "INSERT INTO attributes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(*key, position, *attribute) for position, attribute in enumerate(course_details.attributes or [])],
+        )
+        for section in course_details.sections or []:
+            self._insert_section(term, course_obj, section)
+
+    def _insert_section(self, term: str, course_obj: Course, section: Section) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO sections VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                term,
+                section.class_number,
+                course_obj.subject_code,
+                course_obj.course_number,
+                section.session,
+                section.section_number,
+                section.section_type,
+                section.status,
+            ),
+        )
+        instructor_rows = [
+            (term, section.class_number, None, position, instructor.name, instructor.name.lower(), instructor.email)
+            for position, instructor in enumerate(section.instructors or [])
+        ]
+        meeting_rows = []
+        for meeting_position, meeting in enumerate(section.meetings or []):
+            meeting_rows.append(
+                (
+                    term,
+                    section.class_number,
+                    meeting_position,
+                    meeting.days,
+                    get_day_mask(meeting.days),
+                    meeting.start_time,
+                    meeting.end_time,
+                    parse_time(meeting.start_time),
+                    parse_time(meeting.end_time),
+                    meeting.start_date,
+                    meeting.end_date,
+                )
+            )
+            instructor_rows.extend(
+                (
+                    term,
+                    section.class_number,
+                    meeting_position,
+                    position,
+                    instructor.name,
+                    instructor.name.lower(),
+                    instructor.email,
+                )
+                for position, instructor in enumerate(meeting.instructors or [])
+            )
+        self.connection.executemany("INSERT INTO meetings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", meeting_rows)
+        self.connection.executemany("INSERT INTO instructors VALUES (?, ?, ?, ?, ?, ?, ?)", instructor_rows)
+
+
+def _get_time_filter(time_str: str) -> int:
+    minutes = parse_time(time_str)
+    if minutes is None:
+        raise ValueError(f"Invalid time: {time_str}. Expected a time like '10:00' or '2:30PM'")
+    return minutes
@@ -0,0 +1,206 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import os
+import re
+from typing import Any, NamedTuple
+
+from pittapi.course import Course, CourseDetails, Subject
+
+TOKEN_REGEX = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset(
+    {"a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or", "the", "to", "with"}
+)
+
+# Matches in a course's title or code count more than matches in its description or requisites
+FIELD_WEIGHTS = {"code": 3.0, "title": 3.0, "description": 1.0, "requisites": 1.0}
+# BM25 parameters, see https://en.wikipedia.org/wiki/Okapi_BM25
+K1 = 1.2
+B = 0.75
+
+INDEX_FORMAT_VERSION = 1
+
+
+class SearchResult(NamedTuple):
+    course: Course
+    score: float
+
+
+class CourseSearchIndex:
+    """In-memory inverted index over course codes, titles, descriptions and requisites with BM25 ranking.
+
+    Courses are keyed by subject code and course number, so adding a course that is already indexed replaces it.
+    """
+
+    def __init__(self) -> None:
+        self._courses: list[Course | None] = []
+        self._doc_ids: dict[tuple[str, str], int] = {}
+        self._doc_terms: list[dict[str, float]] = []
+        self._doc_lengths: list[float] = []
+        self._total_length = 0.0
+        self._postings: dict[str, dict[int, float]] = {}
+        # Both rebuilt lazily after the index changes: sorted terms for prefix lookups and BM25 length normalization
+        self._vocabulary: list[str] | None = None
+        self._length_norms: list[float] | None = None
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return key in self._doc_ids
+
+    def add_subject(self, subject: Subject) -> None:
+        """Indexes the code and title of every course in a subject, as returned by course.get_subject_courses."""
+        for course_obj in subject.courses.values():
+            self.add_course(course_obj)
+
+    def add_course(self, course: Course | CourseDetails) -> None:
+        """Indexes a single course, replacing it if it's already indexed.
+
+        A CourseDetails object also indexes the course's description and requisites."""
+        if isinstance(course, CourseDetails):
+            course_obj = course.course
+            fields = {"description": course.course_description or "", "requisites": course.requisites or ""}
+        else:
+            course_obj = course
+            fields = {}
+        subject_code, course_number = course_obj.subject_code, course_obj.course_number
+        fields["code"] = f"{subject_code} {course_number} {subject_code}{course_number}"
+        fields["title"] = course_obj.course_title
+
+        terms: dict[str, float] = {}
+        for field, text in fields.items():
+            for token in tokenize(text):
+                terms[token] = terms.get(token, 0.0) + FIELD_WEIGHTS[field]
+        self._add_document(course_obj, terms)
+
+    def remove_course(self, subject_code: str, course_number: str) -> bool:
+        """Removes a course from the index. Returns False if it wasn't indexed."""
+        doc_id = self._doc_ids.pop((subject_code, course_number), None)
+        if doc_id is None:
+            return False
+
+        for term in self._doc_terms[doc_id]:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                self._vocabulary = None
+        self._total_length -= self._doc_lengths[doc_id]
+        self._length_norms = None
+        self._courses[doc_id] = None
+        self._doc_terms[doc_id] = {}
+        self._doc_lengths[doc_id] = 0.0
+        return True
+
+    def search(self, query: str, limit: int | None = 10, prefix: bool = True) -> list[SearchResult]:
+        """Returns the courses matching any word in the query, best match first.
+
+        If `prefix` is True, each query word also matches longer words that start with it, e.g. "algo" matches
+        "algorithms". A document's score for a query word is the score of its best matching term."""
+        if not self._doc_ids:
+            return []
+
+        num_docs = len(self._doc_ids)
+        if self._length_norms is None:
+            average_length = self._total_length / num_docs
+            self._length_norms = [K1 * (1 - B + B * length / average_length) for length in self._doc_lengths]
+        length_norms = self._length_norms
+        scores: dict[int, float] = {}
+        for token in set(tokenize(query)):
+            token_scores: dict[int, float] = {}
+            for term in self._expand(token) if prefix else [token]:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    score = idf * frequency * (K1 + 1) / (frequency + length_norms[doc_id])
+                    if score > token_scores.get(doc_id, 0.0):
+                        token_scores[doc_id] = score
+            for doc_id, score in token_scores.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if limit is not None:
+            ranked = ranked[:limit]
+        results = []
+        for doc_id, score in ranked:
+            course_obj = self._courses[doc_id]
+            assert course_obj
+            results.append(SearchResult(course=course_obj, score=score))
+        return results
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        """Writes the index to a JSON file that can be read back with CourseSearchIndex.load."""
+        doc_ids = sorted(self._doc_ids.values())
+        data = {
+            "version": INDEX_FORMAT_VERSION,
+            "courses": [list(self._courses[doc_id] or ()) for doc_id in doc_ids],
+            "terms": [self._doc_terms[doc_id] for doc_id in doc_ids],
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> CourseSearchIndex:
+        with open(path) as f:
+            data: dict[str, Any] = json.load(f)
+        if data.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported search index version: {data.get('version')}")
+
+        index = cls()
+        for course_fields, terms in zip(data["courses"], data["terms"]):
+            index._add_document(Course(*course_fields), terms)
+        return index
+
+    def _add_document(self, course_obj: Course, terms: dict[str, float]) -> None:
+        self.remove_course(course_obj.subject_code, course_obj.course_number)
+
+        doc_id = len(self._courses)
+        self._courses.append(course_obj)
+        self._doc_ids[(course_obj.subject_code, course_obj.course_number)] = doc_id
+        self._doc_terms.append(terms)
+        length = sum(terms.values())
+        self._doc_lengths.append(length)
+        self._total_length += length
+        self._length_norms = None
+        for term, frequency in terms.items():
+            if term not in self._postings:
+                self._postings[term] = {}
+                self._vocabulary = None
+            self._postings[term][doc_id] = frequency
+
+    def _expand(self, token: str) -> list[str]:
+        """Returns every indexed term that starts with the token."""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect.bisect_left(self._vocabulary, token)
+        end = bisect.bisect_left(self._vocabulary, token + "\uffff", lo=start)
+        return self._vocabulary[start:end]
+
+
+def tokenize(text: str) -> list[str]:
+    """Splits text into lowercase alphanumeric words, dropping common English stop words."""
+    return [token for token in TOKEN_REGEX.findall(text.lower()) if token not in STOP_WORDS]
@@ -19,10 +19,14 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 
 from __future__ import annotations
 
-import requests
 from datetime import datetime
 from typing import Any
 
+import requests
+
+from pittapi import observe, transport
+from pittapi.cache import cached
+
 JSON = dict[str, Any]
 
 REQUEST_HEADERS = {"User-Agent": "Chrome/103.0.5026.0"}
@@ -70,14 +74,19 @@ HOURS_URL = "https://api.dineoncampus.com/v1/locations/weekly_schedule?site_id=5
 PERIODS_URL = "https://api.dineoncampus.com/v1/location/{location_id}/periods?platform=0&date={date_str}"
 MENU_URL = "https://api.dineoncampus.com/v1/location/{location_id}/periods/{period_id}?platform=0&date={date_str}"
 
+observe.register_endpoint("dining.locations", LOCATIONS_URL)
+observe.register_endpoint("dining.hours", HOURS_URL)
+observe.register_endpoint("dining.periods", PERIODS_URL)
+observe.register_endpoint("dining.menu", MENU_URL)
+
 
 def get_locations() -> dict[str, JSON]:
     """Gets data about all dining locations"""
-    resp = requests.get(LOCATIONS_URL, headers=REQUEST_HEADERS)
-    locations = resp.json()["locations"]
-    dining_locations = {location["name"].upper(): location for location in locations}
+    return _parse_locations(_get_locations_data())
 
-    return dining_locations
+
+async def get_locations_async() -> dict[str, JSON]:
+    return _parse_locations(await _get_locations_data_async())
 
 
 def get_location_hours(location_name: str | None = None, date: datetime | None = None) -> dict[str, list[dict[str, int]]]:
@@ -86,7 +95,74 @@ def get_location_hours(location_name: str | None = None, date: datetime | None =
     - if location_name is None, returns times for all locations
     - date must be in YYYY,MM,DD format, will return data on current day if None
     """
+    location_name, date_str = _validate_hours_args(location_name, date)
+    return _parse_location_hours(_get_hours_data(date_str), location_name, date_str)
+
+
+async def get_location_hours_async(
+    location_name: str | None = None, date: datetime | None = None
+) -> dict[str, list[dict[str, int]]]:
+    location_name, date_str = _validate_hours_args(location_name, date)
+    return _parse_location_hours(await _get_hours_data_async(date_str), location_name, date_str)
+
 
+def get_location_menu(location: str, date: datetime | None = None, period_name: str | None = None) -> JSON:
+    """Returns menu data for given dining location on given day/period
+    - period_name used for locations with different serving periods(i.e. 'Breakfast','Lunch','Dinner','Late Night')
+    - None -> Returns menu for first(or only) period at location
+    """
+    location, date_str, period_name = _validate_menu_args(location, date, period_name)
+    location_id = get_locations()[location]["id"]
+    try:
+        periods_resp = transport.conditional_get(
+            PERIODS_URL.format(location_id=location_id, date_str=date_str),
+            headers=REQUEST_HEADERS,
+        )
+    except requests.HTTPError as e:
+        _check_invalid_date(e)
+        raise
+    period_id = _find_period_id(periods_resp, period_name)
+
+    menu: JSON = transport.get_json(
+        MENU_URL.format(location_id=location_id, period_id=period_id, date_str=date_str),
+        headers=REQUEST_HEADERS,
+    )["menu"]
+
+    return menu
+
+
+async def get_location_menu_async(location: str, date: datetime | None = None, period_name: str | None = None) -> JSON:
+    location, date_str, period_name = _validate_menu_args(location, date, period_name)
+    location_id = (await get_locations_async())[location]["id"]
+    try:
+        periods_resp = await transport.conditional_get_async(
+            PERIODS_URL.format(location_id=location_id, date_str=date_str),
+            headers=REQUEST_HEADERS,
+        )
+    except Exception as e:
+        _check_invalid_date(e)
+        raise
+    period_id = _find_period_id(periods_resp, period_name)
+
+    menu: JSON = (
+        await transport.get_json_async(
+            MENU_URL.format(location_id=location_id, period_id=period_id, date_str=date_str),
+            headers=REQUEST_HEADERS,
+        )
+    )["menu"]
+
+    return menu
+
+
+@observe.parser("dining.locations")
+def _parse_locations(data: JSON) -> dict[str, JSON]:
+    locations = data["locations"]
+    dining_locations = {location["name"].upper(): location for location in locations}
+
+    return dining_locations
+
+
+def _validate_hours_args(location_name: str | None, date: datetime | None) -> tuple[str | None, str]:
     if location_name is not None:
         location_name = location_name.upper()
         if location_name not in LOCATIONS:
@@ -95,16 +171,12 @@ def get_location_hours(location_name: str | None = None, date: datetime | None =
     if date is None:
         date = datetime.now()
 
-    date_str = date.strftime("%Y-%m-%d")
-    resp = requests.get(
-        HOURS_URL.format(date_str=date_str),
-        headers=REQUEST_HEADERS,
-    )
+    return location_name, date.strftime("%Y-%m-%d")
 
-    if resp.status_code == 502:
-        raise ValueError("Invalid Date")
 
-    locations = resp.json()["the_locations"]
+@observe.parser("dining.hours")
+def _parse_location_hours(data: JSON, location_name: str | None, date_str: str) -> dict[str, list[dict[str, int]]]:
+    locations = data["the_locations"]
 
     if location_name is None:
         hours = {
@@ -120,11 +192,7 @@ def get_location_hours(location_name: str | None = None, date: datetime | None =
     return {}
 
 
-def get_location_menu(location: str, date: datetime | None = None, period_name: str | None = None) -> JSON:
-    """Returns menu data for given dining location on given day/period
-    - period_name used for locations with different serving periods(i.e. 'Breakfast','Lunch','Dinner','Late Night')
-    - None -> Returns menu for first(or only) period at location
-    """
+def _validate_menu_args(location: str, date: datetime | None, period_name: str | None) -> tuple[str, str, str | None]:
     location = location.upper()
     if location not in LOCATIONS:
         raise ValueError("Invalid Dining Location")
@@ -134,28 +202,63 @@ def get_location_menu(location: str, date: datetime | None = None, period_name:
     if period_name is not None:
         period_name = period_name.lower()
 
-    date_str = date.strftime("%y-%m-%d")
-    location_id = get_locations()[location]["id"]
-    periods_resp = requests.get(
-        PERIODS_URL.format(location_id=location_id, date_str=date_str),
-        headers=REQUEST_HEADERS,
-    )
+    return location, date.strftime("%y-%m-%d"), period_name
+
+
+def _check_invalid_date(error: Exception) -> None:
+    """Raises ValueError for the 502 the dining API answers for dates it has no data for. `error` is a requests or httpx
+    HTTP error."""
+    response = getattr(error, "response", None)
+    if response is not None and response.status_code == 502:
+        raise ValueError("Invalid Date") from error
 
-    if periods_resp.status_code == 502:
-        raise ValueError("Invalid Date")
 
-    periods = periods_resp.json()["periods"]
+def _find_period_id(periods_resp: transport.ConditionalResponse, period_name: str | None) -> str:
+    periods = periods_resp.data["periods"]
     if period_name is None or len(periods) == 1:
-        period_id = periods[0]["id"]
+        period_id: str = periods[0]["id"]
     else:
         for period in periods:
             if period["name"].lower() == period_name:
                 period_id = period["id"]
+    return period_id
 
-    menu_resp = requests.get(
-        MENU_URL.format(location_id=location_id, period_id=period_id, date_str=date_str),
-        headers=REQUEST_HEADERS,
-    )
-    menu: JSON = menu_resp.json()["menu"]
 
-    return menu
+@cached("dining.locations")
+def _get_locations_data() -> JSON:
+    data: JSON = transport.get_json(LOCATIONS_URL, headers=REQUEST_HEADERS)
+    return data
+
+
+@cached("dining.locations")
+async def _get_locations_data_async() -> JSON:
+    data: JSON = await transport.get_json_async(LOCATIONS_URL, headers=REQUEST_HEADERS)
+    return data
+
+
+@cached("dining.hours")
+def _get_hours_data(date_str: str) -> JSON:
+    try:
+        resp = transport.conditional_get(
+            HOURS_URL.format(date_str=date_str),
+            headers=REQUEST_HEADERS,
+        )
+    except requests.HTTPError as e:
+        _check_invalid_date(e)
+        raise
+    data: JSON = resp.data
+    return data
+
+
+@cached("dining.hours")
+async def _get_hours_data_async(date_str: str) -> JSON:
+    try:
+        resp = await transport.conditional_get_async(
+            HOURS_URL.format(date_str=date_str),
+            headers=REQUEST_HEADERS,
+        )
+    except Exception as e:
+        _check_invalid_date(e)
+        raise
+    data: JSON = resp.data
+    return data
@@ -19,12 +19,20 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 
 from __future__ import annotations
 
-from bs4 import BeautifulSoup
-import requests
 from typing import NamedTuple
 
+from pittapi import observe, transport
+
 GYM_URL = "https://connect2concepts.com/connect2/?type=bar&key=17c2cbcb-ec92-4178-a5f5-c4860330aea0"
 
+observe.register_endpoint("gym.status", GYM_URL)
+
+# Was getting a Mod Security Error
+# Fix: https://stackoverflow.com/questions/61968521/python-web-scraping-request-errormod-security
+REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.12; rv:55.0) Gecko/20100101 Firefox/55.0",
+}
+
 GYM_NAMES = [
     "Baierl Rec Center",
     "Bellefield Hall: Fitness Center & Weight Room",
@@ -61,14 +69,21 @@ class Gym(NamedTuple):
 
 def get_all_gyms_info() -> list[Gym]:
     """Fetches list of Gym named tuples with all gym information"""
-    # Was getting a Mod Security Error
-    # Fix: https://stackoverflow.com/questions/61968521/python-web-scraping-request-errormod-security
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.12; rv:55.0) Gecko/20100101 Firefox/55.0",
-    }
-
-    page = requests.get(GYM_URL, headers=headers)
-    soup = BeautifulSoup(page.text, "html.parser")
+    page = transport.get(GYM_URL, headers=REQUEST_HEADERS)
+    return _parse_gyms(page.text)
+
+
+async def get_all_gyms_info_async() -> list[Gym]:
+    page = await transport.get_async(GYM_URL, headers=REQUEST_HEADERS)
+    return _parse_gyms(page.text)
+
+
+@observe.parser("gym.status")
+def _parse_gyms(page_text: str) -> list[Gym]:
+    # bs4 is only imported once a page needs parsing, since it's slow to import
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page_text, "html.parser")
     gym_info_list = soup.find_all("div", class_="barChart")
 
     gyms = [Gym.from_text(gym.get_text("|", strip=True)) for gym in gym_info_list]
@@ -77,7 +92,14 @@ def get_all_gyms_info() -> list[Gym]:
 
 def get_gym_info(gym_name: str) -> Gym | None:
     """Fetches the information of a singular gym as a tuple"""
-    info = get_all_gyms_info()
+    return _find_gym(get_all_gyms_info(), gym_name)
+
+
+async def get_gym_info_async(gym_name: str) -> Gym | None:
+    return _find_gym(await get_all_gyms_info_async(), gym_name)
+
+
+def _find_gym(info: list[Gym], gym_name: str) -> Gym | None:
     if gym_name in GYM_NAMES:
         for gym in info:
             if gym.name == gym_name and gym.last_updated and gym.current_count and gym.percent_full:
@@ -17,8 +17,17 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 """
 
-from typing import NamedTuple
-import requests
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, NamedTuple, Sequence
+
+from pittapi import observe, transport
+from pittapi.cache import cached
 
 # Suppress ssl warning
 import urllib3
@@ -26,9 +35,35 @@ import urllib3
 urllib3.disable_warnings()
 
 PITT_BASE_URL = "https://pitt-keyserve-prod.univ.pitt.edu/maps/std/"
+LAB_DIRECTORY_URL = PITT_BASE_URL + "avail.json"
+LAB_STATUS_URL = PITT_BASE_URL + "{lab_id}/status.json?noredir=1"
+
+observe.register_endpoint("lab.directory", LAB_DIRECTORY_URL)
+observe.register_endpoint("lab.status", LAB_STATUS_URL)
+
+# The names each lab is listed under in avail.json, which is where their IDs are looked up
+LAB_NAMES = {
+    "BELLEFIELD": "Bellefield 314",
+    "LAWRENCE": "David Lawrence 230",
+    "SUTH": "Sutherland 120",
+    "CATH_G27": "Cathedral G27",
+    "CATH_G62": "Cathedral G62",
+    "BENEDUM": "Benedum B06",
+}
+
+# While avail.json can't be fetched, the built-in IDs are used without trying it again for this many seconds, unless a
+# lab's ID turns out to be invalid
+LAB_DIRECTORY_RETRY_INTERVAL = 5 * 60
+_lab_directory_failed_at: float | None = None
+
+# The lab IDs that last turned out to hold an invalid ID, and what they were refreshed to. Labs fetched with the same
+# IDs share that refresh instead of each fetching the directory again.
+_refreshed_lab_ids: tuple[dict[str, str], dict[str, str]] | None = None
+_refreshed_lab_ids_lock = threading.Lock()
+_refreshed_lab_ids_async: tuple[dict[str, str], asyncio.Task[dict[str, str]]] | None = None
 
 # Manually pulled from https://pitt-keyserve-prod.univ.pitt.edu/maps/std/avail.json
-# Will need to change to pull these dynamically in the future if these IDs change
+# Only used for labs that avail.json doesn't list, or while it can't be fetched
 AVAIL_LAB_ID_MAP = {
     "BELLEFIELD": "bba4a8796295ff6a8df116524b40e178",
     "LAWRENCE": "98a4759fc02ca3655d56cd58abed4e90",
@@ -69,24 +104,154 @@ def get_one_lab_data(lab_name: str) -> Lab:
     Returns:
         Lab: A Lab object with the data.
     """
+    _validate_lab_name(lab_name)
+    return _get_lab(lab_name, _get_lab_ids())
 
+
+async def get_one_lab_data_async(lab_name: str) -> Lab:
+    _validate_lab_name(lab_name)
+    return await _get_lab_async(lab_name, await _get_lab_ids_async())
+
+
+def _validate_lab_name(lab_name: str) -> None:
     if lab_name not in AVAIL_LAB_ID_MAP.keys():
         # Dicts are guaranteed to preserve insertion order as of Python 3.7,
         # so the list of valid options will always be printed in the same order
         raise ValueError(f"Invalid lab name: {lab_name}. Valid options: {', '.join(AVAIL_LAB_ID_MAP.keys())}")
 
-    req = requests.get(
-        PITT_BASE_URL + AVAIL_LAB_ID_MAP[lab_name] + "/status.json?noredir=1",
-        verify=False,
-    )
 
+def _get_lab_url(lab_id: str) -> str:
+    return LAB_STATUS_URL.format(lab_id=lab_id)
+
+
+def _get_lab(lab_name: str, lab_ids: dict[str, str]) -> Lab:
+    req = transport.get(_get_lab_url(lab_ids[lab_name]), verify=False)
+    if req.status_code == 404:
+        # The lab's ID may have changed since the directory was cached, so look it up again and retry once
+        lab_id = _refresh_lab_ids(lab_ids)[lab_name]
+        if lab_id != lab_ids[lab_name]:
+            req = transport.get(_get_lab_url(lab_id), verify=False)
+    return _parse_lab_data(_read_lab_response(req))
+
+
+async def _get_lab_async(lab_name: str, lab_ids: dict[str, str]) -> Lab:
+    req = await transport.get_async(_get_lab_url(lab_ids[lab_name]), verify=False)
+    if req.status_code == 404:
+        lab_id = (await _refresh_lab_ids_async(lab_ids))[lab_name]
+        if lab_id != lab_ids[lab_name]:
+            req = await transport.get_async(_get_lab_url(lab_id), verify=False)
+    return _parse_lab_data(_read_lab_response(req))
+
+
+def _get_lab_ids(refresh: bool = False) -> dict[str, str]:
+    """Returns the ID of every lab in AVAIL_LAB_ID_MAP, as listed in the cached lab directory."""
+    if not refresh and _lab_directory_failed_recently():
+        return _resolve_lab_ids({})
+    try:
+        directory = _get_lab_directory.refresh() if refresh else _get_lab_directory()  # type: ignore[attr-defined]
+    except Exception as e:  # Fall back to the built-in IDs until LAB_DIRECTORY_RETRY_INTERVAL has passed
+        _set_lab_directory_error(e)
+        directory = {}
+    else:
+        _set_lab_directory_error(None)
+    return _resolve_lab_ids(directory)
+
+
+async def _get_lab_ids_async(refresh: bool = False) -> dict[str, str]:
+    if not refresh and _lab_directory_failed_recently():
+        return _resolve_lab_ids({})
+    try:
+        if refresh:
+            directory = await _get_lab_directory_async.refresh()  # type: ignore[attr-defined]
+        else:
+            directory = await _get_lab_directory_async()
+    except Exception as e:
+        _set_lab_directory_error(e)
+        directory = {}
+    else:
+        _set_lab_directory_error(None)
+    return _resolve_lab_ids(directory)
+
+
+def _refresh_lab_ids(outdated: dict[str, str]) -> dict[str, str]:
+    """Returns the lab IDs from a refreshed directory, after one of `outdated` turned out to be invalid. Concurrent
+    callers with the same outdated IDs wait for a single refresh."""
+    global _refreshed_lab_ids
+    with _refreshed_lab_ids_lock:
+        if _refreshed_lab_ids is None or _refreshed_lab_ids[0] is not outdated:
+            _refreshed_lab_ids = (outdated, _get_lab_ids(refresh=True))
+        return _refreshed_lab_ids[1]
+
+
+async def _refresh_lab_ids_async(outdated: dict[str, str]) -> dict[str, str]:
+    global _refreshed_lab_ids_async
+    refreshed = _refreshed_lab_ids_async
+    if refreshed is None or refreshed[0] is not outdated:
+        refreshed = _refreshed_lab_ids_async = (outdated, asyncio.ensure_future(_get_lab_ids_async(refresh=True)))
+    # Shielded, so that cancelling one lab's fetch doesn't cancel the refresh for the others
+    return await asyncio.shield(refreshed[1])
+
+
+def _lab_directory_failed_recently() -> bool:
+    failed_at = _lab_directory_failed_at
+    return failed_at is not None and time.monotonic() - failed_at < LAB_DIRECTORY_RETRY_INTERVAL
+
+
+def _set_lab_directory_error(error: Exception | None) -> None:
+    global _lab_directory_failed_at
+    if error is None:
+        _lab_directory_failed_at = None
+    else:
+        _lab_directory_failed_at = time.monotonic()
+        warnings.warn(f"Failed to fetch the lab directory, using the built-in lab IDs: {error}")
+
+
+def _resolve_lab_ids(directory: dict[str, str]) -> dict[str, str]:
+    return {
+        lab_name: directory.get(LAB_NAMES[lab_name].casefold(), default_id)
+        for lab_name, default_id in AVAIL_LAB_ID_MAP.items()
+    }
+
+
+@cached("lab.directory")
+def _get_lab_directory() -> dict[str, str]:
+    req = transport.get(LAB_DIRECTORY_URL, verify=False)
+    req.raise_for_status()
+    return _parse_lab_directory(req.json())
+
+
+@cached("lab.directory")
+async def _get_lab_directory_async() -> dict[str, str]:
+    req = await transport.get_async(LAB_DIRECTORY_URL, verify=False)
+    req.raise_for_status()
+    return _parse_lab_directory(req.json())
+
+
+@observe.parser("lab.directory")
+def _parse_lab_directory(avail_data: dict[str, Any]) -> dict[str, str]:
+    """Returns lab IDs by casefolded lab name. avail.json lists every lab under its ID, along with the lab's "name"."""
+    directory = {}
+    for lab_id, lab_info in avail_data.items():
+        if isinstance(lab_info, dict) and isinstance(lab_info.get("name"), str):
+            directory[lab_info["name"].casefold()] = lab_id
+    if not directory:
+        raise LabAPIError("The lab directory doesn't list any labs")
+    return directory
+
+
+def _read_lab_response(req: Any) -> dict[str, Any]:
+    """Checks a requests or httpx response for a lab's status and returns its JSON."""
     if req.status_code == 404:
         raise LabAPIError("The Lab ID was invalid. Please open a GitHub issue so we can resolve this.")
     elif req.status_code != 200:
         raise LabAPIError(f"An unexpected error occurred while fetching lab data: {req.text}")
-    else:
-        lab_data = req.json()
 
+    lab_data: dict[str, Any] = req.json()
+    return lab_data
+
+
+@observe.parser("lab.status")
+def _parse_lab_data(lab_data: dict[str, Any]) -> Lab:
     # Ugly way to retrieve name, but it doesn't use another network request
     name = list(lab_data["hours"].keys())[0]
     status = lab_data["hours"][name]["closed"]
@@ -129,10 +294,40 @@ def get_one_lab_data(lab_name: str) -> Lab:
 def get_all_labs_data() -> list[Lab]:
     """Returns a list with status and amount of OS machines for all labs.
 
+    Every lab is fetched at the same time, over the transport's pooled connections. Labs that can't be fetched are left
+    out with a warning, unless none of them could be, in which case the first lab's error is raised.
+
     Returns:
-        list[Lab]: A list of Labs.
+        list[Lab]: A list of Labs, in the order of AVAIL_LAB_ID_MAP.
     """
+    lab_names = list(AVAIL_LAB_ID_MAP.keys())
+    # Looked up once, so that the labs don't each fetch the directory if it isn't cached yet
+    lab_ids = _get_lab_ids()
+    with ThreadPoolExecutor(max_workers=len(lab_names), thread_name_prefix="pittapi-lab") as executor:
+        results = list(executor.map(lambda lab_name: _get_lab_result(lab_name, lab_ids), lab_names))
+
+    return _collect_labs(lab_names, results)
+
+
+async def get_all_labs_data_async() -> list[Lab]:
+    """Fetches every lab's status concurrently, the same way as get_all_labs_data."""
+    lab_names = list(AVAIL_LAB_ID_MAP.keys())
+    lab_ids = await _get_lab_ids_async()
+    results = await asyncio.gather(*(_get_lab_async(lab_name, lab_ids) for lab_name in lab_names), return_exceptions=True)
+    return _collect_labs(lab_names, results)
+
+
+def _get_lab_result(lab_name: str, lab_ids: dict[str, str]) -> Lab | Exception:
+    try:
+        return _get_lab(lab_name, lab_ids)
+    except Exception as e:
+        return e
 
-    all_lab_data = [get_one_lab_data(lab_name) for lab_name in AVAIL_LAB_ID_MAP.keys()]
 
-    return all_lab_data
+def _collect_labs(lab_names: list[str], results: Sequence[Lab | BaseException]) -> list[Lab]:
+    errors = [(lab_name, result) for lab_name, result in zip(lab_names, results) if isinstance(result, BaseException)]
+    if errors and len(errors) == len(results):
+        raise errors[0][1]
+    for lab_name, error in errors:
+        warnings.warn(f"Failed to fetch the status of lab {lab_name}: {error}")
+    return [result for result in results if isinstance(result, Lab)]
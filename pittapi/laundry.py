@@ -20,14 +20,17 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 from __future__ import annotations
 
 import re
-import requests
 from typing import Any, NamedTuple
 
+from pittapi import observe, transport
+
 JSON = dict[str, Any]
 
 
 BASE_URL = "https://www.laundryview.com/api/currentRoomData?school_desc_key=197&location={location}"
 
+observe.register_endpoint("laundry.room", BASE_URL)
+
 LOCATION_LOOKUP = {
     "TOWERS": "2430136",
     "BRACKENRIDGE": "2430119",
@@ -60,13 +63,22 @@ class LaundryMachine(NamedTuple):
 
 def _get_laundry_info(building_name: str) -> JSON:
     """Returns JSON object of laundry view webpage"""
-    building_name = building_name.upper()
-    url = BASE_URL.format(location=LOCATION_LOOKUP[building_name])
-    response = requests.get(url)
+    response = transport.get(_get_laundry_url(building_name))
+    info: dict[str, Any] = response.json()
+    return info
+
+
+async def _get_laundry_info_async(building_name: str) -> JSON:
+    response = await transport.get_async(_get_laundry_url(building_name))
     info: dict[str, Any] = response.json()
     return info
 
 
+def _get_laundry_url(building_name: str) -> str:
+    building_name = building_name.upper()
+    return BASE_URL.format(location=LOCATION_LOOKUP[building_name])
+
+
 def _parse_laundry_object_json(json: JSON) -> list[LaundryMachine]:
     """
     Parse the given JSON object into a list of laundry machines.
@@ -156,7 +168,14 @@ def get_building_status(building_name: str) -> BuildingStatus:
         -> SUTH_EAST
         -> SUTH_WEST
     """
-    machines = get_laundry_machine_statuses(building_name)
+    return _count_machines(building_name, get_laundry_machine_statuses(building_name))
+
+
+async def get_building_status_async(building_name: str) -> BuildingStatus:
+    return _count_machines(building_name, await get_laundry_machine_statuses_async(building_name))
+
+
+def _count_machines(building_name: str, machines: list[LaundryMachine]) -> BuildingStatus:
     free_washers, free_dryers, total_washers, total_dryers = 0, 0, 0, 0
     for machine in machines:
         if machine.type == "washer":
@@ -188,9 +207,16 @@ def get_laundry_machine_statuses(building_name: str) -> list[LaundryMachine]:
         -> SUTH_EAST
         -> SUTH_WEST
     """
-    machines = []
-    laundry_info = _get_laundry_info(building_name)
+    return _parse_laundry_info(_get_laundry_info(building_name))
 
+
+async def get_laundry_machine_statuses_async(building_name: str) -> list[LaundryMachine]:
+    return _parse_laundry_info(await _get_laundry_info_async(building_name))
+
+
+@observe.parser("laundry.room")
+def _parse_laundry_info(laundry_info: JSON) -> list[LaundryMachine]:
+    machines = []
     for obj in laundry_info["objects"]:
         obj_machines = _parse_laundry_object_json(obj)
         machines.extend(obj_machines)
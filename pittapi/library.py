@@ -19,9 +19,10 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 
 from __future__ import annotations
 
-import requests
 from typing import Any, NamedTuple
 
+from pittapi import observe, transport
+
 LIBRARY_URL = (
     "https://pitt.primo.exlibrisgroup.com/primaws/rest/pub/pnxs"
     "?acTriggered=false&blendFacetsSeparately=false&citationTrailFilterByAvailability=true&disableCache=false&getMore=0"
@@ -36,9 +37,10 @@ STUDY_ROOMS_URL = (
     "&start=0&length=25&search%5Bvalue%5D=&_=1717907260661"
 )
 
-QUERY_START = "&q=any,contains,"
+observe.register_endpoint("library.search", LIBRARY_URL)
+observe.register_endpoint("library.study_rooms", STUDY_ROOMS_URL)
 
-sess = requests.session()
+QUERY_START = "&q=any,contains,"
 
 
 class Document(NamedTuple):
@@ -73,29 +75,43 @@ class Reservation(NamedTuple):
 
 def get_documents(query: str) -> QueryResult:
     """Return ten resource results from the specified page"""
-    parsed_query = query.replace(" ", "+")
-    full_query = LIBRARY_URL + QUERY_START + parsed_query
-    resp = sess.get(full_query)
-    resp_json = resp.json()
+    resp = transport.get(_get_query_url(query))
+    return _parse_query_result(resp.json())
 
-    results = QueryResult(
-        num_results=resp_json["info"]["total"],
-        num_pages=resp_json["info"]["last"],
-        docs=_filter_documents(resp_json["docs"]),
-    )
-    return results
+
+async def get_documents_async(query: str) -> QueryResult:
+    resp = await transport.get_async(_get_query_url(query))
+    return _parse_query_result(resp.json())
 
 
 def get_document_by_bookmark(bookmark: str) -> QueryResult:
     """Return resource referenced by bookmark"""
     payload = {"bookMark": bookmark}
-    resp = sess.get(LIBRARY_URL, params=payload)
-    resp_json = resp.json()
+    resp = transport.get(LIBRARY_URL, params=payload)
+    return _parse_bookmark_result(resp.json())
+
+
+async def get_document_by_bookmark_async(bookmark: str) -> QueryResult:
+    payload = {"bookMark": bookmark}
+    resp = await transport.get_async(LIBRARY_URL, params=payload)
+    return _parse_bookmark_result(resp.json())
 
+
+def _get_query_url(query: str) -> str:
+    parsed_query = query.replace(" ", "+")
+    return LIBRARY_URL + QUERY_START + parsed_query
+
+
+def _parse_bookmark_result(resp_json: dict[str, Any]) -> QueryResult:
     if resp_json.get("errors"):
         for error in resp_json.get("errors"):
             if error["code"] == "invalid.bookmark.format":
                 raise ValueError("Invalid bookmark")
+    return _parse_query_result(resp_json)
+
+
+@observe.parser("library.search")
+def _parse_query_result(resp_json: dict[str, Any]) -> QueryResult:
     results = QueryResult(
         num_results=resp_json["info"]["total"],
         num_pages=resp_json["info"]["last"],
@@ -116,8 +132,17 @@ def _filter_documents(documents: list[dict[str, Any]]) -> list[Document]:
 
 def hillman_total_reserved() -> int:
     """Returns a simple count dictionary of the total amount of reserved rooms appointments"""
-    resp = requests.get(STUDY_ROOMS_URL)
-    resp_json = resp.json()
+    resp = transport.get(STUDY_ROOMS_URL)
+    return _parse_total_reserved(resp.json())
+
+
+async def hillman_total_reserved_async() -> int:
+    resp = await transport.get_async(STUDY_ROOMS_URL)
+    return _parse_total_reserved(resp.json())
+
+
+@observe.parser("library.study_rooms")
+def _parse_total_reserved(resp_json: dict[str, Any]) -> int:
     total_records: int = resp_json["recordsTotal"]  # Total records is kept track of by default in the JSON
 
     # Note: this must align with the amount of entries in reserved times function; renamed for further clarification
@@ -126,8 +151,17 @@ def hillman_total_reserved() -> int:
 
 def reserved_hillman_times() -> list[Reservation]:
     """Returns a list of dictionaries of reserved rooms in Hillman with their respective times"""
-    resp = requests.get(STUDY_ROOMS_URL)
-    resp_json = resp.json()
+    resp = transport.get(STUDY_ROOMS_URL)
+    return _parse_reservations(resp.json())
+
+
+async def reserved_hillman_times_async() -> list[Reservation]:
+    resp = await transport.get_async(STUDY_ROOMS_URL)
+    return _parse_reservations(resp.json())
+
+
+@observe.parser("library.study_rooms")
+def _parse_reservations(resp_json: dict[str, Any]) -> list[Reservation]:
     data = resp_json["data"]
 
     if data is None:
@@ -19,9 +19,15 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 
 from __future__ import annotations
 
+import asyncio
 import math
-from requests_html import Element, HTMLResponse, HTMLSession
-from typing import Literal, NamedTuple
+from typing import TYPE_CHECKING, Literal, NamedTuple
+
+from pittapi import observe, transport
+
+# requests_html pulls in lxml and pyppeteer, so it's only imported once articles are fetched
+if TYPE_CHECKING:
+    from requests_html import HTML, Element, HTMLResponse
 
 NUM_ARTICLES_PER_PAGE = 20
 
@@ -31,6 +37,8 @@ NEWS_BY_CATEGORY_URL = (
 )
 PITT_BASE_URL = "https://www.pitt.edu"
 
+observe.register_endpoint("news.articles", NEWS_BY_CATEGORY_URL)
+
 Category = Literal["features-articles", "accolades-honors", "ones-to-watch", "announcements-and-updates"]
 Topic = Literal[
     "university-news",
@@ -64,8 +72,6 @@ TOPIC_ID_MAP: dict[Topic, int] = {
     "sustainability": 470,
 }
 
-sess = HTMLSession()
-
 
 class Article(NamedTuple):
     title: str
@@ -94,14 +100,38 @@ def _get_page_articles(
     year: int | None,
     page_num: int,
 ) -> list[Article]:
+    from requests_html import HTMLSession
+
+    url = _get_page_url(topic, category, query, year, page_num)
+    response: HTMLResponse = transport.get_transport().get_session(HTMLSession).get(url)
+    return _parse_page_articles(response.html)
+
+
+async def _get_page_articles_async(
+    topic: Topic,
+    category: Category,
+    query: str,
+    year: int | None,
+    page_num: int,
+) -> list[Article]:
+    from requests_html import HTML
+
+    url = _get_page_url(topic, category, query, year, page_num)
+    response = await transport.get_async(url)
+    return _parse_page_articles(HTML(url=str(response.url), html=response.content, default_encoding=response.encoding))
+
+
+def _get_page_url(topic: Topic, category: Category, query: str, year: int | None, page_num: int) -> str:
     year_str = str(year) if year else ""
     page_num_str = str(page_num) if page_num else ""
-    response: HTMLResponse = sess.get(
-        NEWS_BY_CATEGORY_URL.format(
-            category=category, topic_id=TOPIC_ID_MAP[topic], year=year_str, query=query, page_num=page_num_str
-        )
+    return NEWS_BY_CATEGORY_URL.format(
+        category=category, topic_id=TOPIC_ID_MAP[topic], year=year_str, query=query, page_num=page_num_str
     )
-    main_content: Element = response.html.xpath("/html/body/div/main/div/section", first=True)
+
+
+@observe.parser("news.articles")
+def _parse_page_articles(html: HTML) -> list[Article]:
+    main_content: Element = html.xpath("/html/body/div/main/div/section", first=True)
     news_cards: list[Element] = main_content.find("div.news-card")
     page_articles = [Article.from_html(news_card) for news_card in news_cards]
     return page_articles
@@ -116,10 +146,30 @@ def get_articles_by_topic(
 ) -> list[Article]:
     num_pages = math.ceil(max_num_results / NUM_ARTICLES_PER_PAGE)
 
-    # Get articles sequentially and synchronously (i.e., not using grequests) because the news pages must stay in order
+    # Get articles sequentially and synchronously (i.e., not concurrently) because the news pages must stay in order
     results: list[Article] = []
     for page_num in range(num_pages):  # Page numbers in url are 0-indexed
         page_articles = _get_page_articles(topic, category, query, year, page_num)
         num_articles_to_add = min(len(page_articles), max_num_results - len(results))
         results.extend(page_articles[:num_articles_to_add])
     return results
+
+
+async def get_articles_by_topic_async(
+    topic: Topic,
+    category: Category = "features-articles",
+    query: str = "",
+    year: int | None = None,
+    max_num_results: int = NUM_ARTICLES_PER_PAGE,
+) -> list[Article]:
+    num_pages = math.ceil(max_num_results / NUM_ARTICLES_PER_PAGE)
+
+    # The pages are fetched concurrently, and gather returns them in page order
+    pages = await asyncio.gather(
+        *(_get_page_articles_async(topic, category, query, year, page_num) for page_num in range(num_pages))
+    )
+    results: list[Article] = []
+    for page_articles in pages:
+        num_articles_to_add = min(len(page_articles), max_num_results - len(results))
+        results.extend(page_articles[:num_articles_to_add])
+    return results
@@ -0,0 +1,308 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from __future__ import annotations
+
+import functools
+import re
+import threading
+import time
+import warnings
+from typing import Any, Callable, NamedTuple, TypeVar
+from urllib.parse import urlsplit
+
+T = TypeVar("T")
+
+# Upper bounds of the response size histogram buckets, in bytes
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class FetchEvent(NamedTuple):
+    """One HTTP request sent by the transport. Redirects are reported as requests of their own."""
+
+    # The endpoint registered for the URL's template, or the URL's host for unregistered URLs
+    endpoint: str
+    url_template: str | None
+    url: str
+    method: str
+    # None if no response was received
+    status: int | None
+    # Size of the (decompressed) response body
+    bytes: int
+    # Unix time the request was sent at
+    started_at: float
+    # Seconds from sending the request to receiving the whole response, including retries but not rate_limit_wait
+    network_time: float
+    # Times the request was resent, see resilience.RetryPolicy
+    retries: int
+    error: BaseException | None = None
+    # Seconds the request was held back by the host's rate limit, see ratelimit.RateLimit
+    rate_limit_wait: float = 0.0
+
+
+class ParseEvent(NamedTuple):
+    """One call of a parser, or the JSON decoding of a response."""
+
+    endpoint: str
+    # The parser's name, or "json" for JSON decoding
+    step: str
+    started_at: float
+    parse_time: float
+    error: BaseException | None = None
+
+
+class Observer:
+    """Receives an event for every request the transports send and every parse step. Subclasses override the
+    methods for the events they're interested in.
+
+    Events are reported synchronously, from the thread or task that sent the request or ran the parser, so observers
+    must be thread-safe and quick. Exceptions raised by an observer are turned into warnings."""
+
+    def on_fetch(self, event: FetchEvent) -> None:
+        pass
+
+    def on_parse(self, event: ParseEvent) -> None:
+        pass
+
+
+# Replaced rather than modified, so that reporting never needs the lock
+_observers: tuple[Observer, ...] = ()
+_endpoints: list[tuple[re.Pattern[str], str, str]] = []
+_lock = threading.Lock()
+
+
+def add_observer(observer: Observer) -> None:
+    global _observers
+    with _lock:
+        _observers = _observers + (observer,)
+
+
+def remove_observer(observer: Observer) -> None:
+    global _observers
+    with _lock:
+        _observers = tuple(registered for registered in _observers if registered is not observer)
+
+
+def is_observed() -> bool:
+    """Whether any observer is registered. Nothing is measured while this is False."""
+    return bool(_observers)
+
+
+def register_endpoint(endpoint: str, url_template: str) -> None:
+    """Names the URLs that match `url_template`, in which str.format fields like {id} match any value. Query
+    parameters that aren't part of the template are ignored. Every module registers its own URLs when imported."""
+    path, separator, query = url_template.partition("?")
+    pattern = _template_pattern(path, "[^/?#]*") + re.escape(separator) + _template_pattern(query, "[^&#]*")
+    with _lock:
+        _endpoints.append((re.compile(pattern + r"(?:[?&#].*)?"), endpoint, url_template))
+        # The longest template is the most specific, so it's tried first
+        _endpoints.sort(key=lambda registered: len(registered[2]), reverse=True)
+    match_endpoint.cache_clear()
+
+
+def _template_pattern(template: str, field_pattern: str) -> str:
+    return field_pattern.join(re.escape(part) for part in re.split(r"\{[^}]*\}", template))
+
+
+@functools.lru_cache(maxsize=1024)
+def match_endpoint(url: str) -> tuple[str, str | None]:
+    """Returns the endpoint and template registered for a URL, or the URL's host and None."""
+    for pattern, endpoint, url_template in _endpoints:
+        if pattern.fullmatch(url):
+            return endpoint, url_template
+    return urlsplit(url).hostname or "", None
+
+
+def report_fetch(event: FetchEvent) -> None:
+    for observer in _observers:
+        try:
+            observer.on_fetch(event)
+        except Exception as e:
+            warnings.warn(f"Observer {observer!r} failed: {e!r}")
+
+
+def report_parse(event: ParseEvent) -> None:
+    for observer in _observers:
+        try:
+            observer.on_parse(event)
+        except Exception as e:
+            warnings.warn(f"Observer {observer!r} failed: {e!r}")
+
+
+def run_parser(endpoint: str, step: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Calls func, reporting how long it took as a parse step of the endpoint."""
+    if not _observers:
+        return func(*args, **kwargs)
+
+    started_at = time.time()
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        report_parse(ParseEvent(endpoint, step, started_at, time.perf_counter() - start, error=e))
+        raise
+    report_parse(ParseEvent(endpoint, step, started_at, time.perf_counter() - start))
+    return result
+
+
+def parser(endpoint: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorates a parser so each call is reported as a parse step of the endpoint, named after the function."""
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        step = func.__name__.lstrip("_")
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            if not _observers:
+                return func(*args, **kwargs)
+            return run_parser(endpoint, step, func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class PrometheusObserver(Observer):
+    """Records events in prometheus_client histograms, which is an optional dependency (pip install
+    pittapi[prometheus]):
+
+    - `pittapi_fetch_duration_seconds` by endpoint and status ("error" if no response was received)
+    - `pittapi_fetch_size_bytes` by endpoint
+    - `pittapi_fetch_retries_total` by endpoint
+    - `pittapi_fetch_rate_limit_wait_seconds` by endpoint, for requests that were held back by a rate limit
+    - `pittapi_parse_duration_seconds` by endpoint and step
+
+    The metrics are registered in `registry`, prometheus_client's default registry unless given."""
+
+    def __init__(self, registry: Any = None, namespace: str = "pittapi"):
+        prometheus_client = _import_optional("prometheus_client", "prometheus")
+        if registry is None:
+            registry = prometheus_client.REGISTRY
+        self.fetch_duration = prometheus_client.Histogram(
+            "fetch_duration_seconds",
+            "Time to send a request and receive the whole response",
+            ["endpoint", "status"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.fetch_size = prometheus_client.Histogram(
+            "fetch_size_bytes",
+            "Size of response bodies",
+            ["endpoint"],
+            namespace=namespace,
+            registry=registry,
+            buckets=SIZE_BUCKETS,
+        )
+        self.fetch_retries = prometheus_client.Counter(
+            "fetch_retries",
+            "Requests resent after failing to reach the server",
+            ["endpoint"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.fetch_rate_limit_wait = prometheus_client.Histogram(
+            "fetch_rate_limit_wait_seconds",
+            "Time requests were held back by their host's rate limit",
+            ["endpoint"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.parse_duration = prometheus_client.Histogram(
+            "parse_duration_seconds",
+            "Time spent parsing responses",
+            ["endpoint", "step"],
+            namespace=namespace,
+            registry=registry,
+        )
+
+    def on_fetch(self, event: FetchEvent) -> None:
+        status = "error" if event.status is None else str(event.status)
+        self.fetch_duration.labels(endpoint=event.endpoint, status=status).observe(event.network_time)
+        if event.status is not None:
+            self.fetch_size.labels(endpoint=event.endpoint).observe(event.bytes)
+        if event.retries:
+            self.fetch_retries.labels(endpoint=event.endpoint).inc(event.retries)
+        if event.rate_limit_wait:
+            self.fetch_rate_limit_wait.labels(endpoint=event.endpoint).observe(event.rate_limit_wait)
+
+    def on_parse(self, event: ParseEvent) -> None:
+        self.parse_duration.labels(endpoint=event.endpoint, step=event.step).observe(event.parse_time)
+
+
+class OpenTelemetryObserver(Observer):
+    """Records each event as an OpenTelemetry span, following the HTTP client semantic conventions for requests.
+    Spans are children of the span that was current when the request was sent or the parser called. Requires
+    OpenTelemetry, which is an optional dependency (pip install pittapi[otel]).
+
+    Spans are created with the tracer provider that's installed globally, unless `tracer_provider` is given."""
+
+    def __init__(self, tracer_provider: Any = None):
+        self._trace = _import_optional("opentelemetry.trace", "otel")
+        self.tracer = self._trace.get_tracer("pittapi", tracer_provider=tracer_provider)
+
+    def on_fetch(self, event: FetchEvent) -> None:
+        attributes: dict[str, Any] = {
+            "http.request.method": event.method,
+            "url.full": event.url,
+            "pittapi.endpoint": event.endpoint,
+        }
+        if event.url_template is not None:
+            attributes["url.template"] = event.url_template
+        if event.retries:
+            attributes["http.request.resend_count"] = event.retries
+        if event.rate_limit_wait:
+            attributes["pittapi.rate_limit_wait"] = event.rate_limit_wait
+        if event.status is not None:
+            attributes["http.response.status_code"] = event.status
+            attributes["http.response.body.size"] = event.bytes
+
+        name = event.method if event.url_template is None else f"{event.method} {event.url_template}"
+        # The span covers the time on the network, after any wait for the rate limit
+        start_time = int((event.started_at + event.rate_limit_wait) * 1e9)
+        span = self.tracer.start_span(name, kind=self._trace.SpanKind.CLIENT, attributes=attributes, start_time=start_time)
+        if event.error is not None:
+            span.record_exception(event.error)
+            span.set_attribute("error.type", type(event.error).__qualname__)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(event.error)))
+        elif event.status is not None and event.status >= 400:
+            span.set_attribute("error.type", str(event.status))
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        span.end(end_time=start_time + int(event.network_time * 1e9))
+
+    def on_parse(self, event: ParseEvent) -> None:
+        start_time = int(event.started_at * 1e9)
+        span = self.tracer.start_span(
+            f"parse {event.endpoint}",
+            attributes={"pittapi.endpoint": event.endpoint, "pittapi.parse_step": event.step},
+            start_time=start_time,
+        )
+        if event.error is not None:
+            span.record_exception(event.error)
+            span.set_attribute("error.type", type(event.error).__qualname__)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(event.error)))
+        span.end(end_time=start_time + int(event.parse_time * 1e9))
+
+
+def _import_optional(module: str, extra: str) -> Any:
+    import importlib
+
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(f"This observer requires {module}, install it with: pip install pittapi[{extra}]") from e
@@ -17,14 +17,23 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 """
 
-from requests_html import HTMLSession, Element
-from typing import Any
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from pittapi import observe, transport
+
+# requests_html pulls in lxml and pyppeteer, so it's only imported once a search is sent
+if TYPE_CHECKING:
+    from requests_html import HTML, Element
 
 # Please note that find.pitt.edu will not accept more than 10 requests within a few minutes
-# It will time out if that happens
+# It will time out if that happens, so requests to it are held back by ratelimit.DEFAULT_RATE_LIMITS
 
 PEOPLE_SEARCH_URL = "https://find.pitt.edu/Search"
 
+observe.register_endpoint("people.search", PEOPLE_SEARCH_URL)
+
 LABEL_CONVERSION = {
     "Email": "email",
     "Nickname": "nickname",
@@ -62,12 +71,28 @@ def _parse_segments(person: dict[str, Any], segments: list[Element]) -> None:
 
 
 def get_person(query: str) -> list[dict[str, Any]]:
+    from requests_html import HTMLSession
+
     payload = {"search": query}
-    session = HTMLSession()
+    session = transport.get_transport().get_session(HTMLSession)
     resp = session.post(PEOPLE_SEARCH_URL, data=payload)
-    if "Too many people matched your criteria." in resp.text:
+    return _parse_people(resp.text, resp.html)
+
+
+async def get_person_async(query: str) -> list[dict[str, Any]]:
+    from requests_html import HTML
+
+    payload = {"search": query}
+    resp = await transport.post_async(PEOPLE_SEARCH_URL, data=payload)
+    html = HTML(url=str(resp.url), html=resp.content, default_encoding=resp.encoding)
+    return _parse_people(resp.text, html)
+
+
+@observe.parser("people.search")
+def _parse_people(text: str, html: HTML) -> list[dict[str, Any]]:
+    if "Too many people matched your criteria." in text:
         return [{"ERROR": "Too many people matched your criteria."}]
-    elements = resp.html.xpath("/html/div/section")
+    elements = html.xpath("/html/div/section")
     result = []
     for entry in elements:
         name, *segments = entry.find("span")
@@ -0,0 +1,155 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Iterator, NamedTuple
+from urllib.parse import urlsplit
+
+import requests
+
+if TYPE_CHECKING:
+    import sqlite3
+
+
+class RateLimit(NamedTuple):
+    """A token bucket for one host. Each request takes a token, and tokens come back at `rate` per second, up to
+    `burst` tokens. A request that finds the bucket empty waits for the next token, unless that's more than `max_wait`
+    seconds away, in which case it fails fast with RateLimitExceeded. With max_wait=None, requests queue for as long as
+    it takes."""
+
+    rate: float
+    burst: float = 1.0
+    max_wait: float | None = None
+
+
+# Limits every HostRateLimiter starts with, unless given its own
+DEFAULT_RATE_LIMITS: dict[str, RateLimit] = {
+    # find.pitt.edu times out once it gets more than about 10 requests within a few minutes
+    "find.pitt.edu": RateLimit(rate=10 / 180, burst=10),
+}
+
+
+class RateLimitExceeded(requests.ConnectionError):
+    """Raised instead of sending a request that would have to wait longer than its host's RateLimit.max_wait."""
+
+    def __init__(self, host: str, wait: float):
+        super().__init__(f"Rate limit of {host} reached, the next request may be sent in {wait:.1f}s")
+        self.host = host
+        # Seconds until a request to the host can be sent without waiting
+        self.wait = wait
+
+
+class HostRateLimiter:
+    """Keeps requests to each host within rate_limits[host], with a token bucket per host that every thread using the
+    limiter shares. Hosts without a limit aren't limited.
+
+    If `path` is given, the buckets are kept in a SQLite database at that path instead, so that every process using
+    the same path shares them, like several crawls of PeopleSoft running side by side."""
+
+    def __init__(self, rate_limits: dict[str, RateLimit] | None = None, path: str | os.PathLike[str] | None = None):
+        self.rate_limits = dict(DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits)
+        self.path = path
+        # host -> (tokens, time they were counted at)
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        if path is not None:
+            with self._connect() as db:
+                db.execute("CREATE TABLE IF NOT EXISTS buckets (host TEXT PRIMARY KEY, tokens REAL, updated_at REAL)")
+
+    def wait(self, url: str) -> float:
+        """Waits until a request may be sent to the URL's host and returns how many seconds that took."""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def wait_async(self, url: str) -> float:
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def reserve(self, url: str) -> float:
+        """Takes a token for a request to the URL's host and returns how many seconds to wait before sending it, or
+        raises RateLimitExceeded if that's longer than the host's max_wait."""
+        host = urlsplit(url).hostname or ""
+        limit = self.rate_limits.get(host)
+        if limit is None:
+            return 0.0
+        if self.path is not None:
+            return self._reserve_shared(host, limit)
+        with self._lock:
+            delay, bucket = _take_token(host, limit, self._buckets.get(host), time.monotonic())
+            self._buckets[host] = bucket
+        return delay
+
+    def _reserve_shared(self, host: str, limit: RateLimit) -> float:
+        # Wall-clock time, since monotonic clocks aren't comparable between processes
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT tokens, updated_at FROM buckets WHERE host = ?", (host,)).fetchone()
+            delay, bucket = _take_token(host, limit, row, time.time())
+            db.execute("INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)", (host, *bucket))
+        return delay
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A connection per call, since connections can't be shared between threads. Transactions are begun explicitly,
+        # and committed or rolled back when the block exits.
+        import sqlite3
+
+        assert self.path is not None
+        db = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def reset(self) -> None:
+        """Refills every bucket."""
+        with self._lock:
+            self._buckets.clear()
+        if self.path is not None:
+            with self._connect() as db:
+                db.execute("DELETE FROM buckets")
+
+
+# Used by every transport that isn't given a rate limiter of its own, so that the sync and async transports, and any
+# others created without one, keep within a single quota per host instead of each getting a full one
+default_rate_limiter = HostRateLimiter()
+
+
+def _take_token(
+    host: str, limit: RateLimit, bucket: tuple[float, float] | None, now: float
+) -> tuple[float, tuple[float, float]]:
+    """Returns how long to wait for a token from the bucket, and the bucket without it."""
+    tokens, updated_at = bucket if bucket is not None else (limit.burst, now)
+    # Tokens go negative while requests are queued for tokens that haven't come back yet
+    tokens = min(limit.burst, tokens + max(now - updated_at, 0.0) * limit.rate) - 1
+    delay = max(-tokens / limit.rate, 0.0)
+    if limit.max_wait is not None and delay > limit.max_wait:
+        raise RateLimitExceeded(host, delay)
+    return delay, (tokens, now)
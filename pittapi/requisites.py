@@ -0,0 +1,332 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from __future__ import annotations
+
+import functools
+import heapq
+import re
+from typing import Iterable, NamedTuple, Union
+
+from pittapi.course import CourseDetails
+
+# Requisite strings are split into clauses like "PREQ: ...", "CREQ: ..." or "PLAN: ..." by semicolons
+LABEL_REGEX = re.compile(r"^\s*([A-Za-z][A-Za-z -]*?)\s*:")
+PREREQUISITE_LABEL_REGEX = re.compile(r"^pre", re.IGNORECASE)
+TOKEN_REGEX = re.compile(
+    r"(?P<open>[(\[])|(?P<close>[)\]])|(?P<and>\band\b|&)|(?P<or>\bor\b)|(?P<comma>,)"
+    r"|(?:(?P<subject>(?-i:[A-Z]{2,7}))\s*)?(?P<number>\b\d{4}[A-Z]?\b)",
+    re.IGNORECASE,
+)
+OPERATOR_WORDS = frozenset({"AND", "OR"})
+
+
+class CourseRef(NamedTuple):
+    subject_code: str
+    course_number: str
+
+    def __str__(self) -> str:
+        return f"{self.subject_code} {self.course_number}"
+
+
+class Requirement(NamedTuple):
+    """All ("AND") or any ("OR") of the operands must be satisfied."""
+
+    operator: str
+    operands: tuple[RequisiteExpression, ...]
+
+
+RequisiteExpression = Union[CourseRef, Requirement]
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_requisites(text: str | None) -> RequisiteExpression | None:
+    """Parses the prerequisites out of a CourseDetails.requisites string, e.g.
+    "PREQ: (CS 0441 or 0406) and CS 0445; MIN GRADE 'C' FOR LISTED COURSES".
+
+    Only the clauses labelled as prerequisites are parsed if the string has labels. Course numbers without a subject
+    code belong to the last subject mentioned before them, and AND binds tighter than OR. Anything that isn't a course,
+    like "instructor permission", is ignored. Returns None if no courses are required."""
+    if not text:
+        return None
+
+    clauses: list[tuple[str | None, str]] = []
+    label = None
+    for clause in text.split(";"):
+        match = LABEL_REGEX.match(clause)
+        if match:
+            label = match.group(1)
+            clause = clause[match.end() :]
+        clauses.append((label, clause))
+    if any(label is not None for label, _ in clauses):
+        clauses = [(label, clause) for label, clause in clauses if label and PREREQUISITE_LABEL_REGEX.match(label)]
+
+    requirements = [expression for _, clause in clauses if (expression := _Parser(clause).parse()) is not None]
+    return _combine("AND", requirements)
+
+
+def get_courses(expression: RequisiteExpression | None) -> frozenset[CourseRef]:
+    """Returns every course mentioned in a requisite expression."""
+    if expression is None:
+        return frozenset()
+    if isinstance(expression, CourseRef):
+        return frozenset((expression,))
+    return frozenset().union(*(get_courses(operand) for operand in expression.operands))
+
+
+def is_satisfied(expression: RequisiteExpression | None, completed: Iterable[CourseRef | str]) -> bool:
+    """Returns True if the completed courses meet the requisite expression."""
+    completed_refs = {_to_ref(course_ref) for course_ref in completed}
+
+    def evaluate(node: RequisiteExpression) -> bool:
+        if isinstance(node, CourseRef):
+            return node in completed_refs
+        results = (evaluate(operand) for operand in node.operands)
+        return all(results) if node.operator == "AND" else any(results)
+
+    return expression is None or evaluate(expression)
+
+
+class PrerequisiteGraph:
+    """Directed graph from each course to the courses that list it as a prerequisite, built from crawled
+    CourseDetails (e.g. from course.crawl_term) without any further requests.
+
+    An edge means the prerequisite is mentioned anywhere in a course's requirements, including as one alternative of an
+    OR. Transitive queries are memoized until the graph changes."""
+
+    def __init__(self) -> None:
+        self._requirements: dict[CourseRef, RequisiteExpression] = {}
+        self._prerequisites: dict[CourseRef, frozenset[CourseRef]] = {}
+        self._dependents: dict[CourseRef, set[CourseRef]] = {}
+        self._all_prerequisites: dict[CourseRef, frozenset[CourseRef]] = {}
+        self._all_dependents: dict[CourseRef, frozenset[CourseRef]] = {}
+
+    @classmethod
+    def from_courses(cls, courses: Iterable[CourseDetails]) -> PrerequisiteGraph:
+        graph = cls()
+        for course_details in courses:
+            graph.add_course(course_details)
+        return graph
+
+    def __len__(self) -> int:
+        return len(self.get_courses())
+
+    def __contains__(self, course_ref: CourseRef | str) -> bool:
+        course_ref = _to_ref(course_ref)
+        return course_ref in self._prerequisites or course_ref in self._dependents
+
+    def add_course(self, course_details: CourseDetails) -> None:
+        course_obj = course_details.course
+        self.add_requisites(course_obj.subject_code, course_obj.course_number, course_details.requisites)
+
+    def add_requisites(self, subject_code: str, course_number: str, requisites: str | None) -> None:
+        """Adds or replaces a course's requirements from its raw requisites string."""
+        course_ref = CourseRef(subject_code, course_number)
+        for prerequisite in self._prerequisites.get(course_ref, ()):
+            self._dependents[prerequisite].discard(course_ref)
+
+        expression = parse_requisites(requisites)
+        prerequisites = get_courses(expression) - {course_ref}
+        if expression is None:
+            self._requirements.pop(course_ref, None)
+        else:
+            self._requirements[course_ref] = expression
+        self._prerequisites[course_ref] = prerequisites
+        for prerequisite in prerequisites:
+            self._dependents.setdefault(prerequisite, set()).add(course_ref)
+        self._all_prerequisites.clear()
+        self._all_dependents.clear()
+
+    def get_courses(self) -> frozenset[CourseRef]:
+        """Returns every course in the graph, including prerequisites whose own details were never added."""
+        return frozenset(self._prerequisites).union(self._dependents)
+
+    def get_requirements(self, course_ref: CourseRef | str) -> RequisiteExpression | None:
+        return self._requirements.get(_to_ref(course_ref))
+
+    def get_prerequisites(self, course_ref: CourseRef | str) -> frozenset[CourseRef]:
+        """Returns the courses directly mentioned in a course's prerequisites."""
+        return self._prerequisites.get(_to_ref(course_ref), frozenset())
+
+    def get_unlocked_courses(self, course_ref: CourseRef | str) -> frozenset[CourseRef]:
+        """Returns the courses that directly mention a course in their prerequisites."""
+        return frozenset(self._dependents.get(_to_ref(course_ref), ()))
+
+    def get_all_prerequisites(self, course_ref: CourseRef | str) -> frozenset[CourseRef]:
+        """Returns every course that a course directly or transitively depends on."""
+        return self._closure(_to_ref(course_ref), self._prerequisites, self._all_prerequisites)
+
+    def get_all_unlocked_courses(self, course_ref: CourseRef | str) -> frozenset[CourseRef]:
+        """Returns every course that directly or transitively depends on a course, e.g. everything CS 0445 leads to."""
+        return self._closure(_to_ref(course_ref), self._dependents, self._all_dependents)
+
+    def can_take(self, course_ref: CourseRef | str, completed: Iterable[CourseRef | str]) -> bool:
+        return is_satisfied(self.get_requirements(course_ref), completed)
+
+    def get_topological_order(self, courses: Iterable[CourseRef | str] | None = None) -> list[CourseRef]:
+        """Orders courses so that every course comes after its prerequisites, ties broken by course code.
+
+        If `courses` is given, only those courses are ordered. Raises ValueError if the prerequisites form a cycle."""
+        nodes = self.get_courses() if courses is None else {_to_ref(course_ref) for course_ref in courses}
+        remaining = {node: len(self.get_prerequisites(node) & nodes) for node in nodes}
+        ready = [node for node, count in remaining.items() if count == 0]
+        heapq.heapify(ready)
+
+        order = []
+        while ready:
+            node = heapq.heappop(ready)
+            order.append(node)
+            for dependent in self._dependents.get(node, ()):
+                if dependent in remaining:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        heapq.heappush(ready, dependent)
+
+        if len(order) < len(nodes):
+            cycle = sorted(str(node) for node, count in remaining.items() if count > 0)
+            raise ValueError(f"Prerequisites form a cycle between: {', '.join(cycle)}")
+        return order
+
+    @staticmethod
+    def _closure(
+        start: CourseRef,
+        edges: dict[CourseRef, frozenset[CourseRef]] | dict[CourseRef, set[CourseRef]],
+        memo: dict[CourseRef, frozenset[CourseRef]],
+    ) -> frozenset[CourseRef]:
+        if start in memo:
+            return memo[start]
+        reached: set[CourseRef] = set()
+        stack = list(edges.get(start, ()))
+        while stack:
+            node = stack.pop()
+            if node in reached:
+                continue
+            reached.add(node)
+            if node in memo:
+                # Memoized closures are complete, so there's no need to walk below them again
+                reached |= memo[node]
+            else:
+                stack.extend(edges.get(node, ()))
+        reached.discard(start)
+        memo[start] = frozenset(reached)
+        return memo[start]
+
+
+class _Parser:
+    """Recursive descent parser over the tokens of one requisite clause. Unparseable parts are skipped."""
+
+    def __init__(self, text: str):
+        self.tokens: list[tuple[str, CourseRef | None]] = []
+        subject = None
+        for match in TOKEN_REGEX.finditer(text):
+            kind = match.lastgroup
+            assert kind
+            if kind in ("subject", "number"):
+                if match.group("subject") and match.group("subject").upper() not in OPERATOR_WORDS:
+                    subject = match.group("subject").upper()
+                if subject is not None:
+                    self.tokens.append(("course", CourseRef(subject, match.group("number").upper())))
+            else:
+                self.tokens.append((kind, None))
+        self._resolve_commas()
+        self.position = 0
+
+    def _resolve_commas(self) -> None:
+        """Gives each comma the meaning of the next operator in its list, e.g. "CS 0401, 0445, or 0455" is an OR."""
+        for i, (kind, _) in enumerate(self.tokens):
+            if kind != "comma":
+                continue
+            operator = "and"
+            depth = 0
+            for next_kind, _ in self.tokens[i + 1 :]:
+                if next_kind == "open":
+                    depth += 1
+                elif next_kind == "close":
+                    if depth == 0:
+                        break
+                    depth -= 1
+                elif depth == 0 and next_kind in ("and", "or"):
+                    operator = next_kind
+                    break
+            self.tokens[i] = (operator, None)
+
+    def parse(self) -> RequisiteExpression | None:
+        requirements = []
+        while self.position < len(self.tokens):
+            expression = self._parse_or()
+            if expression is not None:
+                requirements.append(expression)
+            if self.position < len(self.tokens):
+                # Skip a stray closing bracket or operator that stopped the parse
+                self.position += 1
+        return _combine("AND", requirements)
+
+    def _peek(self) -> str | None:
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def _parse_or(self) -> RequisiteExpression | None:
+        operands = [self._parse_and()]
+        while self._peek() == "or":
+            self.position += 1
+            operands.append(self._parse_and())
+        return _combine("OR", [operand for operand in operands if operand is not None])
+
+    def _parse_and(self) -> RequisiteExpression | None:
+        operands = [self._parse_atom()]
+        while self._peek() == "and":
+            self.position += 1
+            operands.append(self._parse_atom())
+        return _combine("AND", [operand for operand in operands if operand is not None])
+
+    def _parse_atom(self) -> RequisiteExpression | None:
+        kind = self._peek()
+        if kind == "course":
+            course_ref = self.tokens[self.position][1]
+            self.position += 1
+            return course_ref
+        if kind == "open":
+            self.position += 1
+            expression = self._parse_or()
+            if self._peek() == "close":
+                self.position += 1
+            return expression
+        return None
+
+
+def _combine(operator: str, operands: list[RequisiteExpression]) -> RequisiteExpression | None:
+    flattened: list[RequisiteExpression] = []
+    for operand in operands:
+        if isinstance(operand, Requirement) and operand.operator == operator:
+            flattened.extend(operand.operands)
+        elif operand not in flattened:
+            flattened.append(operand)
+    if not flattened:
+        return None
+    if len(flattened) == 1:
+        return flattened[0]
+    return Requirement(operator, tuple(flattened))
+
+
+def _to_ref(course_ref: CourseRef | str) -> CourseRef:
+    if isinstance(course_ref, CourseRef):
+        return course_ref
+    subject_code, _, course_number = course_ref.strip().upper().rpartition(" ")
+    if not subject_code:
+        raise ValueError(f"Invalid course code: {course_ref}. Expected a code like 'CS 0445'")
+    return CourseRef(subject_code.strip(), course_number)
@@ -0,0 +1,208 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Literal, NamedTuple
+from urllib.parse import urlsplit
+
+import requests
+
+# Statuses meaning the server can't handle the request right now, but may well handle the same request later
+RETRY_STATUSES = frozenset({429, 503, 504})
+# Statuses that count against a host's circuit breaker, next to requests that got no response at all. 429 isn't one of
+# them, since a host that's throttling us is still up.
+FAILURE_STATUSES = frozenset({503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+CircuitState = Literal["closed", "open", "half-open"]
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request to a host whose circuit breaker is open."""
+
+
+class RetryPolicy(NamedTuple):
+    """How often and how soon failed requests are sent again.
+
+    Requests whose method is in `methods` are sent up to `attempts` times in total, as long as they failed to connect
+    or got one of `statuses`. Before each retry, the transport waits a random time between 0 and
+    backoff * 2**retry seconds (full jitter), capped at max_backoff, or as long as the response's Retry-After header
+    asks if that's longer, still capped at max_backoff. Requests that connected but timed out while waiting for the
+    response are never retried, since the host is likely to be just as slow the next time."""
+
+    attempts: int = 3
+    backoff: float = 0.25
+    max_backoff: float = 5.0
+    statuses: frozenset[int] = RETRY_STATUSES
+    methods: frozenset[str] = IDEMPOTENT_METHODS
+
+    def get_delay(self, retry: int, retry_after: float | None = None) -> float:
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2**retry))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_backoff))
+        return delay
+
+
+class HostCircuitBreaker:
+    """Stops sending requests to a host after `failure_threshold` failures in a row, so that callers fail fast with
+    CircuitOpenError instead of waiting on a host that's down.
+
+    A request fails if it got no response or one of `failure_statuses`. After `reset_timeout` seconds, a single trial
+    request is let through (the circuit is half-open): if it succeeds the circuit closes again, and if it fails the
+    circuit stays open for another `reset_timeout` seconds."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        failure_statuses: frozenset[int] = FAILURE_STATUSES,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_statuses = failure_statuses
+        self._failures: dict[str, int] = {}
+        self._opened_at: dict[str, float] = {}
+        self._trials: set[str] = set()
+        self._lock = threading.Lock()
+
+    def check(self, url: str) -> None:
+        """Raises CircuitOpenError if no request may be sent to the URL's host right now."""
+        host = urlsplit(url).hostname or ""
+        if host not in self._opened_at:
+            return
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return
+            remaining = opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0 or host in self._trials:
+                raise CircuitOpenError(
+                    f"{host} failed {self._failures.get(host, 0)} requests in a row, not sending requests to it for "
+                    f"another {max(remaining, 0):.0f}s"
+                )
+            self._trials.add(host)
+
+    def is_open(self, url: str) -> bool:
+        """Whether the circuit to the URL's host is open, so that a request that just failed shouldn't be retried."""
+        return self.get_state(urlsplit(url).hostname or "") == "open"
+
+    def record(self, url: str, failed: bool) -> None:
+        host = urlsplit(url).hostname or ""
+        if not failed and host not in self._failures:
+            return
+        with self._lock:
+            self._trials.discard(host)
+            if failed:
+                failures = self._failures[host] = self._failures.get(host, 0) + 1
+                if failures >= self.failure_threshold:
+                    self._opened_at[host] = time.monotonic()
+            else:
+                self._failures.pop(host, None)
+                self._opened_at.pop(host, None)
+
+    def release(self, url: str) -> None:
+        """Ends a trial request that neither succeeded nor failed, like one that couldn't be sent at all."""
+        with self._lock:
+            self._trials.discard(urlsplit(url).hostname or "")
+
+    def get_state(self, host: str) -> CircuitState:
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return "closed"
+            if host in self._trials or time.monotonic() >= opened_at + self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._failures.clear()
+            self._opened_at.clear()
+            self._trials.clear()
+
+
+class HostRetryBudget:
+    """Limits retries to a share of a host's successful requests, so that retries can't multiply the load on a host
+    that's struggling.
+
+    Each host starts with `max_tokens` tokens. A failed request takes one token and a successful one gives back
+    `token_ratio` tokens, and retries are only sent while more than half of the tokens are left. With the defaults,
+    retries stop after 5 failures in a row and resume once the host's requests succeed again."""
+
+    def __init__(self, max_tokens: float = 10.0, token_ratio: float = 0.1):
+        self.max_tokens = max_tokens
+        self.token_ratio = token_ratio
+        self._tokens: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, url: str, failed: bool) -> None:
+        host = urlsplit(url).hostname or ""
+        if not failed and host not in self._tokens:
+            return
+        with self._lock:
+            tokens = self._tokens.get(host, self.max_tokens) + (-1 if failed else self.token_ratio)
+            if tokens >= self.max_tokens:
+                self._tokens.pop(host, None)
+            else:
+                self._tokens[host] = max(tokens, 0.0)
+
+    def can_retry(self, url: str) -> bool:
+        return self._tokens.get(urlsplit(url).hostname or "", self.max_tokens) > self.max_tokens / 2
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+
+
+def get_retry_delay(
+    policy: RetryPolicy,
+    budget: HostRetryBudget,
+    url: str,
+    method: str,
+    retries: int,
+    status: int | None,
+    retry_after: str | None,
+) -> float | None:
+    """Returns how long to wait before resending a request that failed with `status`, or None if it shouldn't be
+    resent. `status` is None for requests that failed to connect."""
+    if retries + 1 >= policy.attempts or method.upper() not in policy.methods:
+        return None
+    if status is not None and status not in policy.statuses:
+        return None
+    if not budget.can_retry(url):
+        return None
+    return policy.get_delay(retries, _parse_retry_after(retry_after))
+
+
+def _parse_retry_after(retry_after: str | None) -> float | None:
+    if not retry_after:
+        return None
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,176 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from typing import Iterable, Iterator, NamedTuple
+
+from pittapi.course import Meeting, Section
+
+DAY_CODES = ("Mo", "Tu", "We", "Th", "Fr", "Sa", "Su")
+MINUTES_PER_DAY = 24 * 60
+# Matches both time formats PeopleSoft uses: "10.00.00.000000-05:00" (course sections) and "10:00AM" (section details)
+TIME_REGEX = re.compile(r"(\d{1,2})[.:](\d{2})(?:[.:]\d{2}(?:\.\d+)?)?\s*([AaPp][Mm])?")
+DATE_FORMAT = "%m/%d/%Y"
+
+
+class MeetingBlock(NamedTuple):
+    """A meeting pattern that repeats every week between two dates (as date ordinals, None if unknown)."""
+
+    first_day: int | None
+    last_day: int | None
+    week_mask: int
+
+
+class SectionTimes(NamedTuple):
+    """The weekly times a section meets, as a bitmask with one bit per minute of the week (bit 0 is Monday 12:00 AM).
+
+    `week_mask` is the union of every block's mask and is enough to rule out a conflict with a single AND. The blocks
+    are only needed when masks overlap, to tell apart sections that meet at the same time in different parts of a term.
+    """
+
+    section: Section
+    week_mask: int
+    blocks: tuple[MeetingBlock, ...]
+
+
+def get_day_mask(days: str) -> int:
+    """Converts PeopleSoft day strings like "MoWeFr" into a bitmask with bit 0 for Monday through bit 6 for Sunday."""
+    day_mask = 0
+    for i, day in enumerate(DAY_CODES):
+        if day in days:
+            day_mask |= 1 << i
+    return day_mask
+
+
+def parse_time(time_str: str) -> int | None:
+    """Converts a PeopleSoft time like "10.00.00.000000-05:00" or "2:30PM" into minutes after midnight.
+
+    Returns None if the string isn't a time, e.g. "TBA"."""
+    match = TIME_REGEX.match(time_str.strip())
+    if not match:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2)), match.group(3)
+    if meridiem:
+        hour = hour % 12 + (12 if meridiem.upper() == "PM" else 0)
+    return hour * 60 + minute
+
+
+def encode_meeting(meeting: Meeting) -> int:
+    """Returns the minutes of the week the meeting takes up as a bitmask, or 0 if it has no fixed time."""
+    start = parse_time(meeting.start_time)
+    end = parse_time(meeting.end_time)
+    if start is None or end is None or end <= start:
+        return 0
+
+    day_block = ((1 << (end - start)) - 1) << start
+    week_mask = 0
+    day_mask = get_day_mask(meeting.days)
+    for day in range(len(DAY_CODES)):
+        if day_mask & (1 << day):
+            week_mask |= day_block << (day * MINUTES_PER_DAY)
+    return week_mask
+
+
+def encode_section(section: Section) -> SectionTimes:
+    """Encodes all of a section's meetings. Do this once per section and reuse the result for every conflict check."""
+    blocks = []
+    week_mask = 0
+    for meeting in section.meetings or []:
+        meeting_mask = encode_meeting(meeting)
+        if meeting_mask:
+            blocks.append(MeetingBlock(_parse_date(meeting.start_date), _parse_date(meeting.end_date), meeting_mask))
+            week_mask |= meeting_mask
+    return SectionTimes(section=section, week_mask=week_mask, blocks=tuple(blocks))
+
+
+def conflicts(first: SectionTimes, second: SectionTimes) -> bool:
+    """Returns True if the two sections ever meet at the same time."""
+    if not first.week_mask & second.week_mask:
+        return False
+    for first_block in first.blocks:
+        for second_block in second.blocks:
+            if first_block.week_mask & second_block.week_mask and _dates_overlap(first_block, second_block):
+                return True
+    return False
+
+
+def has_conflict(sections: Iterable[SectionTimes]) -> bool:
+    """Returns True if any two of the sections meet at the same time."""
+    checked: list[SectionTimes] = []
+    combined_mask = 0
+    for section_times in sections:
+        if combined_mask & section_times.week_mask and any(conflicts(section_times, other) for other in checked):
+            return True
+        combined_mask |= section_times.week_mask
+        checked.append(section_times)
+    return False
+
+
+def find_schedules(options: list[list[Section]], limit: int | None = None) -> Iterator[list[Section]]:
+    """Yields every combination of one section from each list of options that has no time conflicts.
+
+    Each list of options is usually the sections of one course, or of one required component of a course (e.g. its
+    lectures and its recitations as two separate lists). Sections in each yielded schedule are in the same order as
+    `options`. Stops after `limit` schedules if a limit is given.
+    """
+    encoded = [[encode_section(section) for section in sections] for sections in options]
+    # Fill the most constrained slots first so that conflicts prune the search as early as possible
+    order = sorted(range(len(encoded)), key=lambda i: len(encoded[i]))
+    chosen: list[SectionTimes | None] = [None] * len(encoded)
+    found = 0
+
+    def search(depth: int, combined_mask: int, picked: list[SectionTimes]) -> Iterator[list[Section]]:
+        nonlocal found
+        if depth == len(order):
+            found += 1
+            yield [section_times.section for section_times in chosen if section_times is not None]
+            return
+        slot = order[depth]
+        for candidate in encoded[slot]:
+            if combined_mask & candidate.week_mask and any(conflicts(candidate, other) for other in picked):
+                continue
+            chosen[slot] = candidate
+            picked.append(candidate)
+            yield from search(depth + 1, combined_mask | candidate.week_mask, picked)
+            picked.pop()
+            if limit is not None and found >= limit:
+                return
+        chosen[slot] = None
+
+    if not options or limit == 0:
+        return
+    yield from search(0, 0, [])
+
+
+def _parse_date(date_str: str) -> int | None:
+    try:
+        return datetime.strptime(date_str.strip(), DATE_FORMAT).toordinal()
+    except ValueError:
+        return None
+
+
+def _dates_overlap(first: MeetingBlock, second: MeetingBlock) -> bool:
+    if first.last_day is not None and second.first_day is not None and first.last_day < second.first_day:
+        return False
+    if second.last_day is not None and first.first_day is not None and second.last_day < first.first_day:
+        return False
+    return True
@@ -17,9 +17,10 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 """
 
-import requests
 from typing import Any
 
+from pittapi import observe, transport
+
 
 JSON = dict[str, Any]
 
@@ -29,13 +30,16 @@ ARRIVAL_TIMES_URL = "http://www.pittshuttle.com/Services/JSONPRelay.svc/GetRoute
 STOP_ESTIMATES_URL = "http://www.pittshuttle.com/Services/JSONPRelay.svc/GetVehicleRouteStopEstimates"
 ROUTES_URL = "http://www.pittshuttle.com/Services/JSONPRelay.svc/GetRoutesForMap"
 
-sess = requests.session()
+observe.register_endpoint("shuttle.vehicle_points", VEHICLE_POINTS_URL)
+observe.register_endpoint("shuttle.arrival_times", ARRIVAL_TIMES_URL)
+observe.register_endpoint("shuttle.stop_estimates", STOP_ESTIMATES_URL)
+observe.register_endpoint("shuttle.routes", ROUTES_URL)
 
 
 def get_map_vehicle_points(api_key: str = API_KEY) -> JSON:
     """Return the map location for all active vehicles."""
     payload = {"ApiKey": api_key}
-    response = sess.get(VEHICLE_POINTS_URL, params=payload)
+    response = transport.get(VEHICLE_POINTS_URL, params=payload)
     response_json: JSON = response.json()
     return response_json
 
@@ -43,7 +47,7 @@ def get_map_vehicle_points(api_key: str = API_KEY) -> JSON:
 def get_route_stop_arrivals(api_key: str = API_KEY, times_per_stop: int = 1) -> JSON:
     """Return stop arrival times for all vehicles."""
     payload = {"ApiKey": api_key, "TimesPerStopString": str(times_per_stop)}
-    response = sess.get(ARRIVAL_TIMES_URL, params=payload)
+    response = transport.get(ARRIVAL_TIMES_URL, params=payload)
     response_json: JSON = response.json()
     return response_json
 
@@ -51,7 +55,7 @@ def get_route_stop_arrivals(api_key: str = API_KEY, times_per_stop: int = 1) ->
 def get_vehicle_route_stop_estimates(vehicle_id: str, quantity: int = 2) -> JSON:
     """Return {quantity} stop estimates for all active vehicles."""
     payload = {"vehicleIdStrings": vehicle_id, "quantity": str(quantity)}
-    response = sess.get(STOP_ESTIMATES_URL, params=payload)
+    response = transport.get(STOP_ESTIMATES_URL, params=payload)
     response_json: JSON = response.json()
     return response_json
 
@@ -59,6 +63,34 @@ def get_vehicle_route_stop_estimates(vehicle_id: str, quantity: int = 2) -> JSON
 def get_routes(api_key: str = API_KEY) -> JSON:
     """Return the routes with Vehicle Route Name, Vehicle ID, and all stops, etc."""
     payload = {"ApiKey": api_key}
-    response = sess.get(ROUTES_URL, params=payload)
+    response = transport.get(ROUTES_URL, params=payload)
+    response_json: JSON = response.json()
+    return response_json
+
+
+async def get_map_vehicle_points_async(api_key: str = API_KEY) -> JSON:
+    payload = {"ApiKey": api_key}
+    response = await transport.get_async(VEHICLE_POINTS_URL, params=payload)
+    response_json: JSON = response.json()
+    return response_json
+
+
+async def get_route_stop_arrivals_async(api_key: str = API_KEY, times_per_stop: int = 1) -> JSON:
+    payload = {"ApiKey": api_key, "TimesPerStopString": str(times_per_stop)}
+    response = await transport.get_async(ARRIVAL_TIMES_URL, params=payload)
+    response_json: JSON = response.json()
+    return response_json
+
+
+async def get_vehicle_route_stop_estimates_async(vehicle_id: str, quantity: int = 2) -> JSON:
+    payload = {"vehicleIdStrings": vehicle_id, "quantity": str(quantity)}
+    response = await transport.get_async(STOP_ESTIMATES_URL, params=payload)
+    response_json: JSON = response.json()
+    return response_json
+
+
+async def get_routes_async(api_key: str = API_KEY) -> JSON:
+    payload = {"ApiKey": api_key}
+    response = await transport.get_async(ROUTES_URL, params=payload)
     response_json: JSON = response.json()
     return response_json
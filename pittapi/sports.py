@@ -19,15 +19,19 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 
 from __future__ import annotations
 
-import requests
-
 from typing import Any, NamedTuple
 
+from pittapi import observe, transport
+from pittapi.cache import cached
+
 JSON = dict[str, Any]
 
 FOOTBALL_URL = "http://site.api.espn.com/apis/site/v2/sports/football/college-football/teams/pitt"
 MENS_BASKETBALL_URL = "http://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/teams/pittsburgh"
 
+observe.register_endpoint("sports.football", FOOTBALL_URL)
+observe.register_endpoint("sports.mens_basketball", MENS_BASKETBALL_URL)
+
 
 class GameInfo(NamedTuple):
     timestamp: str | None = None
@@ -39,19 +43,75 @@ class GameInfo(NamedTuple):
 
 def get_mens_basketball_record() -> str:
     """returns the current record of the men's basketball team"""
-    basketball_data = _get_mens_basketball_data()
+    return _parse_record(_get_mens_basketball_data())
+
+
+async def get_mens_basketball_record_async() -> str:
+    return _parse_record(await _get_mens_basketball_data_async())
+
+
+def get_next_mens_basketball_game() -> GameInfo:
+    """returns a dict containing details of the next scheduled men's basketball game."""
+    return _parse_next_mens_basketball_game(_get_mens_basketball_data())
+
+
+async def get_next_mens_basketball_game_async() -> GameInfo:
+    return _parse_next_mens_basketball_game(await _get_mens_basketball_data_async())
+
+
+def get_mens_basketball_standings() -> str:
+    """returns a string describing the placement of the men's basketball team. eg: '14th in ACC'"""
+    return _parse_standings(_get_mens_basketball_data())
+
+
+async def get_mens_basketball_standings_async() -> str:
+    return _parse_standings(await _get_mens_basketball_data_async())
+
+
+def get_football_record() -> str:
+    """returns the current record of the men's football team"""
+    return _parse_record(_get_football_data())
+
+
+async def get_football_record_async() -> str:
+    return _parse_record(await _get_football_data_async())
+
+
+def get_next_football_game() -> GameInfo:
+    return _parse_next_football_game(_get_football_data())
+
+
+async def get_next_football_game_async() -> GameInfo:
+    return _parse_next_football_game(await _get_football_data_async())
+
+
+def get_football_standings() -> str:
+    """returns a string describing the placement of the football team. eg: '14th in ACC'"""
+    return _parse_standings(_get_football_data())
+
+
+async def get_football_standings_async() -> str:
+    return _parse_standings(await _get_football_data_async())
 
+
+@observe.parser("sports.team")
+def _parse_record(team_data: JSON) -> str:
     try:
-        record_summary: str = basketball_data["team"]["record"]["items"][0]["summary"]
+        record_summary: str = team_data["team"]["record"]["items"][0]["summary"]
     except KeyError:
         record_summary = "There's no record right now."
 
     return record_summary
 
 
-def get_next_mens_basketball_game() -> GameInfo:
-    """returns a dict containing details of the next scheduled men's basketball game."""
-    basketball_data = _get_mens_basketball_data()
+@observe.parser("sports.team")
+def _parse_standings(team_data: JSON) -> str:
+    return_value: str = team_data["team"]["standingSummary"]
+    return return_value
+
+
+@observe.parser("sports.mens_basketball")
+def _parse_next_mens_basketball_game(basketball_data: JSON) -> GameInfo:
     next_game = None
     try:
         next_game = basketball_data["team"]["nextEvent"][0]
@@ -87,27 +147,8 @@ def get_next_mens_basketball_game() -> GameInfo:
         return GameInfo(status="NO_GAME_SCHEDULED")
 
 
-def get_mens_basketball_standings() -> str:
-    """returns a string describing the placement of the men's basketball team. eg: '14th in ACC'"""
-    basketball_data = _get_mens_basketball_data()
-    return_value: str = basketball_data["team"]["standingSummary"]
-    return return_value
-
-
-def get_football_record() -> str:
-    """returns the current record of the men's football team"""
-    football_data = _get_football_data()
-
-    try:
-        record_summary: str = football_data["team"]["record"]["items"][0]["summary"]
-    except KeyError:
-        record_summary = "There's no record right now."
-
-    return record_summary
-
-
-def get_next_football_game() -> GameInfo:
-    football_data = _get_football_data()
+@observe.parser("sports.football")
+def _parse_next_football_game(football_data: JSON) -> GameInfo:
     next_game = None
     try:
         next_game = football_data["team"]["nextEvent"][0]
@@ -143,18 +184,25 @@ def get_next_football_game() -> GameInfo:
         return GameInfo(status="NO_GAME_SCHEDULED")
 
 
-def get_football_standings() -> str:
-    """returns a string describing the placement of the football team. eg: '14th in ACC'"""
-    football_data = _get_football_data()
-    return_value: str = football_data["team"]["standingSummary"]
-    return return_value
-
-
+@cached("sports.mens_basketball")
 def _get_mens_basketball_data() -> JSON:
-    json_data: JSON = requests.get(MENS_BASKETBALL_URL).json()
+    json_data: JSON = transport.get_json(MENS_BASKETBALL_URL)
     return json_data
 
 
+@cached("sports.football")
 def _get_football_data() -> JSON:
-    json_data: JSON = requests.get(FOOTBALL_URL).json()
+    json_data: JSON = transport.get_json(FOOTBALL_URL)
+    return json_data
+
+
+@cached("sports.mens_basketball")
+async def _get_mens_basketball_data_async() -> JSON:
+    json_data: JSON = await transport.get_json_async(MENS_BASKETBALL_URL)
+    return json_data
+
+
+@cached("sports.football")
+async def _get_football_data_async() -> JSON:
+    json_data: JSON = await transport.get_json_async(FOOTBALL_URL)
     return json_data
@@ -17,14 +17,27 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 """
 
-import requests
 from typing import Any
 
+from pittapi import observe, transport
+from pittapi.cache import cached
+
+STATUS_URL = "https://status.pitt.edu/index.json"
+
+observe.register_endpoint("status.status", STATUS_URL)
+
 
 def get_status() -> dict[str, list[Any]]:
     """Gets status information about all Pitt services"""
-    status = requests.get("https://status.pitt.edu/index.json")
-    data = status.json()
+    return _parse_status(_get_status_data())
+
+
+async def get_status_async() -> dict[str, list[Any]]:
+    return _parse_status(await _get_status_data_async())
+
+
+@observe.parser("status.status")
+def _parse_status(data: dict[str, Any]) -> dict[str, list[Any]]:
     components = [
         {
             "status": component["status"],
@@ -72,3 +85,15 @@ def get_status() -> dict[str, list[Any]]:
     ret = {"components": components, "incidents": incidents}
 
     return ret
+
+
+@cached("status.status")
+def _get_status_data() -> dict[str, Any]:
+    data: dict[str, Any] = transport.get_json(STATUS_URL)
+    return data
+
+
+@cached("status.status")
+async def _get_status_data_async() -> dict[str, Any]:
+    data: dict[str, Any] = await transport.get_json_async(STATUS_URL)
+    return data
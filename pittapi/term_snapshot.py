@@ -0,0 +1,329 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from typing import Any, BinaryIO, Iterable, Sequence
+
+from pittapi.course import Course, CourseDetails, Section, Subject
+from pittapi.term_store import COLUMNS, TYPECODES, TermSections
+
+SNAPSHOT_MAGIC = b"PITTSNAP"
+SNAPSHOT_VERSION = 1
+# Magic, format version and directory length, followed by the JSON directory and the 8-byte aligned data
+HEADER = struct.Struct("<8sII")
+ALIGNMENT = 8
+
+# Snapshot-only columns, next to the TermSections columns. Courses are sorted by subject code and course number,
+# sections by course too, and class_number_order lists section rows sorted by class number, so that every lookup is a
+# binary search over the mapped file.
+COURSE_COLUMNS = {"course_subject_code": "s", "course_course_number": "s", "course_id": "s", "course_title": "s"}
+
+
+class TermSnapshot:
+    """Read-only view of a snapshot file written by write_snapshot.
+
+    The file is memory-mapped, so any number of processes can open the same snapshot and share one copy of it in the
+    page cache. Nothing is deserialized up front: strings are decoded and `Section` objects created only when a lookup
+    reaches them. A publisher replaces the snapshot with write_snapshot, and open readers keep using the file they
+    mapped until they call `is_stale` and reopen it."""
+
+    def __init__(self, path: str | os.PathLike[str]):
+        self.path = path
+        with open(path, "rb") as f:
+            self._stat = os.fstat(f.fileno())
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        self._views: list[memoryview] = []
+        try:
+            if len(self._buffer) < HEADER.size:
+                raise ValueError(f"{path} is not a term snapshot")
+            magic, version, directory_length = HEADER.unpack_from(self._buffer)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a term snapshot")
+            if version != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported term snapshot version: {version}")
+            directory = json.loads(bytes(self._buffer[HEADER.size : HEADER.size + directory_length]))
+            if directory["byteorder"] != sys.byteorder:
+                raise ValueError(f"{path} was written on a {directory['byteorder']}-endian machine")
+        except Exception:
+            self.close()
+            raise
+
+        self.term: str = directory["term"]
+        self.created_at: float = directory["created_at"]
+        columns = {name: self._get_view(*location) for name, location in directory["columns"].items()}
+        self._strings = _MappedStringPool(
+            self._get_view(*directory["string_offsets"]), self._get_view(*directory["string_data"])
+        )
+        self._course_columns = {name: columns.pop(name) for name in COURSE_COLUMNS}
+        self._class_number_order = columns.pop("class_number_order")
+        self.sections = TermSections(columns, self._strings)  # type: ignore[arg-type]
+
+    def __enter__(self) -> TermSnapshot:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._buffer.release()
+        self._mmap.close()
+
+    def is_stale(self) -> bool:
+        """Returns True if a newer snapshot has been published to the same path since this one was opened."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return True
+        return (stat.st_ino, stat.st_dev, stat.st_mtime_ns) != (self._stat.st_ino, self._stat.st_dev, self._stat.st_mtime_ns)
+
+    def get_subject_codes(self) -> list[str]:
+        strings = self._strings
+        subject_codes: list[str] = []
+        for index in self._course_columns["course_subject_code"]:
+            subject_code = strings[index] or ""
+            if not subject_codes or subject_codes[-1] != subject_code:
+                subject_codes.append(subject_code)
+        return subject_codes
+
+    def get_subject(self, subject_code: str) -> Subject | None:
+        """Returns a subject and all of its courses, or None if the snapshot has no courses in the subject."""
+        start, end = self._find_courses(subject_code)
+        if start == end:
+            return None
+        courses = [self._get_course(row) for row in range(start, end)]
+        return Subject(subject_code=subject_code, courses={course_obj.course_number: course_obj for course_obj in courses})
+
+    def get_course(self, subject_code: str, course_number: str) -> Course | None:
+        start, end = self._find_courses(subject_code, course_number)
+        return self._get_course(start) if start < end else None
+
+    def get_course_details(self, subject_code: str, course_number: str) -> CourseDetails | None:
+        """Returns a course with its sections. Only fields that the snapshot stores are set."""
+        course_obj = self.get_course(subject_code, course_number)
+        if course_obj is None:
+            return None
+        return CourseDetails(course=course_obj, sections=self.get_course_sections(subject_code, course_number))
+
+    def get_course_sections(self, subject_code: str, course_number: str) -> list[Section]:
+        subject_index = self._strings.find(subject_code)
+        number_index = self._strings.find(course_number)
+        if subject_index is None or number_index is None:
+            return []
+        subjects = self.sections.get_column("subject_code")
+        numbers = self.sections.get_column("course_number")
+        rows = range(len(self.sections))
+        target = (subject_index, number_index)
+        start = bisect.bisect_left(rows, target, key=lambda row: (subjects[row], numbers[row]))
+        end = bisect.bisect_right(rows, target, lo=start, key=lambda row: (subjects[row], numbers[row]))
+        return [self.sections[row] for row in range(start, end)]
+
+    def get_section(self, class_number: str | int) -> Section | None:
+        target = _encode_class_number(str(class_number), self._strings)
+        if target is None:
+            return None
+        class_numbers = self.sections.get_column("class_number")
+        order = self._class_number_order
+        position = bisect.bisect_left(order, target, key=lambda row: class_numbers[row])
+        if position == len(order) or class_numbers[order[position]] != target:
+            return None
+        return self.sections[order[position]]
+
+    def _find_courses(self, subject_code: str, course_number: str | None = None) -> tuple[int, int]:
+        subject_index = self._strings.find(subject_code)
+        if subject_index is None:
+            return 0, 0
+        subjects = self._course_columns["course_subject_code"]
+        start = bisect.bisect_left(subjects, subject_index)
+        end = bisect.bisect_right(subjects, subject_index, lo=start)
+        if course_number is None:
+            return start, end
+        number_index = self._strings.find(course_number)
+        if number_index is None:
+            return 0, 0
+        numbers = self._course_columns["course_course_number"]
+        rows = range(start, end)
+        position = bisect.bisect_left(rows, number_index, key=lambda row: numbers[row])
+        if position == len(rows) or numbers[rows[position]] != number_index:
+            return 0, 0
+        return rows[position], rows[position] + 1
+
+    def _get_course(self, row: int) -> Course:
+        strings = self._strings
+        columns = self._course_columns
+        return Course(
+            subject_code=strings[columns["course_subject_code"][row]] or "",
+            course_number=strings[columns["course_course_number"][row]] or "",
+            course_id=strings[columns["course_id"][row]] or "",
+            course_title=strings[columns["course_title"][row]] or "",
+        )
+
+    def _get_view(self, typecode: str, offset: int, length: int) -> memoryview:
+        view = self._buffer[offset : offset + length * array(typecode).itemsize].cast(typecode)
+        self._views.append(view)
+        return view
+
+
+def write_snapshot(
+    path: str | os.PathLike[str], term: str, courses: Iterable[CourseDetails], subjects: Iterable[Subject] = ()
+) -> None:
+    """Writes a snapshot of a term's courses and sections, e.g. from course.crawl_term, to `path`.
+
+    Courses from `subjects` (e.g. from course.get_subject_courses) are included even if they aren't offered in the term.
+    The snapshot is written to a temporary file next to `path` and renamed into place, so readers either open the old
+    snapshot or the complete new one, never a partial file."""
+    details_by_key: dict[tuple[str, str], CourseDetails] = {}
+    for subject in subjects:
+        for course_obj in subject.courses.values():
+            details_by_key.setdefault((course_obj.subject_code, course_obj.course_number), CourseDetails(course=course_obj))
+    for course_details in courses:
+        course_obj = course_details.course
+        details_by_key[(course_obj.subject_code, course_obj.course_number)] = course_details
+    sorted_details = [details_by_key[key] for key in sorted(details_by_key)]
+
+    term_sections = TermSections.from_course_details(sorted_details)
+    strings = term_sections.strings
+    columns: dict[str, Any] = {name: term_sections.get_column(name) for name in COLUMNS}
+    columns.update({name: array(TYPECODES[typecode]) for name, typecode in COURSE_COLUMNS.items()})
+    for course_details in sorted_details:
+        course_obj = course_details.course
+        columns["course_subject_code"].append(strings.intern(course_obj.subject_code))
+        columns["course_course_number"].append(strings.intern(course_obj.course_number))
+        columns["course_id"].append(strings.intern(course_obj.course_id))
+        columns["course_title"].append(strings.intern(course_obj.course_title))
+
+    # Sort the string pool so that index order is string order, which lets readers binary search it and the sorted
+    # course and section columns without decoding anything
+    sorted_strings = [None] + sorted(string for string in strings if string is not None)
+    remap = array("I", [0]) * len(strings)
+    for new_index, string in enumerate(sorted_strings):
+        old_index = strings.find(string)
+        assert old_index is not None
+        remap[old_index] = new_index
+    all_typecodes = {**COLUMNS, **COURSE_COLUMNS}
+    for name, typecode in all_typecodes.items():
+        if typecode == "s":
+            columns[name] = array("I", (remap[index] for index in columns[name]))
+        elif typecode == "n":
+            columns[name] = array("q", (value if value >= 0 else -remap[-value - 1] - 1 for value in columns[name]))
+    class_numbers = columns["class_number"]
+    columns["class_number_order"] = array("I", sorted(range(len(class_numbers)), key=lambda row: class_numbers[row]))
+
+    encoded_strings = [string.encode() if string is not None else b"" for string in sorted_strings]
+    string_offsets = array("Q", [0])
+    for encoded in encoded_strings:
+        string_offsets.append(string_offsets[-1] + len(encoded))
+
+    directory_path = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".snapshot-", dir=directory_path)
+    try:
+        os.chmod(temp_path, 0o644)
+        with os.fdopen(fd, "wb") as f:
+            _write_data(f, term, columns, string_offsets, b"".join(encoded_strings))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _write_data(
+    f: BinaryIO, term: str, columns: dict[str, array[int]], string_offsets: array[int], string_data: bytes
+) -> None:
+    # Lay out every block first, since the directory that points at them comes before them in the file
+    blocks: list[tuple[str, bytes, str, int]] = [
+        (name, column.tobytes(), column.typecode, len(column)) for name, column in columns.items()
+    ]
+    blocks.append(("string_offsets", string_offsets.tobytes(), "Q", len(string_offsets)))
+    blocks.append(("string_data", string_data, "B", len(string_data)))
+
+    directory: dict[str, Any] = {"term": term, "byteorder": sys.byteorder, "created_at": time.time()}
+    # The directory length depends on the offsets inside it, so reserve generous room for the offset digits
+    locations: dict[str, list[Any]] = {name: [typecode, 0, length] for name, _, typecode, length in blocks}
+    directory_size = len(json.dumps({**directory, "locations": locations}).encode()) + 24 * len(blocks) + 64
+    offset = _align(HEADER.size + directory_size)
+    for name, data, typecode, length in blocks:
+        locations[name][1] = offset
+        offset = _align(offset + len(data))
+
+    directory["columns"] = {name: locations[name] for name in columns}
+    directory["string_offsets"] = locations["string_offsets"]
+    directory["string_data"] = locations["string_data"]
+    encoded_directory = json.dumps(directory).encode()
+    assert HEADER.size + len(encoded_directory) <= locations[blocks[0][0]][1]
+
+    f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(encoded_directory)))
+    f.write(encoded_directory)
+    position = HEADER.size + len(encoded_directory)
+    for name, data, _, _ in blocks:
+        f.write(b"\0" * (locations[name][1] - position))
+        f.write(data)
+        position = locations[name][1] + len(data)
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _encode_class_number(class_number: str, strings: _MappedStringPool) -> int | None:
+    if class_number.isascii() and class_number.isdigit() and (class_number == "0" or class_number[0] != "0"):
+        return int(class_number)
+    index = strings.find(class_number)
+    return None if index is None else -index - 1
+
+
+class _MappedStringPool:
+    """Read-only StringPool over a snapshot's sorted strings. Index 0 is None, like in StringPool."""
+
+    def __init__(self, offsets: Sequence[int], data: memoryview):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str | None:
+        if index == 0:
+            return None
+        return bytes(self._data[self._offsets[index] : self._offsets[index + 1]]).decode()
+
+    def intern(self, string: str | None) -> int:
+        raise TypeError("Term snapshots are read-only")
+
+    def find(self, string: str | None) -> int | None:
+        if string is None:
+            return 0
+        position = bisect.bisect_left(range(1, len(self)), string, key=self.__getitem__) + 1
+        if position < len(self) and self[position] == string:
+            return position
+        return None
@@ -0,0 +1,363 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, Iterator, MutableSequence, Sequence, overload
+
+from pittapi.course import CourseDetails, Instructor, Meeting, Section, SectionDetails
+from pittapi.schedule import get_day_mask, parse_time
+
+# Typecodes of every column. "s" columns hold indexes into the string pool ("I"), and "n" columns hold numeric strings
+# as ints, with any string that isn't a plain non-negative number stored as -(pool index + 1) instead ("q").
+COLUMNS = {
+    # One row per section
+    "subject_code": "s",
+    "course_number": "s",
+    "term": "s",
+    "session": "s",
+    "section_number": "s",
+    "class_number": "n",
+    "section_type": "s",
+    "status": "s",
+    "section_flags": "B",
+    "instructor_offsets": "I",
+    "meeting_offsets": "I",
+    "units": "s",
+    "class_capacity": "n",
+    "enrollment_total": "n",
+    "enrollment_available": "n",
+    "wait_list_capacity": "n",
+    "wait_list_total": "n",
+    "valid_to_enroll": "s",
+    "combined_offsets": "I",
+    # One row per section instructor, meeting and combined section number, found through the offset columns above
+    "instructor_name": "s",
+    "instructor_email": "s",
+    "days": "s",
+    "start_time": "s",
+    "end_time": "s",
+    "start_date": "s",
+    "end_date": "s",
+    "day_mask": "B",
+    "start_minute": "h",
+    "end_minute": "h",
+    "meeting_flags": "B",
+    "meeting_instructor_offsets": "I",
+    "combined_section_number": "n",
+    # One row per meeting instructor
+    "meeting_instructor_name": "s",
+    "meeting_instructor_email": "s",
+}
+TYPECODES = {"s": "I", "n": "q"}
+OFFSET_COLUMNS = ("instructor_offsets", "meeting_offsets", "combined_offsets", "meeting_instructor_offsets")
+
+# section_flags and meeting_flags bits, to tell None apart from an empty list
+NO_INSTRUCTORS = 1
+NO_MEETINGS = 2
+HAS_DETAILS = 4
+NO_COMBINED_SECTIONS = 8
+
+
+class StringPool:
+    """Interned strings, each stored once and referred to by its index. Index 0 is reserved for None."""
+
+    def __init__(self, strings: Iterable[str | None] = (None,)):
+        self._strings: list[str | None] = list(strings)
+        self._indexes: dict[str | None, int] = {string: i for i, string in enumerate(self._strings)}
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __getitem__(self, index: int) -> str | None:
+        return self._strings[index]
+
+    def __iter__(self) -> Iterator[str | None]:
+        return iter(self._strings)
+
+    def intern(self, string: str | None) -> int:
+        index = self._indexes.get(string)
+        if index is None:
+            index = len(self._strings)
+            self._strings.append(string)
+            self._indexes[string] = index
+        return index
+
+    def find(self, string: str | None) -> int | None:
+        """Returns the index of a string, or None if it was never interned."""
+        return self._indexes.get(string)
+
+
+class TermSections(Sequence[Section]):
+    """Columnar store for every section of a crawled term.
+
+    Each field is kept in one flat array instead of one Python object per value: strings are interned into a shared
+    pool, numbers such as class numbers, capacities and meeting times are stored as machine integers, and nested
+    instructors and meetings are rows of their own located through offset columns. A handful of large arrays is both
+    far smaller than the equivalent NamedTuples and friendlier to forked workers, since reading them doesn't touch the
+    reference count of millions of small objects.
+
+    Indexing or iterating creates `Section` objects on access, so only the sections in use are ever materialized."""
+
+    def __init__(self, columns: dict[str, MutableSequence[int]] | None = None, strings: StringPool | None = None) -> None:
+        if columns is None:
+            columns = {name: array(TYPECODES.get(typecode, typecode)) for name, typecode in COLUMNS.items()}
+            for name in OFFSET_COLUMNS:
+                columns[name].append(0)
+        self._columns = columns
+        self._strings = strings if strings is not None else StringPool()
+        self._class_numbers: dict[str, int] | None = None
+        self._courses: dict[tuple[str, str], list[int]] | None = None
+
+    @classmethod
+    def from_course_details(cls, courses: Iterable[CourseDetails]) -> TermSections:
+        """Builds the store from CourseDetails objects, e.g. the output of course.crawl_term."""
+        term_sections = cls()
+        for course_details in courses:
+            term_sections.add_course_details(course_details)
+        return term_sections
+
+    def __len__(self) -> int:
+        return len(self._columns["class_number"])
+
+    @overload
+    def __getitem__(self, index: int) -> Section: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Section]: ...
+
+    def __getitem__(self, index: int | slice) -> Section | list[Section]:
+        if isinstance(index, slice):
+            return [self._get_section(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("section index out of range")
+        return self._get_section(index)
+
+    def __iter__(self) -> Iterator[Section]:
+        for i in range(len(self)):
+            yield self._get_section(i)
+
+    @property
+    def strings(self) -> StringPool:
+        return self._strings
+
+    def get_column(self, name: str) -> Sequence[int]:
+        """Returns a raw column. Use `strings` to decode string columns."""
+        return self._columns[name]
+
+    def nbytes(self) -> int:
+        """Returns the size of the columns in bytes, not counting the string pool."""
+        return sum(len(column) * column.itemsize for column in self._columns.values())  # type: ignore[attr-defined]
+
+    def add_course_details(self, course_details: CourseDetails) -> None:
+        course_obj = course_details.course
+        for section in course_details.sections or []:
+            self.append(section, course_obj.subject_code, course_obj.course_number)
+
+    def append(self, section: Section, subject_code: str | None = None, course_number: str | None = None) -> None:
+        columns = self._columns
+        intern = self._strings.intern
+        encode = self._encode_number
+
+        flags = 0
+        if section.instructors is None:
+            flags |= NO_INSTRUCTORS
+        if section.meetings is None:
+            flags |= NO_MEETINGS
+        details = section.details
+        if details is not None:
+            flags |= HAS_DETAILS
+            if details.combined_section_numbers is None:
+                flags |= NO_COMBINED_SECTIONS
+        else:
+            details = SectionDetails("", "", "", "", "", "", "")
+
+        columns["subject_code"].append(intern(subject_code))
+        columns["course_number"].append(intern(course_number))
+        columns["term"].append(intern(section.term))
+        columns["session"].append(intern(section.session))
+        columns["section_number"].append(intern(section.section_number))
+        columns["class_number"].append(encode(section.class_number))
+        columns["section_type"].append(intern(section.section_type))
+        columns["status"].append(intern(section.status))
+        columns["section_flags"].append(flags)
+
+        for instructor in section.instructors or []:
+            columns["instructor_name"].append(intern(instructor.name))
+            columns["instructor_email"].append(intern(instructor.email))
+        columns["instructor_offsets"].append(len(columns["instructor_name"]))
+
+        for meeting in section.meetings or []:
+            self._append_meeting(meeting)
+        columns["meeting_offsets"].append(len(columns["days"]))
+
+        columns["units"].append(intern(details.units))
+        columns["class_capacity"].append(encode(details.class_capacity))
+        columns["enrollment_total"].append(encode(details.enrollment_total))
+        columns["enrollment_available"].append(encode(details.enrollment_available))
+        columns["wait_list_capacity"].append(encode(details.wait_list_capacity))
+        columns["wait_list_total"].append(encode(details.wait_list_total))
+        columns["valid_to_enroll"].append(intern(details.valid_to_enroll))
+        for class_number in details.combined_section_numbers or []:
+            columns["combined_section_number"].append(encode(str(class_number)))
+        columns["combined_offsets"].append(len(columns["combined_section_number"]))
+
+        self._class_numbers = None
+        self._courses = None
+
+    def get_section(self, class_number: str | int) -> Section | None:
+        """Returns the section with a class number, or None if it isn't stored."""
+        if self._class_numbers is None:
+            column = self._columns["class_number"]
+            self._class_numbers = {self._decode_number(column[i]): i for i in range(len(self))}
+        index = self._class_numbers.get(str(class_number))
+        return None if index is None else self._get_section(index)
+
+    def get_course_sections(self, subject_code: str, course_number: str) -> list[Section]:
+        """Returns the sections of a course, in the order they were added."""
+        if self._courses is None:
+            subjects = self._columns["subject_code"]
+            numbers = self._columns["course_number"]
+            strings = self._strings
+            self._courses = {}
+            for i in range(len(self)):
+                key = (strings[subjects[i]] or "", strings[numbers[i]] or "")
+                self._courses.setdefault(key, []).append(i)
+        return [self._get_section(i) for i in self._courses.get((subject_code, course_number), [])]
+
+    def find(self, **criteria: str) -> list[int]:
+        """Returns the indexes of the sections whose string fields equal all criteria, e.g. find(status="Open",
+        section_type="LEC"), comparing interned indexes without creating any Section objects."""
+        matches = range(len(self))
+        for name, value in criteria.items():
+            if COLUMNS.get(name) != "s":
+                raise ValueError(f"Can't filter on {name}. Use one of the string columns: {_string_columns()}")
+            index = self._strings.find(value)
+            if index is None:
+                return []
+            column = self._columns[name]
+            matches = [i for i in matches if column[i] == index]  # type: ignore[assignment]
+        return list(matches)
+
+    def get_meeting_times(self, index: int) -> list[tuple[int, int, int]]:
+        """Returns (day mask, start minute, end minute) for each meeting of a section, -1 for times that aren't set."""
+        columns = self._columns
+        start, end = columns["meeting_offsets"][index], columns["meeting_offsets"][index + 1]
+        return [(columns["day_mask"][i], columns["start_minute"][i], columns["end_minute"][i]) for i in range(start, end)]
+
+    def _append_meeting(self, meeting: Meeting) -> None:
+        columns = self._columns
+        intern = self._strings.intern
+        start_minute = parse_time(meeting.start_time)
+        end_minute = parse_time(meeting.end_time)
+
+        columns["days"].append(intern(meeting.days))
+        columns["start_time"].append(intern(meeting.start_time))
+        columns["end_time"].append(intern(meeting.end_time))
+        columns["start_date"].append(intern(meeting.start_date))
+        columns["end_date"].append(intern(meeting.end_date))
+        columns["day_mask"].append(get_day_mask(meeting.days))
+        columns["start_minute"].append(-1 if start_minute is None else start_minute)
+        columns["end_minute"].append(-1 if end_minute is None else end_minute)
+        columns["meeting_flags"].append(NO_INSTRUCTORS if meeting.instructors is None else 0)
+        for instructor in meeting.instructors or []:
+            columns["meeting_instructor_name"].append(intern(instructor.name))
+            columns["meeting_instructor_email"].append(intern(instructor.email))
+        columns["meeting_instructor_offsets"].append(len(columns["meeting_instructor_name"]))
+
+    def _get_section(self, index: int) -> Section:
+        columns = self._columns
+        strings = self._strings
+        decode = self._decode_number
+        flags = columns["section_flags"][index]
+
+        instructors = None
+        if not flags & NO_INSTRUCTORS:
+            start, end = columns["instructor_offsets"][index], columns["instructor_offsets"][index + 1]
+            names, emails = columns["instructor_name"], columns["instructor_email"]
+            instructors = [Instructor(name=strings[names[i]] or "", email=strings[emails[i]]) for i in range(start, end)]
+
+        meetings = None
+        if not flags & NO_MEETINGS:
+            start, end = columns["meeting_offsets"][index], columns["meeting_offsets"][index + 1]
+            meetings = [self._get_meeting(i) for i in range(start, end)]
+
+        details = None
+        if flags & HAS_DETAILS:
+            combined_section_numbers = None
+            if not flags & NO_COMBINED_SECTIONS:
+                start, end = columns["combined_offsets"][index], columns["combined_offsets"][index + 1]
+                combined_section_numbers = [decode(columns["combined_section_number"][i]) for i in range(start, end)]
+            details = SectionDetails(
+                units=strings[columns["units"][index]] or "",
+                class_capacity=decode(columns["class_capacity"][index]),
+                enrollment_total=decode(columns["enrollment_total"][index]),
+                enrollment_available=decode(columns["enrollment_available"][index]),
+                wait_list_capacity=decode(columns["wait_list_capacity"][index]),
+                wait_list_total=decode(columns["wait_list_total"][index]),
+                valid_to_enroll=strings[columns["valid_to_enroll"][index]] or "",
+                combined_section_numbers=combined_section_numbers,
+            )
+
+        return Section(
+            term=strings[columns["term"][index]] or "",
+            session=strings[columns["session"][index]] or "",
+            section_number=strings[columns["section_number"][index]] or "",
+            class_number=decode(columns["class_number"][index]),
+            section_type=strings[columns["section_type"][index]] or "",
+            status=strings[columns["status"][index]] or "",
+            instructors=instructors,
+            meetings=meetings,
+            details=details,
+        )
+
+    def _get_meeting(self, index: int) -> Meeting:
+        columns = self._columns
+        strings = self._strings
+        instructors = None
+        if not columns["meeting_flags"][index] & NO_INSTRUCTORS:
+            start = columns["meeting_instructor_offsets"][index]
+            end = columns["meeting_instructor_offsets"][index + 1]
+            names, emails = columns["meeting_instructor_name"], columns["meeting_instructor_email"]
+            instructors = [Instructor(name=strings[names[i]] or "", email=strings[emails[i]]) for i in range(start, end)]
+        return Meeting(
+            days=strings[columns["days"][index]] or "",
+            start_time=strings[columns["start_time"][index]] or "",
+            end_time=strings[columns["end_time"][index]] or "",
+            start_date=strings[columns["start_date"][index]] or "",
+            end_date=strings[columns["end_date"][index]] or "",
+            instructors=instructors,
+        )
+
+    def _encode_number(self, value: str | None) -> int:
+        if value is not None and value.isascii() and value.isdigit() and (value == "0" or value[0] != "0") and len(value) < 19:
+            return int(value)
+        return -self._strings.intern(value) - 1
+
+    def _decode_number(self, value: int) -> str:
+        if value >= 0:
+            return str(value)
+        return self._strings[-value - 1] or ""
+
+
+def _string_columns() -> str:
+    return ", ".join(name for name, typecode in COLUMNS.items() if typecode == "s")
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
-# grequests must be imported before all other libraries, especially requests,
-# because grequests uses gevent, which in turn uses monkey-patching to implement concurrency
-import grequests
 import warnings
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from requests import ConnectionError
-from requests_html import HTMLResponse, HTMLSession
-from typing import Any, NamedTuple
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from pittapi import observe, transport
+
+# requests_html pulls in lxml and pyppeteer, so it's only imported once the textbook site is contacted
+if TYPE_CHECKING:
+    from requests_html import HTMLResponse, HTMLSession
 
 BASE_URL = "https://pitt.verbacompare.com/"
 
@@ -16,10 +19,15 @@ SUBJECTS_URL = BASE_URL + "compare/departments/?term={term_id}"
 COURSES_URL = BASE_URL + "compare/courses/?id={dept_id}&term_id={term_id}"
 BOOKS_URL = BASE_URL + "compare/books?id={section_id}"
 
+observe.register_endpoint("textbook.base_page", BASE_URL)
+observe.register_endpoint("textbook.subjects", SUBJECTS_URL)
+observe.register_endpoint("textbook.courses", COURSES_URL)
+observe.register_endpoint("textbook.books", BOOKS_URL)
+
 CURRENT_TERM_ID = 78104  # Term ID for fall 2024, TODO: figure out how this ID is generated
-MAX_REQUEST_ATTEMPTS = 3
+# Maximum number of textbook requests in flight at once
+MAX_WORKERS = 8
 
-sess = HTMLSession()
 request_headers: dict[str, str] | None = None
 subject_map: dict[str, str] | None = None
 
@@ -56,6 +64,7 @@ class Textbook(NamedTuple):
     citation: str | None
 
     @classmethod
+    @observe.parser("textbook.books")
     def from_json(cls, json: dict[str, Any]) -> Textbook | None:
         parsed_textbook = cls(
             title=json.get("title"),
@@ -68,14 +77,16 @@ class Textbook(NamedTuple):
         return parsed_textbook if any(field for field in parsed_textbook) else None
 
 
+def _get_session() -> HTMLSession:
+    from requests_html import HTMLSession
+
+    return transport.get_transport().get_session(HTMLSession)
+
+
 def _update_headers() -> None:
-    for i in range(MAX_REQUEST_ATTEMPTS):
-        base_response: HTMLResponse = sess.get(BASE_URL)
-        if base_response.status_code == 200:
-            break
-        warnings.warn(f"Attempt {i + 1} to connect to textbook site failed, trying again")
-    if base_response.status_code != 200:  # Request failed too many times
-        raise ConnectionError(f"Failed to connect to textbook site after {MAX_REQUEST_ATTEMPTS} attempts")
+    base_response: HTMLResponse = _get_session().get(BASE_URL)
+    if base_response.status_code != 200:
+        raise ConnectionError(f"Failed to connect to textbook site (status {base_response.status_code})")
 
     elements = base_response.html.find("meta")
     assert isinstance(elements, list)
@@ -92,20 +103,27 @@ def _update_subject_map() -> None:
     if not request_headers:
         _update_headers()
 
-    for i in range(MAX_REQUEST_ATTEMPTS):
-        subject_response = sess.get(SUBJECTS_URL.format(term_id=CURRENT_TERM_ID), headers=request_headers)
-        if subject_response.status_code == 200:
-            break
-        warnings.warn(f"Attempt {i + 1} to retrieve list of subjects failed, trying again")
-        _update_headers()  # Try again with new CSRF token
-    if subject_response.status_code != 200:  # Request failed too many times
-        raise ConnectionError(f"Failed to retrieve list of subjects after {MAX_REQUEST_ATTEMPTS} attempts")
+    subject_response = _get_with_csrf_token(SUBJECTS_URL.format(term_id=CURRENT_TERM_ID), "list of subjects")
 
     subject_json: list[dict[str, str]] = subject_response.json()
     global subject_map
     subject_map = {entry["name"]: entry["id"] for entry in subject_json}
 
 
+def _get_with_csrf_token(url: str, description: str) -> HTMLResponse:
+    """GETs a URL of the textbook site's API. The transport already retries requests that fail for a while, so the only
+    retry here is with a new CSRF token, in case the old one expired."""
+    response: HTMLResponse = _get_session().get(url, headers=request_headers)
+    if response.status_code != 200:
+        warnings.warn(f"Failed to retrieve {description} (status {response.status_code}), trying again with a new token")
+        _update_headers()
+        response = _get_session().get(url, headers=request_headers)
+    if response.status_code != 200:
+        raise ConnectionError(f"Failed to retrieve {description} from textbook site (status {response.status_code})")
+    return response
+
+
+@observe.parser("textbook.courses")
 def _find_section_from_json(sections: list[dict[str, str]], instructor: str | None, section_num: str | None) -> str:
     if section_num:
         for section in sections:
@@ -137,15 +155,18 @@ def _get_textbooks_for_ids(ids: list[str]) -> list[Textbook]:
     if not request_headers:
         _update_headers()
 
-    responses = grequests.imap(grequests.get(BOOKS_URL.format(section_id=id), headers=request_headers) for id in ids)
+    def get_books(section_id: str) -> HTMLResponse:
+        return _get_session().get(BOOKS_URL.format(section_id=section_id), headers=request_headers)
+
     books = []
-    for response in responses:
-        for book_json in response.json():
-            book = Textbook.from_json(book_json)
-            if book:
-                books.append(book)
-            else:
-                warnings.warn(f"No textbook info found for {response}")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="pittapi-textbook") as executor:
+        for response in executor.map(get_books, ids):
+            for book_json in response.json():
+                book = Textbook.from_json(book_json)
+                if book:
+                    books.append(book)
+                else:
+                    warnings.warn(f"No textbook info found for {response}")
     return [book for book in books if book]  # Drop all None values
 
 
@@ -166,16 +187,9 @@ def get_textbooks_for_course(course: CourseInfo) -> list[Textbook]:
         _update_subject_map()
         assert subject_map
 
-    for i in range(MAX_REQUEST_ATTEMPTS):
-        course_response = sess.get(
-            COURSES_URL.format(dept_id=subject_map[course.subject], term_id=CURRENT_TERM_ID), headers=request_headers
-        )
-        if course_response.status_code == 200:
-            break
-        warnings.warn(f"Attempt {i} to retrieve list of {course.subject} courses failed, trying again")
-        _update_headers()  # Try again with new CSRF token
-    if course_response.status_code != 200:  # Request failed too many times
-        raise ConnectionError(f"Failed to retrieve list of {course.subject} courses from textbook site")
+    course_response = _get_with_csrf_token(
+        COURSES_URL.format(dept_id=subject_map[course.subject], term_id=CURRENT_TERM_ID), f"list of {course.subject} courses"
+    )
 
     return _get_textbooks_from_json(
         course_json=course_response.json(),
@@ -197,17 +211,9 @@ def get_textbooks_for_courses(courses_info: list[CourseInfo]) -> list[Textbook]:
     subjects = {course_info.subject for course_info in courses_info}
     courses_for_subjects: dict[str, list[dict[str, Any]]] = {}
     for subject in subjects:
-        for i in range(MAX_REQUEST_ATTEMPTS):
-            course_response = sess.get(
-                COURSES_URL.format(dept_id=subject_map[subject], term_id=CURRENT_TERM_ID), headers=request_headers
-            )
-            if course_response.status_code == 200:
-                break
-            warnings.warn(f"Attempt {i} to retrieve list {subject} courses failed, trying again")
-            _update_headers()  # Try again with new CSRF token
-        if course_response.status_code != 200:  # Request failed too many times
-            raise ConnectionError(f"Failed to retrieve list of {subject} courses from textbook site")
-
+        course_response = _get_with_csrf_token(
+            COURSES_URL.format(dept_id=subject_map[subject], term_id=CURRENT_TERM_ID), f"list of {subject} courses"
+        )
         courses_for_subjects[subject] = course_response.json()
 
     textbooks = []
@@ -0,0 +1,571 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from pittapi import observe, ratelimit, resilience
+
+if TYPE_CHECKING:
+    import httpx
+
+SessionT = TypeVar("SessionT", bound=requests.Session)
+
+# Number of URLs whose validators and parsed responses are remembered for conditional requests
+MAX_VALIDATORS = 512
+
+# Connections kept alive per host, unless a host is given its own size
+DEFAULT_POOL_SIZE = 10
+# (connect, read) timeouts in seconds for requests that don't set their own
+DEFAULT_TIMEOUT = (10.0, 60.0)
+# Retry requests that failed to connect or that the server was too busy for, up to 3 attempts in all
+DEFAULT_RETRIES = resilience.RetryPolicy()
+# Connections per event loop for the async transport, which is meant to have many more requests in flight at once
+DEFAULT_ASYNC_POOL_SIZE = 100
+
+
+class ConditionalResponse(NamedTuple):
+    status_code: int
+    data: Any
+    not_modified: bool = False
+
+
+class ConditionalStats(NamedTuple):
+    requests: int
+    not_modified: int
+    bytes_saved: int
+    parses_saved: int
+
+
+def _sockets_patched() -> bool:
+    monkey = sys.modules.get("gevent.monkey")
+    return monkey is not None and bool(monkey.is_module_patched("socket"))
+
+
+class _TransportAdapter(HTTPAdapter):
+    """Applies the transport's rate limits, default timeout, retries and circuit breakers to every request sent through
+    it."""
+
+    def __init__(self, transport: Transport, pool_size: int):
+        self.transport = transport
+        # Retries are sent by send, with jittered backoff and the transport's retry budget, rather than by urllib3
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+
+    def send(self, request: requests.PreparedRequest, *args: Any, **kwargs: Any) -> requests.Response:
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.transport.timeout
+        if not observe.is_observed():
+            response, _, _, error = self._send_with_retries(request, *args, **kwargs)
+        else:
+            url = request.url or ""
+            started_at = time.time()
+            start = time.perf_counter()
+            response, retries, waited, error = self._send_with_retries(request, *args, **kwargs)
+            size = 0
+            if response is not None:
+                size = int(response.headers.get("Content-Length", 0)) if kwargs.get("stream") else len(response.content)
+            observe.report_fetch(
+                observe.FetchEvent(
+                    *observe.match_endpoint(url),
+                    url=url,
+                    method=request.method or "",
+                    status=None if response is None else response.status_code,
+                    bytes=size,
+                    started_at=started_at,
+                    network_time=time.perf_counter() - start - waited,
+                    retries=retries,
+                    error=error,
+                    rate_limit_wait=waited,
+                )
+            )
+        if error is not None:
+            raise error
+        assert response is not None
+        return response
+
+    def _send_with_retries(
+        self, request: requests.PreparedRequest, *args: Any, **kwargs: Any
+    ) -> tuple[requests.Response | None, int, float, Exception | None]:
+        """Sends the request until it succeeds or mustn't be retried, and returns the last response or error along with
+        how many times the request was resent and how many seconds it waited for the rate limiter."""
+        transport = self.transport
+        url = request.url or ""
+        retries = 0
+        waited = 0.0
+        while True:
+            try:
+                transport.circuit_breaker.check(url)
+                waited += transport.rate_limiter.wait(url)
+            except resilience.CircuitOpenError as e:
+                return None, retries, waited, e
+            except ratelimit.RateLimitExceeded as e:
+                transport.circuit_breaker.release(url)
+                return None, retries, waited, e
+
+            response: requests.Response | None = None
+            error: Exception | None = None
+            try:
+                response = super().send(request, *args, **kwargs)
+                if not kwargs.get("stream"):
+                    # Read the body now, as the session would right after, so that a dropped connection can be retried
+                    response.content
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            except Exception as e:
+                transport.circuit_breaker.release(url)
+                return None, retries, waited, e
+
+            status = None if response is None else response.status_code
+            failed = response is None or status in transport.circuit_breaker.failure_statuses
+            transport.circuit_breaker.record(url, failed)
+            transport.retry_budget.record(url, failed)
+
+            retryable = response is not None or isinstance(error, requests.ConnectionError)
+            delay = None
+            if retryable:
+                delay = resilience.get_retry_delay(
+                    transport.retries,
+                    transport.retry_budget,
+                    url,
+                    request.method or "",
+                    retries,
+                    status,
+                    None if response is None else response.headers.get("Retry-After"),
+                )
+            if delay is None or transport.circuit_breaker.is_open(url):
+                return response, retries, waited, error
+
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+            retries += 1
+
+
+class Transport:
+    """HTTP connection pools, timeouts, retries, circuit breakers and rate limits shared by every module.
+
+    Sessions keep connections alive between requests, with up to `pool_size` connections per host, or
+    `host_pool_sizes[host]` for hosts that need more. While gevent's monkey-patching is active (see
+    pittapi.enable_gevent), each thread gets its own sessions, since patched sockets can't be shared between threads;
+    otherwise every thread shares the same sessions and pools. Requests go over HTTP/1.1, which is all requests supports.
+
+    Failed requests are retried according to `retries`, a RetryPolicy or the number of retries with the default policy,
+    within the per-host retry_budget. circuit_breaker makes requests to a host that keeps failing raise
+    resilience.CircuitOpenError right away instead of waiting for it.
+
+    Requests to each host are kept within rate_limiter.rate_limits, see ratelimit.HostRateLimiter. Transports created
+    without a `rate_limiter` share ratelimit.default_rate_limiter, and so their limits; pass one to limit a transport
+    separately.
+
+    Install a configured transport for the whole package with set_transport."""
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        host_pool_sizes: dict[str, int] | None = None,
+        timeout: float | tuple[float, float] | None = DEFAULT_TIMEOUT,
+        retries: resilience.RetryPolicy | int = DEFAULT_RETRIES,
+        keep_alive: bool = True,
+        headers: dict[str, str] | None = None,
+        share_sessions: bool | None = None,
+        rate_limiter: ratelimit.HostRateLimiter | None = None,
+    ):
+        self.pool_size = pool_size
+        self.host_pool_sizes = dict(host_pool_sizes or {})
+        self.timeout = timeout
+        self.retries = _get_retry_policy(retries)
+        self.keep_alive = keep_alive
+        self.headers = dict(headers or {})
+        self.share_sessions = not _sockets_patched() if share_sessions is None else share_sessions
+        self.rate_limiter = ratelimit.default_rate_limiter if rate_limiter is None else rate_limiter
+        self.circuit_breaker = resilience.HostCircuitBreaker()
+        self.retry_budget = resilience.HostRetryBudget()
+        self._local = threading.local()
+        self._shared_sessions: dict[type[requests.Session], requests.Session] = {}
+        self._all_sessions: list[requests.Session] = []
+        self._lock = threading.Lock()
+
+    def get_session(self, session_class: type[SessionT] = requests.Session) -> SessionT:  # type: ignore[assignment]
+        """Returns a session configured with this transport's pools. Pass a requests.Session subclass, like
+        requests_html.HTMLSession, to get one of that class instead."""
+        if self.share_sessions:
+            sessions = self._shared_sessions
+        else:
+            sessions = getattr(self._local, "sessions", None)
+            if sessions is None:
+                sessions = self._local.sessions = {}
+        session = sessions.get(session_class)
+        if session is None:
+            with self._lock:
+                session = sessions.get(session_class)
+                if session is None:
+                    session = sessions[session_class] = self._create_session(session_class)
+                    self._all_sessions.append(session)
+        return session  # type: ignore[return-value]
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.get_session().get(url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.get_session().post(url, **kwargs)
+
+    def close(self) -> None:
+        """Closes every session this transport created, in every thread."""
+        with self._lock:
+            sessions, self._all_sessions = self._all_sessions, []
+            self._shared_sessions.clear()
+        self._local = threading.local()
+        for session in sessions:
+            session.close()
+
+    def _create_session(self, session_class: type[requests.Session]) -> requests.Session:
+        session = session_class()
+        default_adapter = _TransportAdapter(self, self.pool_size)
+        session.mount("https://", default_adapter)
+        session.mount("http://", default_adapter)
+        for host, pool_size in self.host_pool_sizes.items():
+            host_adapter = _TransportAdapter(self, pool_size)
+            session.mount(f"https://{host}/", host_adapter)
+            session.mount(f"http://{host}/", host_adapter)
+        session.headers.update(self.headers)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+
+def _get_retry_policy(retries: resilience.RetryPolicy | int) -> resilience.RetryPolicy:
+    if isinstance(retries, resilience.RetryPolicy):
+        return retries
+    return DEFAULT_RETRIES._replace(attempts=retries + 1)
+
+
+_transport = Transport()
+
+
+def get_transport() -> Transport:
+    return _transport
+
+
+def set_transport(transport: Transport) -> Transport:
+    """Makes every module send its requests through `transport`. Returns the transport it replaces, which is left
+    open so that requests already in flight can finish."""
+    global _transport
+    previous, _transport = _transport, transport
+    return previous
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    return _transport.get(url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    return _transport.post(url, **kwargs)
+
+
+class AsyncTransport:
+    """The asyncio counterpart of Transport, built on httpx, which is an optional dependency that's only imported once
+    the first request is sent (pip install pittapi[async]).
+
+    httpx clients can't be shared between event loops, so each running loop gets its own client, with up to `pool_size`
+    connections shared by every host. HTTP/2 is used for hosts that support it when `http2` is True, which requires the
+    h2 package. Retries, retry budgets, circuit breakers and rate limits work the same as in Transport.
+
+    Install a configured transport for the whole package with set_async_transport."""
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_ASYNC_POOL_SIZE,
+        timeout: float | tuple[float, float] | None = DEFAULT_TIMEOUT,
+        retries: resilience.RetryPolicy | int = DEFAULT_RETRIES,
+        keep_alive: bool = True,
+        headers: dict[str, str] | None = None,
+        http2: bool = False,
+        rate_limiter: ratelimit.HostRateLimiter | None = None,
+    ):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = _get_retry_policy(retries)
+        self.keep_alive = keep_alive
+        self.headers = dict(headers or {})
+        self.http2 = http2
+        self.rate_limiter = ratelimit.default_rate_limiter if rate_limiter is None else rate_limiter
+        self.circuit_breaker = resilience.HostCircuitBreaker()
+        self.retry_budget = resilience.HostRetryBudget()
+        # event loop -> verify -> client; requests' per-request verify=False becomes a separate client in httpx
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[bool, httpx.AsyncClient]] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def get_client(self, verify: bool = True) -> httpx.AsyncClient:
+        """Returns the running event loop's client, creating it on first use."""
+        clients = self._clients.setdefault(asyncio.get_running_loop(), {})
+        client = clients.get(verify)
+        if client is None:
+            client = clients[verify] = self._create_client(verify)
+        return client
+
+    async def request(self, method: str, url: str, verify: bool = True, **kwargs: Any) -> httpx.Response:
+        if not observe.is_observed():
+            response, _, _, error = await self._request_with_retries(method, url, verify, **kwargs)
+        else:
+            started_at = time.time()
+            start = time.perf_counter()
+            response, retries, waited, error = await self._request_with_retries(method, url, verify, **kwargs)
+            observe.report_fetch(
+                observe.FetchEvent(
+                    *observe.match_endpoint(url),
+                    url=url if response is None else str(response.request.url),
+                    method=method,
+                    status=None if response is None else response.status_code,
+                    bytes=0 if response is None else len(response.content),
+                    started_at=started_at,
+                    network_time=time.perf_counter() - start - waited,
+                    retries=retries,
+                    error=error,
+                    rate_limit_wait=waited,
+                )
+            )
+        if error is not None:
+            raise error
+        assert response is not None
+        return response
+
+    async def _request_with_retries(
+        self, method: str, url: str, verify: bool, **kwargs: Any
+    ) -> tuple[httpx.Response | None, int, float, Exception | None]:
+        """The async version of _TransportAdapter._send_with_retries."""
+        httpx = _import_httpx()
+        retries = 0
+        waited = 0.0
+        while True:
+            try:
+                self.circuit_breaker.check(url)
+                waited += await self.rate_limiter.wait_async(url)
+            except resilience.CircuitOpenError as e:
+                return None, retries, waited, e
+            except ratelimit.RateLimitExceeded as e:
+                self.circuit_breaker.release(url)
+                return None, retries, waited, e
+
+            response: httpx.Response | None = None
+            error: Exception | None = None
+            try:
+                response = await self.get_client(verify).request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                error = e
+            except Exception as e:
+                self.circuit_breaker.release(url)
+                return None, retries, waited, e
+
+            status = None if response is None else response.status_code
+            failed = response is None or status in self.circuit_breaker.failure_statuses
+            self.circuit_breaker.record(url, failed)
+            self.retry_budget.record(url, failed)
+
+            retryable = response is not None or isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+            delay = None
+            if retryable:
+                delay = resilience.get_retry_delay(
+                    self.retries,
+                    self.retry_budget,
+                    url,
+                    method,
+                    retries,
+                    status,
+                    None if response is None else response.headers.get("Retry-After"),
+                )
+            if delay is None or self.circuit_breaker.is_open(url):
+                return response, retries, waited, error
+
+            await asyncio.sleep(delay)
+            retries += 1
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        """Closes the running event loop's clients."""
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
+
+    def _create_client(self, verify: bool) -> httpx.AsyncClient:
+        httpx = _import_httpx()
+        if isinstance(self.timeout, tuple):
+            connect_timeout, read_timeout = self.timeout
+            timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        else:
+            timeout = httpx.Timeout(self.timeout)
+        limits = httpx.Limits(
+            max_connections=self.pool_size, max_keepalive_connections=self.pool_size if self.keep_alive else 0
+        )
+        return httpx.AsyncClient(
+            headers=self.headers,
+            timeout=timeout,
+            follow_redirects=True,
+            transport=httpx.AsyncHTTPTransport(verify=verify, http2=self.http2, limits=limits),
+        )
+
+
+_async_transport = AsyncTransport()
+
+
+def get_async_transport() -> AsyncTransport:
+    return _async_transport
+
+
+def set_async_transport(transport: AsyncTransport) -> AsyncTransport:
+    """Makes every async function send its requests through `transport`. Returns the transport it replaces."""
+    global _async_transport
+    previous, _async_transport = _async_transport, transport
+    return previous
+
+
+async def get_async(url: str, **kwargs: Any) -> httpx.Response:
+    return await _async_transport.get(url, **kwargs)
+
+
+async def post_async(url: str, **kwargs: Any) -> httpx.Response:
+    return await _async_transport.post(url, **kwargs)
+
+
+def _import_httpx() -> Any:
+    try:
+        import httpx
+    except ImportError as e:
+        raise ImportError("pittapi's async functions require httpx, install it with: pip install pittapi[async]") from e
+    return httpx
+
+
+class _Validators(NamedTuple):
+    etag: str | None
+    last_modified: str | None
+    data: Any
+    size: int
+
+
+_validators: OrderedDict[str, _Validators] = OrderedDict()
+_validators_lock = threading.Lock()
+_requests = 0
+_not_modified = 0
+_bytes_saved = 0
+
+
+def conditional_get(
+    url: str, headers: dict[str, str] | None = None, session: requests.Session | None = None, **kwargs: Any
+) -> ConditionalResponse:
+    """GETs a JSON URL, sending the ETag and Last-Modified validators of the last response for the same URL.
+
+    When the server answers 304 Not Modified, the object parsed from the earlier response is returned as a 200 instead
+    of downloading and parsing the body again. The returned data may be shared between callers and must not be
+    modified. Error responses raise the session's HTTP error instead of being returned."""
+    validators, request_headers = _get_conditional_headers(url, headers)
+    response = (session or _transport.get_session()).get(url, headers=request_headers, **kwargs)
+    return _read_conditional_response(url, validators, response)
+
+
+def get_json(url: str, headers: dict[str, str] | None = None, session: requests.Session | None = None, **kwargs: Any) -> Any:
+    """Returns the parsed JSON body of a URL, using a conditional request if the URL was fetched before."""
+    return conditional_get(url, headers=headers, session=session, **kwargs).data
+
+
+async def conditional_get_async(url: str, headers: dict[str, str] | None = None, **kwargs: Any) -> ConditionalResponse:
+    """The async version of conditional_get, sent through the async transport. Validators and stored responses are
+    shared with conditional_get."""
+    validators, request_headers = _get_conditional_headers(url, headers)
+    response = await _async_transport.get(url, headers=request_headers, **kwargs)
+    return _read_conditional_response(url, validators, response)
+
+
+async def get_json_async(url: str, headers: dict[str, str] | None = None, **kwargs: Any) -> Any:
+    return (await conditional_get_async(url, headers=headers, **kwargs)).data
+
+
+def _get_conditional_headers(url: str, headers: dict[str, str] | None) -> tuple[_Validators | None, dict[str, str]]:
+    global _requests
+    with _validators_lock:
+        _requests += 1
+        validators = _validators.get(url)
+        if validators is not None:
+            _validators.move_to_end(url)
+
+    request_headers = dict(headers or {})
+    if validators is not None:
+        if validators.etag is not None:
+            request_headers["If-None-Match"] = validators.etag
+        if validators.last_modified is not None:
+            request_headers["If-Modified-Since"] = validators.last_modified
+    return validators, request_headers
+
+
+def _read_conditional_response(url: str, validators: _Validators | None, response: Any) -> ConditionalResponse:
+    """Turns a requests or httpx response to a conditional request into a ConditionalResponse, storing its validators."""
+    global _not_modified, _bytes_saved
+    if response.status_code == 304 and validators is not None:
+        with _validators_lock:
+            _not_modified += 1
+            _bytes_saved += validators.size
+        return ConditionalResponse(status_code=200, data=validators.data, not_modified=True)
+
+    # Raised rather than returned, so that callers caching the result never cache an error
+    if response.status_code >= 400:
+        response.raise_for_status()
+
+    if observe.is_observed():
+        data = observe.run_parser(observe.match_endpoint(url)[0], "json", response.json)
+    else:
+        data = response.json()
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if response.status_code == 200 and (etag or last_modified):
+        with _validators_lock:
+            _validators[url] = _Validators(etag=etag, last_modified=last_modified, data=data, size=len(response.content))
+            _validators.move_to_end(url)
+            while len(_validators) > MAX_VALIDATORS:
+                _validators.popitem(last=False)
+    return ConditionalResponse(status_code=response.status_code, data=data)
+
+
+def get_conditional_stats() -> ConditionalStats:
+    """Returns how many requests were sent, how many were answered with 304 Not Modified, and the response bytes and
+    JSON parses those 304s saved."""
+    with _validators_lock:
+        return ConditionalStats(
+            requests=_requests, not_modified=_not_modified, bytes_saved=_bytes_saved, parses_saved=_not_modified
+        )
+
+
+def clear_validators() -> None:
+    """Forgets every stored validator and response, so the next request for each URL is unconditional."""
+    with _validators_lock:
+        _validators.clear()
@@ -67,7 +67,6 @@ setup(
         "BeautifulSoup4",
         "Requests",
         "requests_html",
-        "grequests",
         "lxml",
         "parse",
     ],
@@ -77,6 +76,10 @@ setup(
     # $ pip install -e .[dev,test]
     extras_require={
         "test": ["timeout-decorator", "nose", "nose-cov", "nose-timer"],
+        "async": ["httpx"],
+        "gevent": ["gevent"],
+        "prometheus": ["prometheus-client"],
+        "otel": ["opentelemetry-sdk"],
     },
     # If there are data files included in your packages that need to be
     # installed, specify them here.  If using Python 2.6 or less, then these
@@ -0,0 +1,80 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from pittapi import bench
+
+
+class BenchTest(unittest.TestCase):
+    def test_run_benchmarks(self):
+        benchmarks = [benchmark for benchmark in bench.BENCHMARKS if benchmark.name.startswith("status.")]
+        (result,) = bench.run_benchmarks(benchmarks, min_time=0.001)
+
+        self.assertEqual(result.name, "status.parse_status")
+        self.assertGreater(result.ops_per_sec, 0)
+        self.assertGreater(result.relative_time, 0)
+        self.assertGreater(result.allocations, 0)
+        self.assertGreater(result.peak_memory, 0)
+
+    def test_every_benchmark_has_a_baseline(self):
+        baseline = bench.load_baseline(bench.DEFAULT_BASELINE_PATH)
+        self.assertEqual(set(baseline), {benchmark.name for benchmark in bench.BENCHMARKS})
+
+    def test_benchmarks_only_read_samples(self):
+        # The tests package isn't installed, so the benchmarks can't use its mocks
+        code = (
+            "import sys\n"
+            "from pittapi import bench\n"
+            "for benchmark in bench.BENCHMARKS:\n"
+            "    benchmark.setup(bench.DEFAULT_SAMPLES_PATH)\n"
+            "print(sorted(name for name in sys.modules if name.partition('.')[0] == 'tests'))"
+        )
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "[]")
+
+    def test_compare(self):
+        baseline = {"parse": {"relative_time": 1.0, "allocations": 1000, "peak_memory": 100_000}}
+        result = bench.BenchResult("parse", ops_per_sec=1000, relative_time=1.5, allocations=1100, peak_memory=110_000)
+        self.assertEqual(bench.compare([result], baseline), [])
+
+        result = bench.BenchResult("parse", ops_per_sec=100, relative_time=2.5, allocations=2000, peak_memory=110_000)
+        self.assertEqual(
+            bench.compare([result], baseline),
+            [bench.Regression("parse", "relative_time", 1.0, 2.5), bench.Regression("parse", "allocations", 1000, 2000)],
+        )
+        self.assertEqual(bench.compare([result._replace(name="new")], baseline), [])
+
+    def test_main(self):
+        result = bench.BenchResult("status.parse_status", 1000, relative_time=0.001, allocations=1, peak_memory=1)
+        with tempfile.TemporaryDirectory() as directory:
+            baseline_path = Path(directory) / "baseline.json"
+            bench.save_baseline([result], baseline_path)
+            with baseline_path.open() as f:
+                self.assertIn("status.parse_status", json.load(f)["benchmarks"])
+
+            args = ["-k", "status", "--min-time", "0.001", "--baseline", str(baseline_path)]
+            self.assertEqual(bench.main(args), 1)
+            self.assertEqual(bench.main(args + ["--update-baseline"]), 0)
+            self.assertEqual(bench.main(args), 0)
@@ -0,0 +1,203 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+import asyncio
+import tempfile
+import threading
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import requests
+import responses
+
+from pittapi import cache, status, transport
+from pittapi.cache import CachePolicy, CacheStats, DiskBackend, MemoryBackend, ResponseCache
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResponseCache(policies={"test": CachePolicy(ttl=60, stale_ttl=600)})
+        self.now = 1_000_000.0
+        patcher = patch.object(cache.time, "time", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fresh_and_expired(self):
+        fetch = MagicMock(side_effect=[1, 2])
+
+        self.assertEqual(self.cache.get("test", "key", fetch), 1)
+        self.now += 30
+        self.assertEqual(self.cache.get("test", "key", fetch), 1)
+        self.now += 1000
+        self.assertEqual(self.cache.get("test", "key", fetch), 2)
+
+        self.assertEqual(fetch.call_count, 2)
+        self.assertEqual(self.cache.get_stats("test"), CacheStats(hits=1, misses=2))
+
+    def test_stale_while_revalidate(self):
+        refreshed = threading.Event()
+        release = threading.Event()
+        values = iter(["old", "new"])
+
+        def fetch():
+            value = next(values)
+            if value == "new":
+                release.wait(5)
+                refreshed.set()
+            return value
+
+        self.cache.get("test", "key", fetch)
+        self.now += 120
+
+        # The stale response is served without waiting for the refresh, which only runs once
+        self.assertEqual(self.cache.get("test", "key", fetch), "old")
+        self.assertEqual(self.cache.get("test", "key", fetch), "old")
+        release.set()
+        self.assertTrue(refreshed.wait(5))
+        for thread in threading.enumerate():
+            if thread.name == "pittapi-cache-test":
+                thread.join()
+
+        self.assertEqual(self.cache.get("test", "key", fetch), "new")
+        self.assertEqual(self.cache.get_stats(), CacheStats(hits=1, stale_hits=2, misses=1, refreshes=1))
+
+    def test_errors_not_cached(self):
+        fetch = MagicMock(side_effect=[ValueError("Invalid Date"), 1])
+
+        self.assertRaises(ValueError, self.cache.get, "test", "key", fetch)
+        self.assertEqual(self.cache.get("test", "key", fetch), 1)
+
+    def test_uncached_endpoints(self):
+        fetch = MagicMock(return_value=1)
+        self.cache.set_policy("disabled", ttl=0)
+
+        self.cache.get("disabled", "key", fetch)
+        self.cache.get("disabled", "key", fetch)
+        self.cache.get("unknown", "key", fetch)
+
+        self.assertEqual(fetch.call_count, 3)
+
+    def test_memory_backend_lru(self):
+        self.cache.backend = MemoryBackend(max_entries=2)
+        for key in ["a", "b", "a", "c"]:
+            self.cache.get("test", key, lambda: key)
+
+        self.assertEqual(self.cache.get_stats("test").evictions, 1)
+        self.assertIsNotNone(self.cache.backend.get("test:a"))
+        self.assertIsNone(self.cache.backend.get("test:b"))
+
+    def test_disk_backend(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.cache.backend = DiskBackend(directory, max_entries=2)
+            self.cache.get("test", "a", lambda: {"value": [1, 2]})
+
+            # Another process pointing at the same directory sees the same entries
+            other = ResponseCache(DiskBackend(directory), policies=self.cache.policies)
+            self.assertEqual(other.get("test", "a", MagicMock()), {"value": [1, 2]})
+
+            self.cache.get("test", "b", lambda: 2)
+            self.cache.get("test", "c", lambda: 3)
+            self.assertEqual(len(self.cache.backend), 2)
+
+            self.cache.clear()
+            self.assertEqual(len(self.cache.backend), 0)
+
+
+class CachedDecoratorTest(unittest.TestCase):
+    @responses.activate
+    def test_fetch_helper_cached(self):
+        responses.add(responses.GET, "https://status.pitt.edu/index.json", json={"components": [], "incidents": []})
+
+        status.get_status()
+        status.get_status()
+
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(cache.response_cache.get_stats("status.status"), CacheStats(hits=1, misses=1))
+
+    @responses.activate
+    def test_server_error_not_cached(self):
+        data = {"components": [], "incidents": []}
+        responses.add(responses.GET, "https://status.pitt.edu/index.json", status=500, body="Internal Server Error")
+
+        with self.assertRaises(requests.HTTPError):
+            status.get_status()
+        responses.replace(responses.GET, "https://status.pitt.edu/index.json", json=data)
+
+        self.assertEqual(status.get_status(), data)
+        self.assertEqual(len(responses.calls), 2)
+
+    def test_keyed_by_arguments(self):
+        fetch = MagicMock(side_effect=lambda subject: subject.lower())
+        cached_fetch = cache.cached("course.subject_courses")(fetch)
+
+        self.assertEqual(cached_fetch("CS"), "cs")
+        self.assertEqual(cached_fetch("MATH"), "math")
+        self.assertEqual(cached_fetch("CS"), "cs")
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_refresh(self):
+        fetch = MagicMock(side_effect=["old", "new"])
+        cached_fetch = cache.cached("course.subject_courses")(fetch)
+
+        self.assertEqual(cached_fetch("CS"), "old")
+        self.assertEqual(cached_fetch.refresh("CS"), "new")
+        self.assertEqual(cached_fetch("CS"), "new")
+        self.assertEqual(fetch.call_count, 2)
+        self.assertEqual(cache.response_cache.get_stats("course.subject_courses").refreshes, 1)
+
+
+class AsyncResponseCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.cache = ResponseCache(policies={"test": CachePolicy(ttl=60, stale_ttl=600)})
+        self.now = 1_000_000.0
+        patcher = patch.object(cache.time, "time", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_stale_while_revalidate(self):
+        release = asyncio.Event()
+        values = iter(["old", "new"])
+
+        async def fetch():
+            value = next(values)
+            if value == "new":
+                await release.wait()
+            return value
+
+        await self.cache.get_async("test", "key", fetch)
+        self.now += 120
+
+        self.assertEqual(await self.cache.get_async("test", "key", fetch), "old")
+        self.assertEqual(await self.cache.get_async("test", "key", fetch), "old")
+        release.set()
+        await asyncio.gather(*self.cache._refresh_tasks)
+
+        self.assertEqual(await self.cache.get_async("test", "key", fetch), "new")
+        self.assertEqual(self.cache.get_stats(), CacheStats(hits=1, stale_hits=2, misses=1, refreshes=1))
+
+    async def test_shared_with_sync_helper(self):
+        data = {"components": [], "incidents": []}
+        with patch.object(transport, "get_json_async", AsyncMock(return_value=data)) as get_json_async:
+            self.assertEqual(await status.get_status_async(), data)
+            self.assertEqual(await status.get_status_async(), data)
+            # Any request would fail, since none are registered
+            with responses.RequestsMock():
+                self.assertEqual(status.get_status(), data)
+
+        get_json_async.assert_awaited_once_with(status.STATUS_URL)
@@ -0,0 +1,41 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+import pytest
+
+from pittapi import transport
+from pittapi.cache import response_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Every test starts with an empty response cache, no stored validators, closed circuit breakers and full rate limit
+    buckets, so mocked responses and requests from other tests never affect it."""
+    _reset()
+    yield
+    _reset()
+
+
+def _reset():
+    response_cache.clear()
+    transport.clear_validators()
+    for pool in (transport.get_transport(), transport.get_async_transport()):
+        pool.circuit_breaker.reset()
+        pool.retry_budget.reset()
+        pool.rate_limiter.reset()
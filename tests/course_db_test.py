@@ -0,0 +1,134 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from pittapi import course, course_db
+from pittapi.course import Course, Instructor, Meeting, Section, Subject
+
+from tests.mocks.course_mocks import mocked_course_info_data, mocked_course_sections_data
+
+
+def make_course_details(course_number="0007", class_number="27815", days="Fr", start="10.00.00.000000-05:00"):
+    course_details = course._parse_course_details(
+        "2231",
+        "CS",
+        "0007",
+        "105611",
+        mocked_course_info_data["course_details"],
+        mocked_course_sections_data,
+    )
+    section = course_details.sections[0]
+    meeting = section.meetings[0]._replace(days=days, start_time=start)
+    section = section._replace(class_number=class_number, meetings=[meeting])
+    return course_details._replace(
+        course=course_details.course._replace(course_number=course_number),
+        sections=[section],
+    )
+
+
+class CourseDatabaseTest(unittest.TestCase):
+    def setUp(self):
+        self.db = course_db.CourseDatabase()
+        self.addCleanup(self.db.close)
+
+    def test_store_and_get_course_details(self):
+        course_details = make_course_details()
+        self.db.store_course_details("2231", course_details)
+
+        self.assertEqual(self.db.get_course_details("2231", "CS", "0007"), course_details)
+        self.assertIsNone(self.db.get_course_details("2234", "CS", "0007"))
+
+        # Storing a course again replaces it instead of duplicating its sections
+        self.db.store_course_details("2231", course_details)
+        self.assertEqual(len(self.db.find_sections("2231", subject="CS")), 1)
+
+    def test_store_subject(self):
+        subject = Subject(
+            subject_code="CS",
+            courses={"0007": Course(subject_code="CS", course_number="0007", course_id="105611", course_title="INTRO")},
+        )
+        self.db.store_subject(subject)
+
+        self.assertEqual(self.db.get_subject("CS"), subject)
+        self.assertIsNone(self.db.get_subject("MATH"))
+
+    def test_find_sections(self):
+        self.db.store_course_details("2231", make_course_details("0007", "10001", "Fr", "10.00.00.000000-05:00"))
+        self.db.store_course_details("2231", make_course_details("0008", "10002", "MoWe", "9:00AM"))
+        self.db.store_course_details("2231", make_course_details("0009", "10003", "MoWeFr", "1:00PM"))
+
+        def class_numbers(**filters):
+            return [section.class_number for section in self.db.find_sections("2231", **filters)]
+
+        self.assertEqual(class_numbers(), ["10001", "10002", "10003"])
+        self.assertEqual(class_numbers(days="MoWe"), ["10002"])
+        self.assertEqual(class_numbers(days="MoWeFr", after="10:00"), ["10001", "10003"])
+        self.assertEqual(class_numbers(after="12:00PM"), ["10003"])
+        self.assertEqual(class_numbers(before="10:50"), ["10001", "10002", "10003"])
+        self.assertEqual(class_numbers(before="10:49"), [])
+        self.assertEqual(class_numbers(instructor="fishel"), ["10001", "10002", "10003"])
+        self.assertEqual(class_numbers(instructor="nobody"), [])
+        self.assertEqual(class_numbers(attribute="DSGE", attribute_value="ALG"), ["10001", "10002", "10003"])
+        self.assertEqual(class_numbers(attribute="DSGE", attribute_value="nothing"), [])
+        self.assertEqual(class_numbers(subject="CS", course_number="0008"), ["10002"])
+        self.assertEqual(class_numbers(status="Closed"), [])
+        self.assertEqual(self.db.find_sections("2234"), [])
+
+        section = self.db.find_sections("2231", days="MoWe")[0]
+        self.assertIsInstance(section, Section)
+        self.assertEqual(section.instructors, [Instructor(name="Robert Fishel", email="rmf105@pitt.edu")])
+        self.assertIsInstance(section.meetings[0], Meeting)
+        self.assertEqual(section.meetings[0].start_time, "9:00AM")
+
+        self.assertRaises(ValueError, self.db.find_sections, "2231", after="noon")
+
+    def test_find_courses(self):
+        self.db.store_course_details("2231", make_course_details("0007"))
+
+        self.assertEqual([c.course_number for c in self.db.find_courses("2231", subject="CS")], ["0007"])
+        self.assertEqual([c.course_number for c in self.db.find_courses("2231", instructor="Robert")], ["0007"])
+        self.assertEqual(self.db.find_courses("2231", attribute="NOPE"), [])
+
+    def test_refresh_subject(self):
+        subject = Subject(
+            subject_code="CS",
+            courses={"0007": Course(subject_code="CS", course_number="0007", course_id="105611", course_title="INTRO")},
+        )
+        crawl_term = MagicMock(return_value=iter([make_course_details("0007", "10001")]))
+        with (
+            patch.object(course, "get_subject_courses", MagicMock(return_value=subject)),
+            patch.object(course, "crawl_term", crawl_term),
+        ):
+            self.db.store_course_details("2231", make_course_details("0008", "10002"))
+            self.assertEqual(self.db.refresh_subject("2231", "CS"), 1)
+
+        crawl_term.assert_called_once_with("2231", subjects=["CS"], concurrency=course.POOL_SIZE // 2)
+        # Rows from before the refresh are replaced by the refreshed subject
+        self.assertEqual([section.class_number for section in self.db.find_sections("2231")], ["10001"])
+        self.assertEqual(self.db.get_subject("CS"), subject)
+        self.assertIsNotNone(self.db.get_refreshed_at("2231", "CS"))
+
+    def test_refresh_term_max_age(self):
+        self.db.refresh_subject = MagicMock(return_value=0)
+        self.db.connection.execute("INSERT INTO subject_refreshes VALUES ('2231', 'CS', strftime('%s', 'now'))")
+
+        self.assertEqual(self.db.refresh_term("2231", ["CS", "MATH"], max_age=3600), ["MATH"])
+        self.db.refresh_subject.assert_called_once_with("2231", "MATH")
@@ -0,0 +1,96 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from pittapi import course_search
+from pittapi.course import Course, CourseDetails, Subject
+
+CS_0007 = Course(subject_code="CS", course_number="0007", course_id="105611", course_title="INTRO TO COMPUTER PROGRAMMING")
+CS_0441 = Course(subject_code="CS", course_number="0441", course_id="105620", course_title="DISCRETE STRUCTURES FOR CS")
+CS_1501 = Course(subject_code="CS", course_number="1501", course_id="105761", course_title="ALGORITHM IMPLEMENTATION")
+MATH_0220 = Course(subject_code="MATH", course_number="0220", course_id="107234", course_title="ANALYTC GEOM AND CALC 1")
+
+
+class CourseSearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = course_search.CourseSearchIndex()
+        self.index.add_subject(Subject(subject_code="CS", courses={"0007": CS_0007, "0441": CS_0441}))
+        self.index.add_course(
+            CourseDetails(
+                course=CS_1501,
+                course_description="The course covers a broad range of the most commonly used algorithms.",
+                requisites="PREQ: (CS 0441 or CS 0406) and (CS 0445 or CS 0455 or COE 0445)",
+            )
+        )
+        self.index.add_course(MATH_0220)
+
+    def search(self, query, **kwargs):
+        return [result.course for result in self.index.search(query, **kwargs)]
+
+    def test_tokenize(self):
+        self.assertEqual(
+            course_search.tokenize("Intro to Computer-Programming, CS 0007!"),
+            ["intro", "computer", "programming", "cs", "0007"],
+        )
+
+    def test_search(self):
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.search("programming"), [CS_0007])
+        self.assertEqual(self.search("calc"), [MATH_0220])
+        self.assertEqual(self.search("nothing matches this"), [])
+        self.assertEqual(self.search(""), [])
+
+    def test_search_ranking(self):
+        # CS 1501 requires CS 0441, but CS 0441 itself should rank first because its code matches
+        self.assertEqual(self.search("0441"), [CS_0441, CS_1501])
+        self.assertEqual(self.search("cs0441"), [CS_0441])
+        self.assertEqual(self.search("math", limit=1), [MATH_0220])
+        scores = [result.score for result in self.index.search("cs")]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_search_prefix(self):
+        self.assertEqual(self.search("algo"), [CS_1501])
+        self.assertEqual(self.search("algo", prefix=False), [])
+        self.assertEqual(self.search("algorithms", prefix=False), [CS_1501])
+
+    def test_update_course(self):
+        renamed = CS_0007._replace(course_title="INTRODUCTION TO PYTHON")
+        self.index.add_course(renamed)
+
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.search("programming"), [])
+        self.assertEqual(self.search("python"), [renamed])
+
+        self.assertTrue(self.index.remove_course("CS", "0007"))
+        self.assertFalse(self.index.remove_course("CS", "0007"))
+        self.assertEqual(self.search("python"), [])
+        self.assertNotIn(("CS", "0007"), self.index)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "index.json"
+            self.index.save(path)
+            loaded = course_search.CourseSearchIndex.load(path)
+
+        self.assertEqual(len(loaded), len(self.index))
+        for query in ["programming", "algo", "0441", "cs"]:
+            self.assertEqual(loaded.search(query), self.index.search(query))
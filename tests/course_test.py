@@ -17,10 +17,16 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 """
 
+import asyncio
+import copy
+import tempfile
+import threading
+import time
 import unittest
-from unittest.mock import MagicMock
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from pittapi import course
+from pittapi import course, ratelimit, transport
 
 from pittapi.course import Attribute, Course, CourseDetails, Instructor, Meeting, Section, SectionDetails, Subject
 
@@ -32,10 +38,19 @@ from tests.mocks.course_mocks import (
     mocked_course_sections_data,
     mocked_section_details_data,
 )
+from tests.mocks.peoplesoft_stub import PeopleSoftStub
+
+# CourseTest swaps these out for mocks, so keep the real ones for tests that talk to the PeopleSoft stub server
+PEOPLESOFT_FETCHERS = {
+    name: getattr(course, name)
+    for name in ["_get_subjects", "_get_subject_courses", "_get_course_info", "_get_course_sections", "_get_course_id"]
+}
 
 
 class CourseTest(unittest.TestCase):
     def setUp(self):
+        course._reset_subject_codes()
+        course._reset_course_id_index()
         course._get_subjects = MagicMock(return_value=mocked_subject_data)
         course._get_section_details = MagicMock(return_value=mocked_section_details_data)
 
@@ -55,6 +70,34 @@ class CourseTest(unittest.TestCase):
 
         self.assertRaises(ValueError, course._validate_subject, "foobar")
 
+    def test_subject_codes_fetched_once(self):
+        for _ in range(5):
+            course._validate_subject("CS")
+
+        course._get_subjects.assert_called_once_with()
+        self.assertEqual(course.get_subject_codes_stats(), course.RegistryStats(hits=4, misses=1, refreshes=1))
+
+    def test_subject_codes_refreshed_in_background(self):
+        course._validate_subject("CS")
+        course._get_subjects.refresh.return_value = {"subjects": [{"subject": "MATH", "descr": "Mathematics"}]}
+
+        original_ttl = course.SUBJECT_CODES_TTL
+        course.SUBJECT_CODES_TTL = 0
+        try:
+            # Stale codes are served while the refresh runs
+            self.assertEqual(course._get_subject_codes(), frozenset({"CS"}))
+            refresh_thread = course._subject_codes_refresh_thread
+            if refresh_thread is not None:
+                refresh_thread.join()
+        finally:
+            course.SUBJECT_CODES_TTL = original_ttl
+
+        self.assertEqual(course._validate_subject("MATH"), "MATH")
+        # The background refresh skips the response cache
+        course._get_subjects.assert_called_once_with()
+        course._get_subjects.refresh.assert_called_once_with()
+        self.assertEqual(course.get_subject_codes_stats().refreshes, 2)
+
     def test_validate_course(self):
         self.assertEqual(course._validate_course(7), "0007")
         self.assertEqual(course._validate_course(449), "0449")
@@ -92,6 +135,39 @@ class CourseTest(unittest.TestCase):
         self.assertRaises(ValueError, course.get_subject_courses, "nonsense")
         course._get_subject_courses.assert_not_called()
 
+    def test_course_id_index_built_once_per_term(self):
+        course._get_subject_courses = MagicMock(return_value=mocked_courses_data)
+
+        for _ in range(3):
+            self.assertEqual(course._get_internal_id_dict("2231", "CS"), {"0007": "105611"})
+        course._get_subject_courses.assert_called_once_with("CS")
+
+        course._get_internal_id_dict("2234", "CS")
+        self.assertEqual(course._get_subject_courses.call_count, 2)
+
+        course._get_subject_courses.refresh.return_value = mocked_courses_data
+        course.invalidate_course_id_index("2231")
+        course._get_internal_id_dict("2231", "CS")
+        course._get_subject_courses.refresh.assert_called_once_with("CS")
+
+        # Only the first rebuild after invalidating skips the response cache
+        course._get_internal_id_dict("2234", "CS")
+        course.invalidate_course_id_index("2234")
+        course._get_internal_id_dict("2234", "CS")
+        self.assertEqual(course._get_subject_courses.refresh.call_count, 2)
+        self.assertEqual(course._get_subject_courses.call_count, 2)
+
+    def test_warm_course_id_index(self):
+        course._get_subject_courses = MagicMock(return_value=mocked_courses_data)
+
+        self.assertEqual(course.warm_course_id_index("2231"), 1)
+        course._get_subject_courses.assert_called_once_with("CS")
+
+        course._get_internal_id_dict("2231", "CS")
+        course._get_subject_courses.assert_called_once_with("CS")
+
+        self.assertRaises(ValueError, course.warm_course_id_index, "2231", ["nonsense"])
+
     def test_get_course_details(self):
         course._get_course_id = MagicMock(return_value="105611")
         course._get_course_info = MagicMock(return_value=mocked_course_info_data)
@@ -142,6 +218,26 @@ class CourseTest(unittest.TestCase):
         self.assertTrue(isinstance(test_instructor, Instructor))
         self.assertEqual(test_instructor.name, "Robert Fishel")
 
+    def test_get_courses_details(self):
+        course._get_course_id = MagicMock(return_value="105611")
+        course._get_course_info = MagicMock(return_value=mocked_course_info_data)
+        course._get_course_sections = MagicMock(return_value=mocked_course_sections_data)
+
+        courses_details = course.get_courses_details([("2231", "CS", "0007"), ("2234", "CS", 7)])
+
+        self.assertEqual(len(courses_details), 2)
+        self.assertEqual([details.sections[0].term for details in courses_details], ["2231", "2234"])
+        self.assertEqual(course._get_course_info.call_count, 2)
+        course._get_course_sections.assert_any_call("105611", "2231")
+        course._get_course_sections.assert_any_call("105611", "2234")
+
+    def test_get_courses_details_invalid(self):
+        course._get_course_id = MagicMock(return_value="105611")
+        course._get_course_info = MagicMock(return_value=mocked_course_info_data)
+        course._get_course_sections = MagicMock(return_value=mocked_course_sections_data)
+
+        self.assertRaises(ValueError, course.get_courses_details, [("2231", "CS", "0007"), ("2231", "nonsense", "0007")])
+
     def test_get_section_details(self):
         course._get_section_details = MagicMock(return_value=mocked_section_details_data)
 
@@ -178,3 +274,346 @@ class CourseTest(unittest.TestCase):
         self.assertEqual(test_details.wait_list_total, "7")
         self.assertEqual(test_details.valid_to_enroll, "T")
         self.assertIsNone(test_details.combined_section_numbers)
+
+    def test_get_sections_details(self):
+        def section_details(term, class_number):
+            if str(class_number) == "99999":
+                raise ValueError("Invalid section ID; section with that ID does not exist")
+            return mocked_section_details_data
+
+        course._get_section_details = MagicMock(side_effect=section_details)
+
+        results = list(course.get_sections_details("2231", ["27815", 99999, 27816], max_workers=2))
+
+        self.assertEqual(sorted(result.class_number for result in results), ["27815", "27816", "99999"])
+        for result in results:
+            self.assertIsInstance(result, course.SectionResult)
+            if result.class_number == "99999":
+                self.assertIsNone(result.section)
+                self.assertIsInstance(result.error, ValueError)
+            else:
+                self.assertIsNone(result.error)
+                self.assertEqual(result.section.class_number, result.class_number)
+                self.assertEqual(result.section.details.enrollment_available, "4")
+
+    def test_get_sections_details_invalid_term(self):
+        self.assertRaises(ValueError, list, course.get_sections_details("1111", ["27815"]))
+
+    def test_section_watcher(self):
+        availability = {"27815": (4, "7"), "27816": (20, "0")}
+
+        def section_details(term, class_number):
+            data = copy.deepcopy(mocked_section_details_data)
+            enrollment_available, wait_list_total = availability[str(class_number)]
+            data["section_info"]["class_availability"]["enrollment_available"] = enrollment_available
+            data["section_info"]["class_availability"]["wait_list_total"] = wait_list_total
+            return data
+
+        course._get_section_details = MagicMock(side_effect=section_details)
+        callback = MagicMock()
+        watcher = course.SectionWatcher("2231", ["27815", 27816], callback=callback, max_workers=1)
+
+        # The first poll only records the initial state of each section
+        self.assertEqual(watcher.poll(now=0), [])
+        self.assertEqual(watcher.states["27815"], course.EnrollmentState("Open", "4", "7"))
+        self.assertEqual(course._get_section_details.call_count, 2)
+
+        # 27815 is nearly full, so it's due again before 27816
+        availability["27815"] = (3, "7")
+        availability["27816"] = (19, "0")
+        self.assertEqual(watcher.next_poll_in(now=0), watcher.fast_interval)
+        changes = watcher.poll(now=watcher.fast_interval)
+        self.assertEqual(course._get_section_details.call_count, 3)
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0].class_number, "27815")
+        self.assertEqual(changes[0].previous, course.EnrollmentState("Open", "4", "7"))
+        self.assertEqual(changes[0].current, course.EnrollmentState("Open", "3", "7"))
+        callback.assert_called_once_with(changes[0])
+
+        # Nothing changes for 27815, but 27816 is now due and has changed
+        changes = watcher.poll(now=watcher.interval)
+        self.assertEqual([change.class_number for change in changes], ["27816"])
+        self.assertEqual(callback.call_count, 2)
+
+    def test_section_watcher_poll_interval(self):
+        course._get_section_details = MagicMock(return_value=mocked_section_details_data)
+        watcher = course.SectionWatcher("2231", [])
+        section = course.get_section_details("2231", "27815")
+
+        self.assertEqual(watcher._get_poll_interval(section), watcher.fast_interval)
+        roomy_section = section._replace(details=section.details._replace(enrollment_available="20"))
+        self.assertEqual(watcher._get_poll_interval(roomy_section), watcher.interval)
+        self.assertEqual(watcher._get_poll_interval(section._replace(status="Closed")), watcher.slow_interval)
+        empty_section = section._replace(details=section.details._replace(enrollment_total="0"))
+        self.assertEqual(watcher._get_poll_interval(empty_section), watcher.slow_interval)
+
+
+class CoalescingTest(unittest.TestCase):
+    def test_identical_requests_coalesced(self):
+        release = threading.Event()
+        session = MagicMock()
+
+        def get(url, **kwargs):
+            release.wait(5)
+            return MagicMock(status_code=200, headers={}, json=MagicMock(return_value=mocked_course_info_data))
+
+        session.get.side_effect = get
+        url = course.COURSE_DETAIL_API.format(id="105611")
+        before = course.get_coalescing_stats()
+        results = []
+        with patch.object(transport.get_transport(), "get_session", return_value=session):
+            threads = [threading.Thread(target=lambda: results.append(course._get_json(url))) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            deadline = time.monotonic() + 5
+            while course.get_coalescing_stats().coalesced - before.coalesced < 4 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        session.get.assert_called_once_with(url, headers={})
+        self.assertEqual(results, [mocked_course_info_data] * 5)
+        stats = course.get_coalescing_stats()
+        self.assertEqual(stats.requests - before.requests, 1)
+        self.assertEqual(stats.coalesced - before.coalesced, 4)
+        self.assertEqual(course._in_flight, {})
+
+    def test_errors_shared_and_not_cached(self):
+        session = MagicMock()
+        session.get.side_effect = ConnectionError("PeopleSoft is down")
+        url = course.SUBJECTS_API
+
+        with patch.object(transport.get_transport(), "get_session", return_value=session):
+            self.assertRaises(ConnectionError, course._get_json, url)
+            self.assertRaises(ConnectionError, course._get_json, url)
+
+        # Requests that don't overlap are never coalesced
+        self.assertEqual(session.get.call_count, 2)
+        self.assertEqual(course._in_flight, {})
+
+    def test_cancelled_owner_doesnt_cancel_waiters(self):
+        url = course.COURSE_DETAIL_API.format(id="105611")
+
+        async def get_json(url):
+            await asyncio.sleep(0.05)
+            return mocked_course_info_data
+
+        async def main():
+            owner = asyncio.create_task(course._get_json_async(url))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(course._get_json_async(url))
+            await asyncio.sleep(0)
+            owner.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await owner
+            return await waiter
+
+        with patch.object(transport, "get_json_async", AsyncMock(side_effect=get_json)) as get_json_async:
+            self.assertEqual(asyncio.run(main()), mocked_course_info_data)
+
+        get_json_async.assert_awaited_once_with(url)
+        self.assertEqual(course._in_flight_async, {})
+
+    def test_request_cancelled_with_last_caller(self):
+        url = course.COURSE_DETAIL_API.format(id="105611")
+        cancelled = []
+
+        async def get_json(url):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(url)
+                raise
+
+        async def main():
+            callers = [asyncio.create_task(course._get_json_async(url)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            for caller in callers:
+                caller.cancel()
+            await asyncio.gather(*callers, return_exceptions=True)
+            await asyncio.sleep(0)
+
+        with patch.object(transport, "get_json_async", AsyncMock(side_effect=get_json)):
+            asyncio.run(main())
+
+        self.assertEqual(cancelled, [url])
+        self.assertEqual(course._in_flight_async, {})
+
+
+class AsyncCourseTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        course._reset_subject_codes()
+        course._reset_course_id_index()
+        self.responses = {
+            course.SUBJECTS_API: mocked_subject_data,
+            course.SUBJECT_COURSES_API.format(subject="CS"): mocked_courses_data,
+            course.COURSE_DETAIL_API.format(id="105611"): mocked_course_info_data,
+            course.COURSE_SECTIONS_API.format(id="105611", term="2231"): mocked_course_sections_data,
+            course.SECTION_DETAILS_API.format(term="2231", id="27815"): mocked_section_details_data,
+        }
+        patcher = patch.object(transport, "get_json_async", AsyncMock(side_effect=self.get_json))
+        self.get_json_async = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def get_json(self, url):
+        await asyncio.sleep(0)
+        if url not in self.responses:
+            raise ConnectionError(f"Unexpected URL {url}")
+        return self.responses[url]
+
+    async def test_get_course_details_async(self):
+        course_details = await course.get_course_details_async("2231", "CS", 7)
+
+        self.assertEqual(course_details.course, Course("CS", "0007", "105611", "INTRO TO COMPUTER PROGRAMMING"))
+        self.assertEqual(course_details.attributes[0].value, "ALG")
+        self.assertEqual([section.class_number for section in course_details.sections], ["27815"])
+        with self.assertRaises(ValueError):
+            await course.get_course_details_async("2231", "FOOBAR", 7)
+
+        # The subject codes and course ID index are shared with the sync API
+        self.assertEqual(course._validate_subject("CS"), "CS")
+        self.assertEqual(course._get_internal_id_dict("2231", "CS"), {"0007": "105611"})
+
+    async def test_identical_requests_coalesced(self):
+        before = course.get_coalescing_stats()
+
+        sections = await asyncio.gather(*(course.get_section_details_async("2231", 27815) for _ in range(5)))
+
+        self.get_json_async.assert_awaited_once_with(course.SECTION_DETAILS_API.format(term="2231", id="27815"))
+        self.assertEqual(sections, [sections[0]] * 5)
+        stats = course.get_coalescing_stats()
+        self.assertEqual(stats.requests - before.requests, 1)
+        self.assertEqual(stats.coalesced - before.coalesced, 4)
+        self.assertEqual(course._in_flight_async, {})
+
+    async def test_get_sections_details_async(self):
+        results = [result async for result in course.get_sections_details_async("2231", [27815, 99999])]
+
+        results_by_class_number = {result.class_number: result for result in results}
+        self.assertEqual(results_by_class_number["27815"].section.class_number, "27815")
+        self.assertIsInstance(results_by_class_number["99999"].error, ConnectionError)
+        self.assertEqual(course._in_flight_async, {})
+
+
+class CachedRegistryTest(unittest.TestCase):
+    def setUp(self):
+        course._reset_subject_codes()
+        course._reset_course_id_index()
+        self.stub = PeopleSoftStub()
+        patcher = patch.multiple(course, **PEOPLESOFT_FETCHERS, **self.stub.start())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.stub.stop)
+        self.addCleanup(course._reset_course_id_index)
+
+    def test_invalidated_index_refetched(self):
+        course.warm_course_id_index("2231", ["CS"])
+        course.invalidate_course_id_index("2231")
+        course.warm_course_id_index("2231", ["CS"])
+
+        self.assertEqual(self.stub.count("IScript_SubjectCourses"), 2)
+        # The refetched catalog replaced the cached one, so other terms use it without another request
+        course.warm_course_id_index("2234", ["CS"])
+        self.assertEqual(self.stub.count("IScript_SubjectCourses"), 2)
+
+    def test_expired_subject_codes_refetched(self):
+        course._validate_subject("CS")
+
+        original_ttl = course.SUBJECT_CODES_TTL
+        course.SUBJECT_CODES_TTL = 0
+        try:
+            course._get_subject_codes()
+            refresh_thread = course._subject_codes_refresh_thread
+            if refresh_thread is not None:
+                refresh_thread.join()
+        finally:
+            course.SUBJECT_CODES_TTL = original_ttl
+
+        self.assertEqual(self.stub.count("IScript_CatalogSubjects"), 2)
+
+
+class CrawlTermTest(unittest.TestCase):
+    def setUp(self):
+        course._reset_subject_codes()
+        course._reset_course_id_index()
+        self.stub = PeopleSoftStub(
+            courses={
+                "courses": [
+                    {"catalog_nbr": "0007", "descr": "INTRODUCTION TO COMPUTER PROGRAMMING", "crse_id": "105611"},
+                    {"catalog_nbr": "0008", "descr": "INTRODUCTION TO COMPUTER PROGRAMMING 2", "crse_id": "105612"},
+                    {"catalog_nbr": "0009", "descr": "NOT OFFERED", "crse_id": "105613"},
+                ]
+            },
+            offered={"105611", "105612"},
+        )
+        patcher = patch.multiple(course, **PEOPLESOFT_FETCHERS, **self.stub.start())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.stub.stop)
+
+    def test_crawl_term(self):
+        results = list(course.crawl_term("2231", concurrency=2))
+
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(isinstance(result, CourseDetails) for result in results))
+        self.assertEqual(sorted(result.course.course_number for result in results), ["0007", "0008"])
+        self.assertEqual(self.stub.count("IScript_CatalogSubjects"), 1)
+        self.assertEqual(self.stub.count("IScript_SubjectCourses"), 1)
+        self.assertEqual(self.stub.count("IScript_CatalogCourseDetails"), 3)
+
+    def test_crawl_term_resume_from_checkpoint(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checkpoint = Path(tmp_dir) / "2231.checkpoint"
+
+            crawl = course.crawl_term("2231", subjects=["CS"], concurrency=1, checkpoint=checkpoint)
+            first = next(crawl)
+            next(crawl)  # The first result is only checkpointed once the caller has moved past it
+            crawl.close()  # Simulate a crash halfway through the crawl
+
+            resumed = list(course.crawl_term("2231", subjects=["CS"], concurrency=1, checkpoint=checkpoint))
+
+            self.assertEqual(len(resumed), 1)
+            self.assertNotEqual(resumed[0].course.course_number, first.course.course_number)
+            self.assertEqual(checkpoint.read_text().split("\n")[:-1], ["2231 CS 0007", "2231 CS 0008", "2231 CS 0009"])
+
+    def test_crawl_term_checkpoint_of_other_term(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checkpoint = Path(tmp_dir) / "crawl.checkpoint"
+            checkpoint.write_text("2224 CS 0007\n")
+
+            with self.assertRaisesRegex(ValueError, "term 2231"):
+                list(course.crawl_term("2231", subjects=["CS"], checkpoint=checkpoint))
+            self.assertEqual(checkpoint.read_text(), "2224 CS 0007\n")
+            self.assertEqual(self.stub.count("IScript_CatalogCourseDetails"), 0)
+
+    def test_crawl_term_rate_limit(self):
+        rate_limits = transport.get_transport().rate_limiter.rate_limits
+        start = time.monotonic()
+        for _ in course.crawl_term("2231", concurrency=3, requests_per_second=50):
+            # The crawl never changes the limits of other PeopleSoft callers
+            self.assertEqual(rate_limits, ratelimit.DEFAULT_RATE_LIMITS)
+
+        # The catalog, the info of all 3 courses and the sections of the 2 that are offered are waited on, and each of
+        # those requests is spaced out by 1/50 of a second. The crawl doesn't wait for the sections of the course that
+        # isn't offered once its info comes back empty.
+        self.assertGreaterEqual(time.monotonic() - start, 5 / 50)
+        self.assertEqual(rate_limits, ratelimit.DEFAULT_RATE_LIMITS)
+
+    def test_crawl_term_rate_limits_only_sent_requests(self):
+        list(course.crawl_term("2231", concurrency=3))
+        transport_rate_limiter = transport.get_transport().rate_limiter
+        with patch.object(
+            ratelimit.HostRateLimiter, "wait", autospec=True, side_effect=ratelimit.HostRateLimiter.wait
+        ) as rate_limiter_wait:
+            list(course.crawl_term("2231", concurrency=3, requests_per_second=50))
+
+        crawl_waits = [call.args[1] for call in rate_limiter_wait.call_args_list if call.args[0] is not transport_rate_limiter]
+        # The catalog and course info come from the response cache, so only the sections requests take a token, along
+        # with the info of the course that isn't offered, since errors aren't cached
+        self.assertEqual(sum("IScript_BrowseSections" in url for url in crawl_waits), 3)
+        self.assertEqual(crawl_waits, [url for url in crawl_waits if "IScript_BrowseSections" in url or "105613" in url])
+        self.assertEqual(len(crawl_waits), 4)
+
+    def test_crawl_term_invalid_subject(self):
+        self.assertRaises(ValueError, list, course.crawl_term("2231", subjects=["nonsense"]))
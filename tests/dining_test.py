@@ -21,10 +21,11 @@ import json
 import unittest
 import responses
 import datetime
+from unittest.mock import MagicMock, patch
 
 from pathlib import Path
 
-from pittapi import dining
+from pittapi import dining, transport
 
 SAMPLE_PATH = Path() / "tests" / "samples"
 
@@ -65,6 +66,16 @@ class DiningTest(unittest.TestCase):
             dict,
         )
 
+    @responses.activate
+    def test_get_location_hours_invalid_date(self):
+        responses.add(responses.GET, dining.HOURS_URL.format(date_str="1999-04-12"), status=502)
+
+        with self.assertRaisesRegex(ValueError, "Invalid Date"):
+            dining.get_location_hours("The Eatery", datetime.datetime(1999, 4, 12))
+        with self.assertRaisesRegex(ValueError, "Invalid Date"):
+            dining.get_location_hours("The Eatery", datetime.datetime(1999, 4, 12))
+        self.assertEqual(len(responses.calls), 2)
+
     @responses.activate
     def test_get_location_menu(self):
         responses.add(
@@ -91,3 +102,26 @@ class DiningTest(unittest.TestCase):
         )
         locations = dining.get_location_menu("The Eatery", datetime.datetime(2024, 4, 12), "Breakfast")
         self.assertIsInstance(locations, dict)
+
+
+class AsyncDiningTest(unittest.IsolatedAsyncioTestCase):
+    async def test_get_location_menu_async(self):
+        with (SAMPLE_PATH / "dining_locations.json").open() as f:
+            locations_data = json.load(f)
+        with (SAMPLE_PATH / "dining_menu.json").open() as f:
+            menu_data = json.load(f)
+        responses_by_url = {
+            dining.LOCATIONS_URL: locations_data,
+            dining.PERIODS_URL.format(location_id="610b1f78e82971147c9f8ba5", date_str="24-04-12"): menu_data,
+            dining.MENU_URL.format(
+                location_id="610b1f78e82971147c9f8ba5", period_id="659daa4d351d53068df67835", date_str="24-04-12"
+            ): menu_data,
+        }
+
+        async def get(url, **kwargs):
+            return MagicMock(status_code=200, headers={}, json=MagicMock(return_value=responses_by_url[url]))
+
+        with patch.object(transport.get_async_transport(), "get", side_effect=get):
+            menu = await dining.get_location_menu_async("The Eatery", datetime.datetime(2024, 4, 12), "Breakfast")
+
+        self.assertEqual(menu, menu_data["menu"])
@@ -0,0 +1,74 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+import pkgutil
+import subprocess
+import sys
+import unittest
+
+import pittapi
+
+SUBMODULES = sorted(module.name for module in pkgutil.iter_modules(pittapi.__path__))
+
+# Seconds a cold import of any submodule may take, which is mostly spent importing requests
+IMPORT_TIME_BUDGET = 0.5
+
+# Dependencies that must only be imported by the functions that use them
+LAZY_MODULES = (
+    "requests_html",
+    "pyppeteer",
+    "lxml",
+    "bs4",
+    "httpx",
+    "gevent",
+    "grequests",
+    "prometheus_client",
+    "opentelemetry",
+)
+
+
+def run_python(code: str) -> str:
+    """Runs code in a fresh interpreter, so that modules imported by other tests don't count."""
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip()
+
+
+class ImportTest(unittest.TestCase):
+    def test_no_monkey_patching(self):
+        code = (
+            "import socket, sys\n"
+            "import pittapi.course, pittapi.textbook\n"
+            "print(any(name.partition('.')[0] in ('gevent', 'grequests') for name in sys.modules), socket.socket.__module__)"
+        )
+
+        self.assertEqual(run_python(code), "False socket")
+
+    def test_cold_imports(self):
+        for submodule in SUBMODULES:
+            with self.subTest(submodule=submodule):
+                code = (
+                    "import sys, time\n"
+                    "start = time.perf_counter()\n"
+                    f"import pittapi.{submodule}\n"
+                    "print(time.perf_counter() - start)\n"
+                    f"print(sorted(name for name in {LAZY_MODULES!r} if name in sys.modules))"
+                )
+                import_time, imported = run_python(code).splitlines()
+
+                self.assertEqual(imported, "[]")
+                self.assertLess(float(import_time), IMPORT_TIME_BUDGET)
@@ -20,18 +20,30 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 import unittest
 import responses
 import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from pittapi import lab
+from pittapi import lab, transport
 import tests.mocks.lab_mocks as lab_mocks
 
+# Synthetic, see lab_mocks
+AVAIL_DATA = lab_mocks.synthetic_avail_data
+
 
 def create_test_url(lab_name: str) -> str:
     return lab.PITT_BASE_URL + lab.AVAIL_LAB_ID_MAP[lab_name] + "/status.json?noredir=1"
 
 
+def add_lab_directory() -> None:
+    responses.add(responses.GET, lab.LAB_DIRECTORY_URL, json=AVAIL_DATA)
+
+
 class LabTest(unittest.TestCase):
+    def setUp(self):
+        lab._set_lab_directory_error(None)
+
     @responses.activate
     def test_get_status_bellefield(self):
+        add_lab_directory()
         responses.add(
             responses.GET,
             create_test_url("BELLEFIELD"),
@@ -56,6 +68,7 @@ class LabTest(unittest.TestCase):
 
     @responses.activate
     def test_get_status_lawrence(self):
+        add_lab_directory()
         responses.add(
             responses.GET,
             create_test_url("LAWRENCE"),
@@ -80,6 +93,7 @@ class LabTest(unittest.TestCase):
 
     @responses.activate
     def test_get_status_sutherland(self):
+        add_lab_directory()
         responses.add(
             responses.GET,
             create_test_url("SUTH"),
@@ -104,6 +118,7 @@ class LabTest(unittest.TestCase):
 
     @responses.activate
     def test_get_status_cathg27(self):
+        add_lab_directory()
         responses.add(
             responses.GET,
             create_test_url("CATH_G27"),
@@ -128,6 +143,7 @@ class LabTest(unittest.TestCase):
 
     @responses.activate
     def test_get_status_cathg62(self):
+        add_lab_directory()
         responses.add(
             responses.GET,
             create_test_url("CATH_G62"),
@@ -152,6 +168,7 @@ class LabTest(unittest.TestCase):
 
     @responses.activate
     def test_get_status_benedum(self):
+        add_lab_directory()
         responses.add(
             responses.GET,
             create_test_url("BENEDUM"),
@@ -176,6 +193,7 @@ class LabTest(unittest.TestCase):
 
     @responses.activate
     def test_get_all_lab_data(self):
+        add_lab_directory()
         responses.add(
             responses.GET,
             create_test_url("BELLEFIELD"),
@@ -215,6 +233,131 @@ class LabTest(unittest.TestCase):
         for item in results:
             self.assertIsInstance(item, lab.Lab)
 
+    @responses.activate
+    def test_get_all_lab_data_partial_failure(self):
+        add_lab_directory()
+        lab_data = [
+            lab_mocks.mocked_bellefield_data,
+            lab_mocks.mocked_lawrence_data,
+            lab_mocks.mocked_sutherland_data,
+            None,
+            lab_mocks.mocked_cathy_g62_data,
+            lab_mocks.mocked_benedum_data,
+        ]
+        for lab_name, data in zip(lab.AVAIL_LAB_ID_MAP, lab_data):
+            if data is None:
+                responses.add(responses.GET, create_test_url(lab_name), body="Resource not found", status=404)
+            else:
+                responses.add(responses.GET, create_test_url(lab_name), json=data)
+
+        with self.assertWarnsRegex(UserWarning, "lab CATH_G27: The Lab ID was invalid"):
+            results = lab.get_all_labs_data()
+
+        self.assertEqual(
+            [result.name for result in results],
+            ["Bellefield 314", "David Lawrence 230", "Sutherland 120", "Cathedral G62", "Benedum B06"],
+        )
+
+    @responses.activate
+    def test_get_all_lab_data_all_failed(self):
+        add_lab_directory()
+        for lab_name in lab.AVAIL_LAB_ID_MAP:
+            responses.add(responses.GET, create_test_url(lab_name), body="Unauthorized", status=401)
+
+        with pytest.raises(lab.LabAPIError, match="Unauthorized"):
+            lab.get_all_labs_data()
+
+    @responses.activate
+    def test_get_all_lab_data_directory_refreshed_once(self):
+        add_lab_directory()
+        for lab_name in lab.AVAIL_LAB_ID_MAP:
+            responses.add(responses.GET, create_test_url(lab_name), body="Resource not found", status=404)
+
+        with pytest.raises(lab.LabAPIError, match="The Lab ID was invalid"):
+            lab.get_all_labs_data()
+
+        # Fetched once for the lookup, and once more for every lab that got a 404
+        self.assertEqual([call.request.url for call in responses.calls].count(lab.LAB_DIRECTORY_URL), 2)
+
+    @responses.activate
+    def test_lab_directory_cached(self):
+        add_lab_directory()
+        responses.add(responses.GET, create_test_url("SUTH"), json=lab_mocks.mocked_sutherland_data)
+
+        lab.get_one_lab_data("SUTH")
+        lab.get_one_lab_data("SUTH")
+
+        self.assertEqual([call.request.url for call in responses.calls].count(lab.LAB_DIRECTORY_URL), 1)
+
+    @responses.activate
+    def test_lab_id_changed(self):
+        new_url = lab.PITT_BASE_URL + "0123456789abcdef0123456789abcdef/status.json?noredir=1"
+        responses.add(responses.GET, lab.LAB_DIRECTORY_URL, json=AVAIL_DATA)
+        responses.add(
+            responses.GET,
+            lab.LAB_DIRECTORY_URL,
+            json={"0123456789abcdef0123456789abcdef": {"name": "Sutherland 120", "avail": 11, "total": 12}},
+        )
+        responses.add(responses.GET, create_test_url("SUTH"), body="Resource not found", status=404)
+        responses.add(responses.GET, new_url, json=lab_mocks.mocked_sutherland_data)
+
+        result = lab.get_one_lab_data("SUTH")
+
+        self.assertEqual(result.name, "Sutherland 120")
+        self.assertEqual(
+            [call.request.url for call in responses.calls],
+            [lab.LAB_DIRECTORY_URL, create_test_url("SUTH"), lab.LAB_DIRECTORY_URL, new_url],
+        )
+
+        # The refreshed directory is cached
+        lab.get_one_lab_data("SUTH")
+        self.assertEqual(responses.calls[-1].request.url, new_url)
+        self.assertEqual(len(responses.calls), 5)
+
+    @responses.activate
+    def test_lab_directory_unavailable(self):
+        responses.add(responses.GET, lab.LAB_DIRECTORY_URL, status=404)
+        responses.add(responses.GET, create_test_url("SUTH"), json=lab_mocks.mocked_sutherland_data)
+
+        with self.assertWarnsRegex(UserWarning, "Failed to fetch the lab directory"):
+            result = lab.get_one_lab_data("SUTH")
+
+        self.assertEqual(result.name, "Sutherland 120")
+
+        # The directory isn't tried again for a while, so lookups go back to a single status request
+        lab.get_one_lab_data("SUTH")
+        self.assertEqual(
+            [call.request.url for call in responses.calls],
+            [lab.LAB_DIRECTORY_URL, create_test_url("SUTH"), create_test_url("SUTH")],
+        )
+
+    @responses.activate
+    def test_lab_directory_retried_after_404(self):
+        responses.add(responses.GET, lab.LAB_DIRECTORY_URL, status=503)
+        responses.add(responses.GET, create_test_url("SUTH"), json=lab_mocks.mocked_sutherland_data)
+        responses.add(responses.GET, create_test_url("CATH_G27"), body="Resource not found", status=404)
+        with self.assertWarns(UserWarning), patch("time.sleep"):
+            lab.get_one_lab_data("SUTH")
+
+        # A 404 fetches the directory again even while it's falling back to the built-in IDs
+        responses.replace(responses.GET, lab.LAB_DIRECTORY_URL, json=AVAIL_DATA)
+        responses.calls.reset()
+        self.assertRaises(lab.LabAPIError, lab.get_one_lab_data, "CATH_G27")
+        lab.get_one_lab_data("SUTH")
+
+        self.assertEqual(
+            [call.request.url for call in responses.calls],
+            [create_test_url("CATH_G27"), lab.LAB_DIRECTORY_URL, create_test_url("SUTH")],
+        )
+
+    def test_parse_lab_directory(self):
+        directory = lab._parse_lab_directory(AVAIL_DATA)
+
+        self.assertEqual(lab._resolve_lab_ids(directory), lab.AVAIL_LAB_ID_MAP)
+        self.assertEqual(directory["sutherland 120"], lab.AVAIL_LAB_ID_MAP["SUTH"])
+        with self.assertRaises(lab.LabAPIError):
+            lab._parse_lab_directory({})
+
     def test_invalid_lab_name(self):
         with pytest.raises(
             ValueError,
@@ -224,6 +367,7 @@ class LabTest(unittest.TestCase):
 
     @responses.activate
     def test_handle_invalid_lab_id(self):
+        add_lab_directory()
         responses.add(
             responses.GET,
             create_test_url("CATH_G27"),
@@ -239,6 +383,7 @@ class LabTest(unittest.TestCase):
 
     @responses.activate
     def test_handle_unexpected_fetch_err(self):
+        add_lab_directory()
         responses.add(
             responses.GET,
             create_test_url("CATH_G27"),
@@ -251,3 +396,68 @@ class LabTest(unittest.TestCase):
             match="An unexpected error occurred while fetching lab data: Unauthorized",
         ):
             lab.get_one_lab_data("CATH_G27")
+
+
+class AsyncLabTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        lab._set_lab_directory_error(None)
+
+    async def test_get_all_labs_data_async(self):
+        lab_data = {
+            lab.LAB_DIRECTORY_URL: AVAIL_DATA,
+            create_test_url("BELLEFIELD"): lab_mocks.mocked_bellefield_data,
+            create_test_url("LAWRENCE"): lab_mocks.mocked_lawrence_data,
+            create_test_url("SUTH"): lab_mocks.mocked_sutherland_data,
+            create_test_url("CATH_G27"): lab_mocks.mocked_cathy_g27_data,
+            create_test_url("CATH_G62"): lab_mocks.mocked_cathy_g62_data,
+            create_test_url("BENEDUM"): lab_mocks.mocked_benedum_data,
+        }
+
+        async def get(url, **kwargs):
+            return MagicMock(status_code=200, json=MagicMock(return_value=lab_data[url]))
+
+        with patch.object(transport, "get_async", AsyncMock(side_effect=get)) as get_async:
+            labs = await lab.get_all_labs_data_async()
+
+        self.assertEqual(len(labs), 6)
+        self.assertEqual(labs[1], lab.Lab("David Lawrence 230", False, 25, 10, 5, 0, 40))
+        get_async.assert_any_await(create_test_url("BENEDUM"), verify=False)
+
+    async def test_get_all_labs_data_async_partial_failure(self):
+        async def get(url, **kwargs):
+            if url == lab.LAB_DIRECTORY_URL:
+                return MagicMock(status_code=200, json=MagicMock(return_value=AVAIL_DATA))
+            if url == create_test_url("BELLEFIELD"):
+                return MagicMock(status_code=404)
+            return MagicMock(status_code=200, json=MagicMock(return_value=lab_mocks.mocked_benedum_data))
+
+        with patch.object(transport, "get_async", AsyncMock(side_effect=get)):
+            with self.assertWarnsRegex(UserWarning, "lab BELLEFIELD"):
+                labs = await lab.get_all_labs_data_async()
+
+        self.assertEqual(len(labs), 5)
+
+    async def test_get_all_labs_data_async_directory_refreshed_once(self):
+        async def get(url, **kwargs):
+            if url == lab.LAB_DIRECTORY_URL:
+                return MagicMock(status_code=200, json=MagicMock(return_value=AVAIL_DATA))
+            return MagicMock(status_code=404)
+
+        with patch.object(transport, "get_async", AsyncMock(side_effect=get)) as get_async:
+            with self.assertRaises(lab.LabAPIError):
+                await lab.get_all_labs_data_async()
+
+        self.assertEqual([call.args[0] for call in get_async.await_args_list].count(lab.LAB_DIRECTORY_URL), 2)
+
+    async def test_handle_invalid_lab_id_async(self):
+        async def get(url, **kwargs):
+            if url == lab.LAB_DIRECTORY_URL:
+                return MagicMock(status_code=200, json=MagicMock(return_value=AVAIL_DATA))
+            return MagicMock(status_code=404)
+
+        with patch.object(transport, "get_async", AsyncMock(side_effect=get)) as get_async:
+            with self.assertRaises(lab.LabAPIError):
+                await lab.get_one_lab_data_async("BELLEFIELD")
+
+        # The directory is fetched again in case the ID changed, but it hasn't, so the lab isn't retried
+        self.assertEqual(get_async.await_count, 3)
@@ -20,10 +20,11 @@ with this program; if not, write to the Free Software Foundation, Inc.,
 import unittest
 import responses
 import json
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from pathlib import Path
 
-from pittapi import laundry
+from pittapi import laundry, transport
 from pittapi.laundry import BuildingStatus
 
 SAMPLE_PATH = Path() / "tests" / "samples"
@@ -104,3 +105,18 @@ class LaundryTest(unittest.TestCase):
                 self.assertIsNone(machine.time_left)
             else:
                 self.fail(f"Invalid machine status detected for {machine=}")
+
+
+class AsyncLaundryTest(unittest.IsolatedAsyncioTestCase):
+    async def test_get_building_status_async(self):
+        with (SAMPLE_PATH / "laundry_mock_response_holland.json").open() as file:
+            response = MagicMock(status_code=200, json=MagicMock(return_value=json.load(file)))
+
+        with patch.object(transport, "get_async", AsyncMock(return_value=response)) as get_async:
+            status = await laundry.get_building_status_async("HOLLAND")
+
+        get_async.assert_awaited_once_with(laundry.BASE_URL.format(location=laundry.LOCATION_LOOKUP["HOLLAND"]))
+        self.assertEqual(
+            status,
+            BuildingStatus(building="HOLLAND", free_washers=0, free_dryers=15, total_washers=14, total_dryers=21),
+        )
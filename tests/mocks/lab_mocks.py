@@ -328,3 +328,16 @@ mocked_benedum_data = {
     "devices": {},
     "time": "2024-04-16 11:18:55",
 }
+
+
+# SYNTHETIC, not a recording: avail.json couldn't be reached when the lab directory lookup was written. It follows
+# the shape the lookup expects (lab ID -> {"name", "avail", "total"}), with the labs' names taken from their recorded
+# status.json responses above and their IDs from lab.AVAIL_LAB_ID_MAP. Replace with a recording of avail.json.
+synthetic_avail_data = {
+    "bba4a8796295ff6a8df116524b40e178": {"name": "Bellefield 314", "avail": 29, "total": 30},
+    "98a4759fc02ca3655d56cd58abed4e90": {"name": "David Lawrence 230", "avail": 25, "total": 40},
+    "8adaaeb974aa38b2283c73532c095ca7": {"name": "Sutherland 120", "avail": 11, "total": 12},
+    "6fd5a4e0dd0a32e3ccb441e25a1a2d78": {"name": "Cathedral G27", "avail": 16, "total": 30},
+    "04853e8d1453c90a910a0b803529a3a0": {"name": "Cathedral G62", "avail": 26, "total": 31},
+    "25d1bfa80cafb622994b7d06c63011f2": {"name": "Benedum B06", "avail": 28, "total": 39},
+}
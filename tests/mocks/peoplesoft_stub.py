@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from pittapi import course
+from tests.mocks.course_mocks import (
+    mocked_subject_data,
+    mocked_courses_data,
+    mocked_course_info_data,
+    mocked_course_sections_data,
+    mocked_section_details_data,
+)
+
+PEOPLESOFT_URL = "https://pitcsprd.csps.pitt.edu"
+PEOPLESOFT_API_NAMES = [
+    "SUBJECTS_API",
+    "SUBJECT_COURSES_API",
+    "COURSE_DETAIL_API",
+    "COURSE_SECTIONS_API",
+    "SECTION_DETAILS_API",
+]
+
+
+class PeopleSoftStub:
+    """Local HTTP server that replays the recorded PeopleSoft payloads in course_mocks.
+
+    Course IDs listed in `offered` get the recorded course info and sections, every other course ID gets an empty
+    section list, just like a catalog course that isn't offered in the requested term.
+
+    The server handles one request at a time on a single thread."""
+
+    def __init__(self, courses: dict[str, Any] = mocked_courses_data, offered: set[str] | None = None):
+        self.courses = courses
+        self.offered = offered if offered is not None else {course["crse_id"] for course in courses["courses"]}
+        self.requests: list[str] = []
+        self._lock = threading.Lock()
+        self._server: HTTPServer | None = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        assert self._server
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> dict[str, str]:
+        """Starts the server and returns the course module API URLs rewritten to point at it."""
+        self._thread.start()
+        self._ready.wait()
+        return {name: getattr(course, name).replace(PEOPLESOFT_URL, self.base_url) for name in PEOPLESOFT_API_NAMES}
+
+    def _serve(self) -> None:
+        self._server = HTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._ready.set()
+        self._server.serve_forever(poll_interval=0.05)
+
+    def stop(self) -> None:
+        assert self._server
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count(self, script: str) -> int:
+        with self._lock:
+            return sum(1 for request in self.requests if script in request)
+
+    def _respond(self, path: str) -> dict[str, Any]:
+        url = urlsplit(path)
+        query = parse_qs(url.query)
+        if url.path.endswith("IScript_CatalogSubjects"):
+            return mocked_subject_data
+        if url.path.endswith("IScript_SubjectCourses"):
+            return self.courses
+        if url.path.endswith("IScript_CatalogCourseDetails"):
+            return mocked_course_info_data if query["course_id"][0] in self.offered else {"course_details": {}}
+        if url.path.endswith("IScript_BrowseSections"):
+            return mocked_course_sections_data if query["course_id"][0] in self.offered else {"sections": []}
+        if url.path.endswith("IScript_ClassDetails"):
+            return mocked_section_details_data
+        raise LookupError(f"No recorded payload for {path}")
+
+    def _make_handler(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                with stub._lock:
+                    stub.requests.append(self.path)
+                body = json.dumps(stub._respond(self.path)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
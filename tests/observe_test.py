@@ -0,0 +1,200 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+import json
+import unittest
+import warnings
+from pathlib import Path
+from unittest.mock import patch
+
+import requests
+import responses
+
+from pittapi import dining, lab, library, observe, shuttle, status, transport
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
+
+try:
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+except ImportError:
+    TracerProvider = None
+
+SAMPLE_PATH = Path() / "tests" / "samples"
+
+
+class RecordingObserver(observe.Observer):
+    def __init__(self):
+        self.fetches = []
+        self.parses = []
+
+    def on_fetch(self, event):
+        self.fetches.append(event)
+
+    def on_parse(self, event):
+        self.parses.append(event)
+
+
+class ObserveTest(unittest.TestCase):
+    def setUp(self):
+        self.observer = RecordingObserver()
+        observe.add_observer(self.observer)
+        self.addCleanup(observe.remove_observer, self.observer)
+        with (SAMPLE_PATH / "status.json").open() as f:
+            self.status_data = json.load(f)
+
+    def test_match_endpoint(self):
+        self.assertEqual(
+            observe.match_endpoint(dining.PERIODS_URL.format(location_id="abc", date_str="24-04-12")),
+            ("dining.periods", dining.PERIODS_URL),
+        )
+        self.assertEqual(
+            observe.match_endpoint(dining.MENU_URL.format(location_id="abc", period_id="def", date_str="24-04-12")),
+            ("dining.menu", dining.MENU_URL),
+        )
+        self.assertEqual(
+            observe.match_endpoint(lab._get_lab_url(lab.AVAIL_LAB_ID_MAP["SUTH"])), ("lab.status", lab.LAB_STATUS_URL)
+        )
+        # Query parameters that aren't in the template are ignored
+        self.assertEqual(observe.match_endpoint(library._get_query_url("water")), ("library.search", library.LIBRARY_URL))
+        self.assertEqual(observe.match_endpoint(shuttle.ROUTES_URL + "?ApiKey=123"), ("shuttle.routes", shuttle.ROUTES_URL))
+        self.assertEqual(observe.match_endpoint("https://example.com/status.json"), ("example.com", None))
+
+    @responses.activate
+    def test_fetch_and_parse_events(self):
+        responses.add(responses.GET, status.STATUS_URL, json=self.status_data)
+        status.get_status()
+
+        (fetch,) = self.observer.fetches
+        self.assertEqual(fetch.endpoint, "status.status")
+        self.assertEqual(fetch.url_template, status.STATUS_URL)
+        self.assertEqual(fetch.url, status.STATUS_URL)
+        self.assertEqual(fetch.method, "GET")
+        self.assertEqual(fetch.status, 200)
+        self.assertEqual(fetch.bytes, len(json.dumps(self.status_data)))
+        self.assertEqual(fetch.retries, 0)
+        self.assertIsNone(fetch.error)
+        self.assertGreaterEqual(fetch.network_time, 0)
+        self.assertEqual(
+            [(parse.endpoint, parse.step) for parse in self.observer.parses],
+            [("status.status", "json"), ("status.status", "parse_status")],
+        )
+
+    @responses.activate
+    def test_errors_reported(self):
+        responses.add(responses.GET, status.STATUS_URL, body=requests.ConnectionError("unreachable"))
+        with self.assertRaises(requests.ConnectionError):
+            status.get_status()
+        (fetch,) = self.observer.fetches
+        self.assertIsNone(fetch.status)
+        self.assertIsInstance(fetch.error, requests.ConnectionError)
+
+        with self.assertRaises(KeyError):
+            status._parse_status({})
+        self.assertIsInstance(self.observer.parses[-1].error, KeyError)
+
+    def test_failing_observer(self):
+        class FailingObserver(observe.Observer):
+            def on_parse(self, event):
+                raise RuntimeError("broken")
+
+        failing = FailingObserver()
+        observe.add_observer(failing)
+        self.addCleanup(observe.remove_observer, failing)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            status._parse_status(self.status_data)
+
+        self.assertEqual(len(caught), 1)
+        self.assertEqual(len(self.observer.parses), 1)
+
+    def test_nothing_reported_without_observers(self):
+        observe.remove_observer(self.observer)
+        self.assertFalse(observe.is_observed())
+        status._parse_status(self.status_data)
+        self.assertEqual(self.observer.parses, [])
+
+    @unittest.skipIf(prometheus_client is None, "prometheus_client is not installed")
+    def test_prometheus_observer(self):
+        registry = prometheus_client.CollectorRegistry()
+        prometheus = observe.PrometheusObserver(registry=registry)
+        prometheus.on_fetch(
+            observe.FetchEvent("status.status", None, status.STATUS_URL, "GET", 200, 2048, 0.0, 0.3, retries=2)
+        )
+        prometheus.on_parse(observe.ParseEvent("status.status", "json", 0.0, 0.004))
+
+        def sample(name, **labels):
+            return registry.get_sample_value(f"pittapi_{name}", labels)
+
+        self.assertEqual(sample("fetch_duration_seconds_count", endpoint="status.status", status="200"), 1)
+        self.assertEqual(sample("fetch_duration_seconds_bucket", endpoint="status.status", status="200", le="0.25"), 0)
+        self.assertEqual(sample("fetch_duration_seconds_bucket", endpoint="status.status", status="200", le="0.5"), 1)
+        self.assertEqual(sample("fetch_size_bytes_sum", endpoint="status.status"), 2048)
+        self.assertEqual(sample("fetch_retries_total", endpoint="status.status"), 2)
+        self.assertEqual(sample("parse_duration_seconds_sum", endpoint="status.status", step="json"), 0.004)
+
+    @unittest.skipIf(TracerProvider is None, "the OpenTelemetry SDK is not installed")
+    def test_opentelemetry_observer(self):
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        otel = observe.OpenTelemetryObserver(tracer_provider=provider)
+
+        otel.on_fetch(
+            observe.FetchEvent(
+                "dining.periods", dining.PERIODS_URL, "https://example.com", "GET", 502, 10, 1000.0, 0.5, retries=0
+            )
+        )
+        otel.on_parse(observe.ParseEvent("status.status", "parse_status", 1000.0, 0.25))
+
+        fetch_span, parse_span = exporter.get_finished_spans()
+        self.assertEqual(fetch_span.name, f"GET {dining.PERIODS_URL}")
+        self.assertEqual(fetch_span.attributes["http.response.status_code"], 502)
+        self.assertEqual(fetch_span.attributes["error.type"], "502")
+        self.assertEqual(fetch_span.end_time - fetch_span.start_time, 500_000_000)
+        self.assertEqual(parse_span.name, "parse status.status")
+        self.assertEqual(parse_span.attributes["pittapi.parse_step"], "parse_status")
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class AsyncObserveTest(unittest.IsolatedAsyncioTestCase):
+    async def test_fetch_events(self):
+        observer = RecordingObserver()
+        observe.add_observer(observer)
+        self.addCleanup(observe.remove_observer, observer)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(404, json={})))
+        with patch.object(transport.get_async_transport(), "get_client", return_value=client):
+            await transport.get_async(shuttle.ROUTES_URL, params={"ApiKey": "123"})
+        await client.aclose()
+
+        (fetch,) = observer.fetches
+        self.assertEqual(fetch.endpoint, "shuttle.routes")
+        self.assertEqual(fetch.url, shuttle.ROUTES_URL + "?ApiKey=123")
+        self.assertEqual(fetch.status, 404)
+        self.assertEqual(fetch.bytes, 2)
@@ -0,0 +1,136 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import responses
+
+from pittapi import observe, people, ratelimit, transport
+
+URL = "https://www.laundryview.com/api/currentRoomData?school_desc_key=197&location=2430136"
+HOST = "www.laundryview.com"
+
+
+class RecordingObserver(observe.Observer):
+    def __init__(self):
+        self.fetches = []
+
+    def on_fetch(self, event):
+        self.fetches.append(event)
+
+
+class HostRateLimiterTest(unittest.TestCase):
+    @patch("time.monotonic", return_value=1000.0)
+    def test_token_bucket(self, monotonic):
+        limiter = ratelimit.HostRateLimiter({HOST: ratelimit.RateLimit(rate=2, burst=3)})
+
+        # The burst is free, after which requests queue for tokens that haven't come back yet
+        self.assertEqual([limiter.reserve(URL) for _ in range(5)], [0.0, 0.0, 0.0, 0.5, 1.0])
+        self.assertEqual(limiter.reserve("https://status.pitt.edu/index.json"), 0.0)
+
+        monotonic.return_value = 1010.0
+        self.assertEqual([limiter.reserve(URL) for _ in range(4)], [0.0, 0.0, 0.0, 0.5])
+
+    @patch("time.monotonic", return_value=1000.0)
+    def test_fail_fast(self, monotonic):
+        limiter = ratelimit.HostRateLimiter({HOST: ratelimit.RateLimit(rate=1, max_wait=0.0)})
+        limiter.reserve(URL)
+        with self.assertRaises(ratelimit.RateLimitExceeded) as context:
+            limiter.reserve(URL)
+        self.assertEqual(context.exception.wait, 1.0)
+
+        # Requests that failed fast don't take a token
+        monotonic.return_value = 1001.0
+        self.assertEqual(limiter.reserve(URL), 0.0)
+
+    def test_shared_between_processes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "rate_limits.db"
+            rate_limits = {HOST: ratelimit.RateLimit(rate=0.01, burst=2, max_wait=0.0)}
+            # Limiters with the same path share their buckets, like they would in separate processes
+            first = ratelimit.HostRateLimiter(rate_limits, path=path)
+            second = ratelimit.HostRateLimiter(rate_limits, path=path)
+
+            self.assertEqual(first.reserve(URL), 0.0)
+            self.assertEqual(second.reserve(URL), 0.0)
+            self.assertRaises(ratelimit.RateLimitExceeded, first.reserve, URL)
+
+            second.reset()
+            self.assertEqual(first.reserve(URL), 0.0)
+
+    def test_default_rate_limits(self):
+        host = people.PEOPLE_SEARCH_URL.split("/")[2]
+        self.assertIn(host, transport.get_transport().rate_limiter.rate_limits)
+        self.assertEqual(ratelimit.HostRateLimiter({}).rate_limits, {})
+
+    @patch("time.monotonic", return_value=1000.0)
+    def test_default_limiter_shared(self, monotonic):
+        # The sync and async transports draw from the same find.pitt.edu quota
+        self.assertIs(transport.get_transport().rate_limiter, ratelimit.default_rate_limiter)
+        self.assertIs(transport.get_async_transport().rate_limiter, ratelimit.default_rate_limiter)
+        self.assertIs(transport.AsyncTransport().rate_limiter, ratelimit.default_rate_limiter)
+
+        url = people.PEOPLE_SEARCH_URL
+        burst = int(ratelimit.DEFAULT_RATE_LIMITS[url.split("/")[2]].burst)
+        for _ in range(burst):
+            self.assertEqual(transport.get_transport().rate_limiter.reserve(url), 0.0)
+        self.assertGreater(transport.get_async_transport().rate_limiter.reserve(url), 0.0)
+
+
+@patch("time.sleep")
+class TransportRateLimitTest(unittest.TestCase):
+    def setUp(self):
+        self.rate_limiter = ratelimit.HostRateLimiter({HOST: ratelimit.RateLimit(rate=4)})
+        self.pool = transport.Transport(rate_limiter=self.rate_limiter)
+        self.observer = RecordingObserver()
+        observe.add_observer(self.observer)
+
+    def tearDown(self):
+        observe.remove_observer(self.observer)
+        self.pool.close()
+
+    @responses.activate
+    def test_queue(self, sleep):
+        responses.add(responses.GET, URL, json={})
+
+        self.pool.get(URL)
+        self.pool.get(URL)
+
+        self.assertEqual(len(responses.calls), 2)
+        sleep.assert_called_once()
+        waits = [event.rate_limit_wait for event in self.observer.fetches]
+        self.assertEqual(waits[0], 0.0)
+        self.assertAlmostEqual(waits[1], 0.25, delta=0.01)
+
+    @responses.activate
+    def test_fail_fast(self, sleep):
+        responses.add(responses.GET, URL, json={})
+        self.rate_limiter.rate_limits[HOST] = ratelimit.RateLimit(rate=4, max_wait=0.0)
+
+        self.pool.get(URL)
+        with self.assertRaises(ratelimit.RateLimitExceeded):
+            self.pool.get(URL)
+
+        self.assertEqual(len(responses.calls), 1)
+        sleep.assert_not_called()
+        self.assertIsInstance(self.observer.fetches[-1].error, ratelimit.RateLimitExceeded)
+        self.assertEqual(self.pool.circuit_breaker.get_state(HOST), "closed")
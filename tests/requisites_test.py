@@ -0,0 +1,123 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+import unittest
+
+from pittapi import requisites
+from pittapi.course import Course, CourseDetails
+from pittapi.requisites import CourseRef, Requirement
+
+CS_0401 = CourseRef("CS", "0401")
+CS_0441 = CourseRef("CS", "0441")
+CS_0445 = CourseRef("CS", "0445")
+CS_0447 = CourseRef("CS", "0447")
+CS_1501 = CourseRef("CS", "1501")
+CS_1550 = CourseRef("CS", "1550")
+MATH_0220 = CourseRef("MATH", "0220")
+
+
+def make_details(subject_code: str, course_number: str, requisites_str: str) -> CourseDetails:
+    return CourseDetails(
+        course=Course(subject_code=subject_code, course_number=course_number, course_id="", course_title=""),
+        requisites=requisites_str,
+    )
+
+
+class ParseRequisitesTest(unittest.TestCase):
+    def test_parse_requisites(self):
+        self.assertEqual(
+            requisites.parse_requisites("PREQ: (CS 0441 or MATH 0220) and CS 0445; MIN GRADE 'C' FOR LISTED COURSES"),
+            Requirement("AND", (Requirement("OR", (CS_0441, MATH_0220)), CS_0445)),
+        )
+        self.assertEqual(
+            requisites.parse_requisites("PREQ: MATH 0220 or 0230"), Requirement("OR", (MATH_0220, CourseRef("MATH", "0230")))
+        )
+        self.assertEqual(
+            requisites.parse_requisites("CS 0401 and CS 0441 or CS 0445"),
+            Requirement("OR", (Requirement("AND", (CS_0401, CS_0441)), CS_0445)),
+        )
+
+    def test_parse_requisites_labels(self):
+        self.assertEqual(
+            requisites.parse_requisites("PROG: School of Computing; PREQ: CS 0401, 0445, or 0441; CREQ: CS 0447"),
+            Requirement("OR", (CS_0401, CS_0445, CS_0441)),
+        )
+        self.assertEqual(
+            requisites.parse_requisites("PREQ: CS 0441, 0445 and MATH 0220"), Requirement("AND", (CS_0441, CS_0445, MATH_0220))
+        )
+        self.assertIsNone(requisites.parse_requisites("PLAN: Computer Science (BS); CREQ: CS 0447"))
+        self.assertIsNone(requisites.parse_requisites(""))
+        self.assertIsNone(requisites.parse_requisites(None))
+
+    def test_parse_requisites_ignores_noise(self):
+        self.assertEqual(requisites.parse_requisites("PREQ: CS 0445 or instructor permission"), CS_0445)
+        self.assertEqual(requisites.parse_requisites("PREQ: (CS 0441 and CS 0445))"), Requirement("AND", (CS_0441, CS_0445)))
+        self.assertEqual(requisites.parse_requisites("PREQ: (CS 0441 or"), CS_0441)
+
+    def test_is_satisfied(self):
+        expression = requisites.parse_requisites("PREQ: (CS 0441 or MATH 0220) and CS 0445")
+
+        self.assertTrue(requisites.is_satisfied(expression, [MATH_0220, CS_0445]))
+        self.assertTrue(requisites.is_satisfied(expression, ["CS 0441", "cs 0445"]))
+        self.assertFalse(requisites.is_satisfied(expression, [CS_0441]))
+        self.assertTrue(requisites.is_satisfied(None, []))
+
+
+class PrerequisiteGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = requisites.PrerequisiteGraph.from_courses(
+            [
+                make_details("CS", "0441", "PREQ: MATH 0220"),
+                make_details("CS", "0445", "PREQ: CS 0401; MIN GRADE 'C'"),
+                make_details("CS", "0447", "PREQ: CS 0401"),
+                make_details("CS", "1501", "PREQ: CS 0441 and CS 0445"),
+                make_details("CS", "1550", "PREQ: CS 0447 and (CS 1501 or CS 0445)"),
+            ]
+        )
+
+    def test_direct_edges(self):
+        self.assertEqual(self.graph.get_prerequisites("CS 1550"), {CS_0447, CS_1501, CS_0445})
+        self.assertEqual(self.graph.get_unlocked_courses(CS_0445), {CS_1501, CS_1550})
+        self.assertIn(CS_0401, self.graph)
+        self.assertEqual(len(self.graph), 7)
+
+    def test_transitive_closure(self):
+        self.assertEqual(self.graph.get_all_unlocked_courses(CS_0401), {CS_0445, CS_0447, CS_1501, CS_1550})
+        self.assertEqual(self.graph.get_all_unlocked_courses(MATH_0220), {CS_0441, CS_1501, CS_1550})
+        self.assertEqual(self.graph.get_all_prerequisites(CS_1550), {CS_0401, CS_0441, CS_0445, CS_0447, CS_1501, MATH_0220})
+
+        self.graph.add_course(make_details("CS", "1550", "PREQ: CS 0447"))
+
+        self.assertEqual(self.graph.get_all_prerequisites(CS_1550), {CS_0401, CS_0447})
+        self.assertEqual(self.graph.get_all_unlocked_courses(MATH_0220), {CS_0441, CS_1501})
+
+    def test_topological_order(self):
+        order = self.graph.get_topological_order()
+
+        self.assertEqual(order, [CS_0401, CS_0445, CS_0447, MATH_0220, CS_0441, CS_1501, CS_1550])
+        self.assertEqual(self.graph.get_topological_order(["CS 1550", "CS 0441", "CS 1501"]), [CS_0441, CS_1501, CS_1550])
+
+        self.graph.add_requisites("CS", "0401", "PREQ: CS 1550")
+        with self.assertRaises(ValueError):
+            self.graph.get_topological_order()
+
+    def test_can_take(self):
+        self.assertTrue(self.graph.can_take("CS 1550", [CS_0447, CS_0445]))
+        self.assertFalse(self.graph.can_take("CS 1501", [CS_0441]))
+        self.assertTrue(self.graph.can_take("CS 0401", []))
@@ -0,0 +1,173 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+import unittest
+from unittest.mock import patch
+
+import requests
+import responses
+
+from pittapi import resilience, transport
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+URL = "https://www.laundryview.com/api/currentRoomData?school_desc_key=197&location=2430136"
+BODY = {"objects": []}
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_delay(self):
+        policy = resilience.RetryPolicy(backoff=0.5, max_backoff=3.0)
+        for retry, bound in [(0, 0.5), (1, 1.0), (2, 2.0), (5, 3.0)]:
+            self.assertTrue(all(0 <= policy.get_delay(retry) <= bound for _ in range(50)))
+        self.assertEqual(policy.get_delay(0, retry_after=2.0), 2.0)
+        self.assertEqual(policy.get_delay(0, retry_after=60.0), 3.0)
+
+    def test_get_retry_delay(self):
+        policy = resilience.RetryPolicy(attempts=3, backoff=0.0)
+        budget = resilience.HostRetryBudget()
+
+        self.assertEqual(resilience.get_retry_delay(policy, budget, URL, "GET", 0, None, None), 0.0)
+        self.assertEqual(resilience.get_retry_delay(policy, budget, URL, "GET", 1, 503, "1"), 1.0)
+        self.assertIsNone(resilience.get_retry_delay(policy, budget, URL, "GET", 2, 503, None))
+        self.assertIsNone(resilience.get_retry_delay(policy, budget, URL, "GET", 0, 404, None))
+        self.assertIsNone(resilience.get_retry_delay(policy, budget, URL, "POST", 0, None, None))
+
+    def test_retry_budget(self):
+        budget = resilience.HostRetryBudget(max_tokens=10, token_ratio=0.5)
+        for _ in range(4):
+            budget.record(URL, failed=True)
+        self.assertTrue(budget.can_retry(URL))
+        budget.record(URL, failed=True)
+        self.assertFalse(budget.can_retry(URL))
+        self.assertTrue(budget.can_retry("https://status.pitt.edu/index.json"))
+
+        budget.record(URL, failed=False)
+        self.assertTrue(budget.can_retry(URL))
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_open_half_open_closed(self):
+        breaker = resilience.HostCircuitBreaker(failure_threshold=2, reset_timeout=30.0)
+        breaker.record(URL, failed=True)
+        breaker.check(URL)
+        breaker.record(URL, failed=True)
+        self.assertEqual(breaker.get_state("www.laundryview.com"), "open")
+        with self.assertRaises(resilience.CircuitOpenError):
+            breaker.check(URL)
+
+        with patch("time.monotonic", return_value=10**9):
+            breaker.check(URL)  # The trial request
+            self.assertEqual(breaker.get_state("www.laundryview.com"), "half-open")
+            with self.assertRaises(resilience.CircuitOpenError):
+                breaker.check(URL)  # Only one trial at a time
+            breaker.record(URL, failed=False)
+
+        self.assertEqual(breaker.get_state("www.laundryview.com"), "closed")
+        breaker.check(URL)
+
+    def test_failed_trial_reopens(self):
+        breaker = resilience.HostCircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+        breaker.record(URL, failed=True)
+        with patch("time.monotonic", return_value=10**9):
+            breaker.check(URL)
+            breaker.record(URL, failed=True)
+            with self.assertRaises(resilience.CircuitOpenError):
+                breaker.check(URL)
+
+
+@patch("time.sleep")
+class TransportResilienceTest(unittest.TestCase):
+    @responses.activate
+    def test_retries_unavailable(self, sleep):
+        responses.add(responses.GET, URL, status=503, headers={"Retry-After": "2"})
+        responses.add(responses.GET, URL, json=BODY)
+
+        self.assertEqual(transport.get(URL).json(), BODY)
+        self.assertEqual(len(responses.calls), 2)
+        sleep.assert_called_once_with(2.0)
+
+    @responses.activate
+    def test_retries_connection_errors(self, sleep):
+        responses.add(responses.GET, URL, body=requests.ConnectionError("reset"))
+
+        with self.assertRaises(requests.ConnectionError):
+            transport.get(URL)
+        self.assertEqual(len(responses.calls), transport.DEFAULT_RETRIES.attempts)
+
+    @responses.activate
+    def test_no_retry_for_client_errors_and_posts(self, sleep):
+        responses.add(responses.GET, URL, status=404)
+        responses.add(responses.POST, URL, status=503)
+
+        self.assertEqual(transport.get(URL).status_code, 404)
+        self.assertEqual(transport.post(URL).status_code, 503)
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_circuit_breaker_fails_fast(self, sleep):
+        responses.add(responses.GET, URL, status=503)
+        pool = transport.Transport(retries=0)
+        for _ in range(pool.circuit_breaker.failure_threshold):
+            self.assertEqual(pool.get(URL).status_code, 503)
+
+        with self.assertRaises(resilience.CircuitOpenError):
+            pool.get(URL)
+        self.assertEqual(len(responses.calls), pool.circuit_breaker.failure_threshold)
+        pool.close()
+
+    @responses.activate
+    def test_retry_budget_stops_retries(self, sleep):
+        responses.add(responses.GET, URL, status=503)
+        pool = transport.Transport(retries=5)
+        pool.circuit_breaker.failure_threshold = 100
+
+        self.assertEqual(pool.get(URL).status_code, 503)
+        # Retries stop once more than half of the host's 10 tokens are gone
+        self.assertEqual(len(responses.calls), 5)
+        self.assertEqual(pool.get(URL).status_code, 503)
+        self.assertEqual(len(responses.calls), 6)
+        pool.close()
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class AsyncTransportResilienceTest(unittest.IsolatedAsyncioTestCase):
+    async def test_retries_and_circuit_breaker(self):
+        statuses = iter([503, 200])
+        requests_sent = []
+
+        def handler(request):
+            requests_sent.append(request)
+            return httpx.Response(next(statuses, 504), json=BODY)
+
+        pool = transport.AsyncTransport(retries=resilience.RetryPolicy(backoff=0.0))
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch.object(pool, "get_client", return_value=client):
+            self.assertEqual((await pool.get(URL)).status_code, 200)
+            self.assertEqual(len(requests_sent), 2)
+
+            pool.circuit_breaker.failure_threshold = 1
+            self.assertEqual((await pool.get(URL)).status_code, 504)
+            with self.assertRaises(resilience.CircuitOpenError):
+                await pool.get(URL)
+        await client.aclose()
+        self.assertEqual(len(requests_sent), 3)
@@ -0,0 +1,121 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+import time
+import unittest
+
+from pittapi import schedule
+from pittapi.course import Meeting, Section
+
+FALL = ("08/28/2023", "12/08/2023")
+FIRST_HALF = ("08/28/2023", "10/13/2023")
+SECOND_HALF = ("10/16/2023", "12/08/2023")
+
+
+def make_section(class_number: str, *meetings: tuple[str, str, str, tuple[str, str]]) -> Section:
+    return Section(
+        term="2241",
+        session="Academic Term",
+        section_number="1000",
+        class_number=class_number,
+        section_type="LEC",
+        status="Open",
+        meetings=[Meeting(days, start, end, *dates) for days, start, end, dates in meetings],
+    )
+
+
+class ScheduleTest(unittest.TestCase):
+    def test_parse_time(self):
+        self.assertEqual(schedule.parse_time("10.00.00.000000-05:00"), 600)
+        self.assertEqual(schedule.parse_time("10:50AM"), 650)
+        self.assertEqual(schedule.parse_time("12:15PM"), 735)
+        self.assertEqual(schedule.parse_time("12:15AM"), 15)
+        self.assertEqual(schedule.parse_time("2:30PM"), 870)
+        self.assertIsNone(schedule.parse_time("TBA"))
+
+    def test_encode_meeting(self):
+        mask = schedule.encode_meeting(Meeting("MoWe", "10:00AM", "10:50AM", *FALL))
+
+        self.assertEqual(mask.bit_count(), 2 * 50)
+        self.assertTrue(mask >> 600 & 1)
+        self.assertFalse(mask >> 650 & 1)
+        self.assertTrue(mask >> (2 * schedule.MINUTES_PER_DAY + 649) & 1)
+        self.assertEqual(schedule.encode_meeting(Meeting("TBA", "TBA", "TBA", *FALL)), 0)
+
+    def test_conflicts(self):
+        mwf_10 = schedule.encode_section(make_section("1", ("MoWeFr", "10.00.00.000000-05:00", "10.50.00.000000-05:00", FALL)))
+        mw_1030 = schedule.encode_section(make_section("2", ("MoWe", "10:30AM", "11:45AM", FALL)))
+        mwf_11 = schedule.encode_section(make_section("3", ("MoWeFr", "10:50AM", "11:40AM", FALL)))
+        tba = schedule.encode_section(make_section("4", ("TBA", "TBA", "TBA", FALL)))
+
+        self.assertTrue(schedule.conflicts(mwf_10, mw_1030))
+        self.assertFalse(schedule.conflicts(mwf_10, mwf_11))
+        self.assertFalse(schedule.conflicts(mwf_10, tba))
+        self.assertTrue(schedule.has_conflict([mwf_10, mwf_11, mw_1030]))
+        self.assertFalse(schedule.has_conflict([mwf_10, mwf_11, tba]))
+
+    def test_conflicts_different_sessions(self):
+        first_half = schedule.encode_section(make_section("1", ("TuTh", "1:00PM", "2:15PM", FIRST_HALF)))
+        second_half = schedule.encode_section(make_section("2", ("TuTh", "1:00PM", "2:15PM", SECOND_HALF)))
+        full_term = schedule.encode_section(make_section("3", ("Th", "2:00PM", "3:00PM", FALL)))
+
+        self.assertFalse(schedule.conflicts(first_half, second_half))
+        self.assertTrue(schedule.conflicts(first_half, full_term))
+        self.assertTrue(schedule.conflicts(second_half, full_term))
+
+    def test_find_schedules(self):
+        lectures = [
+            make_section("10", ("MoWe", "9:00AM", "10:15AM", FALL)),
+            make_section("11", ("TuTh", "9:00AM", "10:15AM", FALL)),
+        ]
+        recitations = [
+            make_section("20", ("Mo", "9:30AM", "10:20AM", FALL)),
+            make_section("21", ("Fr", "9:00AM", "9:50AM", FALL)),
+        ]
+        seminar = [make_section("30", ("Tu", "10:00AM", "11:00AM", FALL))]
+
+        schedules = list(schedule.find_schedules([lectures, recitations, seminar]))
+
+        self.assertEqual(
+            [[section.class_number for section in sections] for sections in schedules],
+            [["10", "21", "30"]],
+        )
+        self.assertEqual(len(list(schedule.find_schedules([lectures, recitations]))), 3)
+        self.assertEqual(len(list(schedule.find_schedules([lectures, recitations], limit=2))), 2)
+        self.assertEqual(list(schedule.find_schedules([lectures, []])), [])
+        self.assertEqual(list(schedule.find_schedules([])), [])
+
+    def test_find_schedules_throughput(self):
+        days = ["MoWeFr", "TuTh"]
+        options = [
+            [
+                make_section(f"{course}{hour}{day}", (days[day], f"{hour}:00AM", f"{hour}:50AM", FALL))
+                for hour in range(8, 12)
+                for day in range(2)
+            ]
+            for course in range(5)
+        ]
+
+        start = time.perf_counter()
+        schedules = list(schedule.find_schedules(options))
+        elapsed = time.perf_counter() - start
+
+        # 8 distinct time slots shared by 5 courses: 8 * 7 * 6 * 5 * 4 conflict-free schedules
+        self.assertEqual(len(schedules), 6720)
+        self.assertLess(elapsed, 5)
@@ -0,0 +1,95 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from pittapi import term_snapshot
+from pittapi.course import Course, CourseDetails, Subject
+
+from tests.term_store_test import make_sections
+
+CS_0007 = Course(subject_code="CS", course_number="0007", course_id="105611", course_title="INTRO TO COMPUTER PROGRAMMING")
+CS_0401 = Course(subject_code="CS", course_number="0401", course_id="105612", course_title="INTERMEDIATE PROGRAMMING")
+MATH_0220 = Course(subject_code="MATH", course_number="0220", course_id="107234", course_title="ANALYTC GEOM AND CALC 1")
+
+
+class TermSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "2244.snapshot"
+        self.sections = make_sections(10)
+        self.courses = [
+            CourseDetails(course=CS_0401, sections=self.sections[6:]),
+            CourseDetails(course=CS_0007, sections=self.sections[:6]),
+        ]
+        term_snapshot.write_snapshot(self.path, "2244", self.courses, [Subject("MATH", {"0220": MATH_0220})])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_lookups(self):
+        with term_snapshot.TermSnapshot(self.path) as snapshot:
+            self.assertEqual(snapshot.term, "2244")
+            self.assertEqual(snapshot.get_subject_codes(), ["CS", "MATH"])
+            self.assertEqual(snapshot.get_subject("MATH"), Subject("MATH", {"0220": MATH_0220}))
+            self.assertIsNone(snapshot.get_subject("BIOSC"))
+            self.assertEqual(snapshot.get_course("CS", "0401"), CS_0401)
+            self.assertIsNone(snapshot.get_course("CS", "0220"))
+            self.assertEqual(snapshot.get_course_sections("CS", "0401"), self.sections[6:])
+            self.assertEqual(snapshot.get_course_details("MATH", "0220"), CourseDetails(course=MATH_0220, sections=[]))
+            self.assertEqual(snapshot.get_section("10003"), self.sections[3])
+            self.assertEqual(snapshot.get_section(10008), self.sections[8])
+            self.assertIsNone(snapshot.get_section("99999"))
+            self.assertEqual(list(snapshot.sections), self.sections)
+            self.assertEqual(snapshot.sections.find(status="Closed", section_type="LEC"), [1, 4, 7])
+
+    def test_publish(self):
+        snapshot = term_snapshot.TermSnapshot(self.path)
+        self.assertFalse(snapshot.is_stale())
+
+        term_snapshot.write_snapshot(self.path, "2244", [CourseDetails(course=CS_0007, sections=self.sections[:2])])
+
+        # The old snapshot stays readable until it's reopened
+        self.assertTrue(snapshot.is_stale())
+        self.assertEqual(len(snapshot.sections), 10)
+        snapshot.close()
+        with term_snapshot.TermSnapshot(self.path) as snapshot:
+            self.assertEqual(len(snapshot.sections), 2)
+            self.assertIsNone(snapshot.get_course("CS", "0401"))
+        self.assertEqual(os.listdir(self.directory.name), [self.path.name])
+
+    def test_shared_between_processes(self):
+        script = (
+            "import sys; from pittapi.term_snapshot import TermSnapshot; "
+            "snapshot = TermSnapshot(sys.argv[1]); print(snapshot.get_section('10005').status)"
+        )
+        output = subprocess.run([sys.executable, "-c", script, str(self.path)], capture_output=True, text=True, check=True)
+
+        self.assertEqual(output.stdout.strip(), self.sections[5].status)
+
+    def test_invalid_file(self):
+        self.path.write_bytes(b"not a snapshot at all")
+
+        with self.assertRaises(ValueError):
+            term_snapshot.TermSnapshot(self.path)
@@ -0,0 +1,114 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+import tracemalloc
+import unittest
+
+from pittapi import course, term_store
+from pittapi.course import Instructor, Meeting, Section
+
+from tests.mocks.course_mocks import mocked_course_info_data, mocked_course_sections_data, mocked_section_details_data
+
+
+def make_sections(count: int) -> list[Section]:
+    statuses = ["Open", "Closed", "Wait List"]
+    return [
+        Section(
+            term="2244",
+            session="Academic Term",
+            section_number=f"{1000 + i % 40}",
+            class_number=str(10000 + i),
+            section_type="LEC" if i % 3 else "REC",
+            status=statuses[i % 3],
+            instructors=[Instructor(name=f"Instructor {i % 200}", email=f"instructor{i % 200}@pitt.edu")],
+            meetings=[
+                Meeting(
+                    days="MoWeFr",
+                    start_time=f"{8 + i % 10}.00.00.000000-05:00",
+                    end_time=f"{8 + i % 10}.50.00.000000-05:00",
+                    start_date="01/08/2024",
+                    end_date="04/19/2024",
+                    instructors=[Instructor(name=f"Instructor {i % 200}")],
+                )
+            ],
+        )
+        for i in range(count)
+    ]
+
+
+class TermSectionsTest(unittest.TestCase):
+    def setUp(self):
+        self.course_details = course._parse_course_details(
+            "2231", "CS", "0007", "105611", mocked_course_info_data["course_details"], mocked_course_sections_data
+        )
+        self.section_details = course._parse_section_details("2231", "27815", mocked_section_details_data)
+        self.term_sections = term_store.TermSections.from_course_details([self.course_details])
+        self.term_sections.append(self.section_details, "CS", "0007")
+
+    def test_round_trip(self):
+        self.assertEqual(list(self.term_sections), self.course_details.sections + [self.section_details])
+        self.assertEqual(self.term_sections[-1], self.section_details)
+        self.assertEqual(self.term_sections[:1], self.course_details.sections[:1])
+        with self.assertRaises(IndexError):
+            self.term_sections[len(self.term_sections)]
+
+    def test_lookups(self):
+        term_sections = term_store.TermSections()
+        sections = make_sections(4)
+        for i, section in enumerate(sections):
+            term_sections.append(section, "CS", "0007" if i < 3 else "0008")
+
+        self.assertEqual(term_sections.get_section("10002"), sections[2])
+        self.assertEqual(term_sections.get_section(10003), sections[3])
+        self.assertIsNone(term_sections.get_section("1"))
+        self.assertEqual(term_sections.get_course_sections("CS", "0007"), sections[:3])
+        self.assertEqual(term_sections.get_course_sections("CS", "0009"), [])
+
+    def test_find(self):
+        term_sections = term_store.TermSections()
+        sections = make_sections(12)
+        for section in sections:
+            term_sections.append(section)
+
+        self.assertEqual(term_sections.find(status="Closed", section_type="LEC"), [1, 4, 7, 10])
+        self.assertEqual(term_sections.find(status="No Such Status"), [])
+        with self.assertRaises(ValueError):
+            term_sections.find(class_capacity="30")
+
+    def test_meeting_times(self):
+        term_sections = term_store.TermSections()
+        term_sections.append(make_sections(1)[0])
+
+        self.assertEqual(term_sections.get_meeting_times(0), [(0b10101, 8 * 60, 8 * 60 + 50)])
+
+    def test_memory(self):
+        tracemalloc.start()
+        sections = make_sections(3000)
+        tuples_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        term_sections = term_store.TermSections()
+        for section in sections:
+            term_sections.append(section)
+        columns_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        self.assertEqual(list(term_sections), sections)
+        self.assertLess(columns_size * 3, tuples_size)
@@ -0,0 +1,176 @@
+"""
+The Pitt API, to access workable data of the University of Pittsburgh
+Copyright (C) 2015 Ritwik Gupta
+
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along
+with this program; if not, write to the Free Software Foundation, Inc.,
+51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+
+import requests
+import responses
+from requests_html import HTMLSession
+from responses import matchers
+
+from pittapi import transport
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+URL = "https://status.pitt.edu/index.json"
+BODY = {"components": [{"name": "Canvas", "status": "operational"}], "incidents": []}
+
+
+class ConditionalRequestTest(unittest.TestCase):
+    @responses.activate
+    def test_etag(self):
+        responses.add(responses.GET, URL, json=BODY, headers={"ETag": '"v1"'})
+        first = transport.get_json(URL)
+        size = len(responses.calls[0].response.content)
+        before = transport.get_conditional_stats()
+
+        responses.replace(responses.GET, URL, status=304, match=[matchers.header_matcher({"If-None-Match": '"v1"'})], body=b"")
+        second = transport.conditional_get(URL)
+
+        self.assertEqual(second, transport.ConditionalResponse(status_code=200, data=BODY, not_modified=True))
+        self.assertIs(second.data, first)
+        stats = transport.get_conditional_stats()
+        self.assertEqual(stats.requests - before.requests, 1)
+        self.assertEqual(stats.not_modified - before.not_modified, 1)
+        self.assertEqual(stats.parses_saved - before.parses_saved, 1)
+        self.assertEqual(stats.bytes_saved - before.bytes_saved, size)
+
+    @responses.activate
+    def test_last_modified(self):
+        last_modified = "Wed, 14 Oct 2026 08:00:00 GMT"
+        responses.add(responses.GET, URL, json=BODY, headers={"Last-Modified": last_modified})
+        transport.get_json(URL)
+
+        changed = {"components": [], "incidents": []}
+        responses.replace(
+            responses.GET, URL, json=changed, match=[matchers.header_matcher({"If-Modified-Since": last_modified})]
+        )
+
+        self.assertEqual(transport.get_json(URL), changed)
+
+    @responses.activate
+    def test_no_validators(self):
+        responses.add(responses.GET, URL, json=BODY)
+        transport.get_json(URL)
+        transport.get_json(URL, headers={"User-Agent": "Chrome/103.0.5026.0"})
+
+        self.assertNotIn("If-None-Match", responses.calls[1].request.headers)
+        self.assertEqual(responses.calls[1].request.headers["User-Agent"], "Chrome/103.0.5026.0")
+
+    @responses.activate
+    def test_error_response(self):
+        responses.add(responses.GET, URL, status=502, body="Bad Gateway")
+
+        with self.assertRaises(requests.HTTPError):
+            transport.conditional_get(URL)
+        with self.assertRaises(requests.HTTPError):
+            transport.get_json(URL)
+
+
+class TransportTest(unittest.TestCase):
+    def test_pool_sizes(self):
+        pool = transport.Transport(pool_size=4, host_pool_sizes={"pitcsprd.csps.pitt.edu": 16})
+        session = pool.get_session()
+
+        self.assertEqual(session.get_adapter("https://status.pitt.edu/index.json")._pool_maxsize, 4)
+        self.assertEqual(session.get_adapter("https://pitcsprd.csps.pitt.edu/psc/")._pool_maxsize, 16)
+        pool.close()
+
+    @responses.activate
+    def test_default_timeout(self):
+        responses.add(responses.GET, URL, json=BODY)
+        pool = transport.Transport(timeout=(1.0, 2.0), headers={"User-Agent": "pittapi"})
+        pool.get(URL)
+        pool.get(URL, timeout=5)
+
+        self.assertEqual(responses.calls[0].request.req_kwargs["timeout"], (1.0, 2.0))
+        self.assertEqual(responses.calls[1].request.req_kwargs["timeout"], 5)
+        self.assertEqual(responses.calls[0].request.headers["User-Agent"], "pittapi")
+
+    def test_shared_sessions(self):
+        shared = transport.Transport(share_sessions=True)
+        per_thread = transport.Transport(share_sessions=False)
+        sessions = {}
+
+        def get_sessions():
+            sessions["shared"] = shared.get_session()
+            sessions["per_thread"] = per_thread.get_session()
+
+        thread = threading.Thread(target=get_sessions)
+        thread.start()
+        thread.join()
+
+        self.assertIs(shared.get_session(), sessions["shared"])
+        self.assertIsNot(per_thread.get_session(), sessions["per_thread"])
+        self.assertIsNot(shared.get_session(HTMLSession), shared.get_session())
+        self.assertIsInstance(shared.get_session(HTMLSession), HTMLSession)
+
+    @responses.activate
+    def test_set_transport(self):
+        responses.add(responses.GET, URL, json=BODY)
+        custom = transport.Transport(headers={"X-Client": "test"})
+        previous = transport.set_transport(custom)
+        try:
+            self.assertIs(transport.get_transport(), custom)
+            transport.get_json(URL)
+        finally:
+            transport.set_transport(previous)
+
+        self.assertEqual(responses.calls[0].request.headers["X-Client"], "test")
+
+    def test_async_requires_httpx(self):
+        with patch.dict(sys.modules, {"httpx": None}):
+            self.assertRaises(ImportError, transport._import_httpx)
+
+
+@unittest.skipIf(httpx is None, "httpx isn't installed")
+class AsyncTransportTest(unittest.IsolatedAsyncioTestCase):
+    async def test_client_per_event_loop(self):
+        pool = transport.AsyncTransport(pool_size=5, timeout=(1.0, 2.0), headers={"X-Client": "test"})
+        client = pool.get_client()
+
+        self.assertIs(pool.get_client(), client)
+        self.assertIsNot(pool.get_client(verify=False), client)
+        self.assertEqual(client.timeout, httpx.Timeout(2.0, connect=1.0))
+        self.assertEqual(client.headers["X-Client"], "test")
+        await pool.aclose()
+        self.assertTrue(client.is_closed)
+
+    async def test_validators_shared_with_sync(self):
+        with responses.RequestsMock() as rsps:
+            rsps.add(responses.GET, URL, json=BODY, headers={"ETag": '"v1"'})
+            first = transport.get_json(URL)
+
+        def handler(request):
+            self.assertEqual(request.headers["If-None-Match"], '"v1"')
+            return httpx.Response(304)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch.object(transport.get_async_transport(), "get_client", return_value=client):
+            response = await transport.conditional_get_async(URL)
+        await client.aclose()
+
+        self.assertEqual(response, transport.ConditionalResponse(status_code=200, data=BODY, not_modified=True))
+        self.assertIs(response.data, first)